@@ -1,33 +1,41 @@
 import os
 
+import numpy as np
 import pyaudio
-import wave
 import logging
+from monitoring.logging_config import setup_logging
 import queue
 import time
+import threading
 from datetime import datetime
+from monitoring.metrics import timed, observe_stage
+from audio_processing.segmented_recording import SegmentedRecordingWriter, SegmentedRecording
+from storage.artifact_store import ARTIFACT_ROOT, get_artifact_store
+from audio_processing.capture_health import CaptureHealth
 
-# Configuração do logger
-logging.basicConfig(
-    filename='audio_recorder.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-# Diretório para salvar os áudios
-AUDIO_SAVE_PATH = r'C:\Users\Novaes Engenharia\MeetingGPT\data\audio'
-os.makedirs(AUDIO_SAVE_PATH, exist_ok=True)
+# Diretório das gravações segmentadas (gravadas em disco durante a captura)
+RECORDINGS_PATH = os.path.join(ARTIFACT_ROOT, "audio", "recordings")
 
 class AudioRecorder:
-    def __init__(self):
+    def __init__(self, recording_dir=None, audio=None, max_bytes=None):
         """
         Inicializa o gravador de áudio com as configurações padrão.
+
+        :param recording_dir: Diretório dos segmentos desta gravação (opcional).
+        :param audio: Instância de PyAudio compartilhada (opcional; senão, uma própria é criada).
+        :param max_bytes: Limite de bytes gravados (cota do usuário, opcional).
         """
-        self.audio = pyaudio.PyAudio()
+        self.owns_audio = audio is None
+        self.audio = audio or pyaudio.PyAudio()
+        self.max_bytes = max_bytes
         self.stream = None
-        self.frames = []
         self.queue = queue.Queue()
         self.is_recording = False
+        self.started_at = None
+        self.recording_dir = recording_dir or os.path.join(RECORDINGS_PATH, datetime.now().strftime("%Y%m%d_%H%M%S_%f"))
+        self.writer = None
+        self.writer_thread = None
+        self.health = CaptureHealth()
 
     def start_recording(self):
         """
@@ -38,6 +46,12 @@ class AudioRecorder:
                 logging.warning("Tentativa de iniciar uma gravação já em andamento.")
                 return
 
+            # Os blocos capturados são gravados em segmentos no disco por uma thread dedicada
+            self.writer = SegmentedRecordingWriter(self.recording_dir, sample_rate=44100, max_bytes=self.max_bytes)
+            self.is_recording = True
+            self.writer_thread = threading.Thread(target=self.process_audio, name="audio-writer", daemon=True)
+            self.writer_thread.start()
+
             self.stream = self.audio.open(
                 format=pyaudio.paInt16,
                 channels=1,
@@ -46,12 +60,12 @@ class AudioRecorder:
                 frames_per_buffer=1024,
                 stream_callback=self.callback
             )
-            self.is_recording = True
-            self.frames = []
+            self.started_at = time.perf_counter()
             self.stream.start_stream()
             logging.info("🟢 Gravação iniciada com sucesso.")
             print("🎙️ Gravando... Digite **ENTER** para parar a gravação.")  
         except Exception as e:
+            self.is_recording = False
             logging.error(f"❌ Erro ao iniciar a gravação: {e}")
             raise RuntimeError(f"Erro ao iniciar a gravação: {e}")
 
@@ -60,21 +74,27 @@ class AudioRecorder:
         Captura os frames de áudio enquanto a gravação estiver ativa.
         """
         if self.is_recording:
-            self.queue.put(in_data)
-            self.frames.append(in_data)
+            # Telemetria: perdas sinalizadas pelo PortAudio, profundidade da fila e nível do sinal
+            self.health.on_block(np.frombuffer(in_data, dtype=np.int16),
+                                 overflow=bool(status & pyaudio.paInputOverflow),
+                                 queue_depth=self.queue.qsize())
+            self.queue.put((in_data, time.perf_counter()))
         return (in_data, pyaudio.paContinue)
 
     def process_audio(self):
         """
-        Processa os dados de áudio enquanto a gravação está ativa.
+        Grava no disco os dados de áudio enquanto a gravação está ativa
+        (e esvazia a fila após o término).
         """
         try:
-            while self.is_recording:
+            while self.is_recording or not self.queue.empty():
                 try:
-                    data = self.queue.get(timeout=1)
-                    self.frames.append(data)  # Adiciona os dados capturados
+                    data, captured_at = self.queue.get(timeout=0.5)
+                    self.writer.write(data)  # Acrescenta ao segmento atual
+                    self.health.on_write(captured_at)
+                    if self.writer.truncated:
+                        self.health.dropped_blocks += 1
                 except queue.Empty:
-                    time.sleep(0.1)
                     continue
         except Exception as e:
             logging.error(f"❌ Erro no processamento de áudio: {e}")
@@ -89,9 +109,13 @@ class AudioRecorder:
                 logging.warning("Tentativa de parar uma gravação que não está em andamento.")
                 raise RuntimeError("Nenhuma gravação está em andamento para parar.")
 
-            self.is_recording = False
             self.stream.stop_stream()
             self.stream.close()
+            self.is_recording = False
+            self.writer_thread.join()
+            self.writer.close()
+            observe_stage("capture", time.perf_counter() - self.started_at, payload_bytes=self.writer.bytes_written,
+                          **self.health.snapshot())
             logging.info("🔴 Gravação finalizada com sucesso.")
             print("🔴 Gravação finalizada.")  
 
@@ -99,27 +123,30 @@ class AudioRecorder:
             logging.error(f"❌ Erro ao parar a gravação: {e}")
             raise RuntimeError(f"Erro ao parar a gravação: {e}")
 
-    def save_audio(self, filename=None):
+    @property
+    def bytes_written(self):
+        return self.writer.bytes_written if self.writer else 0
+
+    def save_audio(self, namespace="audio"):
         """
-        Salva o áudio gravado em um arquivo .wav (sem precisar de FFmpeg).
+        Monta os segmentos gravados em um arquivo .wav (sem precisar de FFmpeg)
+        e o grava no armazenamento de artefatos.
+
+        :param namespace: Namespace do armazenamento (ex.: 'audio/user_1').
+        :return: Caminho do arquivo salvo.
         """
         try:
-            if not self.frames:
+            if self.writer is None or not self.writer.total_frames:
                 logging.error("❌ Tentativa de salvar um arquivo sem áudio.")
                 raise RuntimeError("Nenhum áudio capturado para salvar.")
 
-            if not filename:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"audio_{timestamp}.wav"
-
-            filepath = os.path.join(AUDIO_SAVE_PATH, filename)
+            store = get_artifact_store()
+            temp_path = store.new_temp_path(".wav")
 
-            # Salva o áudio em formato WAV usando wave (NÃO PRECISA DE FFMPEG)
-            with wave.open(filepath, 'wb') as wf:
-                wf.setnchannels(1)  # Mono
-                wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-                wf.setframerate(44100)
-                wf.writeframes(b''.join(self.frames))
+            # Concatena os segmentos em blocos usando wave (NÃO PRECISA DE FFMPEG)
+            with timed("encode", payload_bytes=self.writer.bytes_written):
+                SegmentedRecording(self.recording_dir).assemble(temp_path)
+                filepath = store.commit_file(temp_path, namespace, ".wav")
 
             logging.info(f"✅ Áudio salvo com sucesso: {filepath}")
             return filepath
@@ -132,7 +159,11 @@ class AudioRecorder:
         Libera os recursos utilizados pelo gravador de áudio.
         """
         try:
-            self.audio.terminate()
+            if self.is_recording:
+                self.stop_recording()
+            # A instância compartilhada de PyAudio é encerrada por quem a criou
+            if self.owns_audio:
+                self.audio.terminate()
             logging.info("⚡ Recursos de áudio liberados com sucesso.")
         except Exception as e:
             logging.error(f"❌ Erro ao liberar recursos de áudio: {e}")
@@ -140,6 +171,7 @@ class AudioRecorder:
 
 # Exemplo de uso
 if __name__ == "__main__":
+    setup_logging()
     recorder = AudioRecorder()
     try:
         recorder.start_recording()
@@ -0,0 +1,136 @@
+import math
+import time
+import bisect
+import threading
+import numpy as np
+from monitoring.metrics import registry, DEFAULT_BUCKETS
+
+# Limites a partir dos quais a captura é considerada atrasada
+LATENCY_WARNING_SECONDS = 0.5
+QUEUE_WARNING_BLOCKS = 50
+
+# Nível (dBFS) abaixo do qual o microfone provavelmente está mudo; acima, satura
+SILENCE_DBFS = -60.0
+CLIPPING_PEAK = 32767
+
+_FLOOR_DBFS = -120.0
+
+
+def to_dbfs(value):
+    """Converte uma amplitude int16 em dBFS."""
+    return 20 * math.log10(value / 32768.0) if value > 0 else _FLOOR_DBFS
+
+
+class CaptureHealth:
+    def __init__(self):
+        """
+        Contadores baratos da captura, atualizados dentro do callback de áudio.
+
+        Cada atualização é uma operação simples sobre atributos (sem locks nem E/S),
+        de modo que o callback de tempo real não é atrasado pela telemetria. As
+        latências de escrita ficam em buckets locais e vão para o registro de
+        métricas em lote, por ``publish_latency``.
+        """
+        self.blocks = 0
+        self.input_overflows = 0
+        self.dropped_blocks = 0
+        self.clipped_blocks = 0
+        self.queue_high_water = 0
+        self.latency_max = 0.0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.rms = 0.0
+        self.peak = 0
+        self._samples = np.empty(0, dtype=np.float32)  # Buffer reaproveitado no cálculo do RMS
+        self._latency_counts = [0] * (len(DEFAULT_BUCKETS) + 1)
+        self._published_counts = [0] * (len(DEFAULT_BUCKETS) + 1)
+        self._published_sum = 0.0
+        self._publish_lock = threading.Lock()
+
+    def on_block(self, pcm, overflow=False, queue_depth=0):
+        """
+        Registra um bloco capturado.
+
+        :param pcm: Array int16 do bloco.
+        :param overflow: O driver sinalizou perda de amostras antes deste bloco.
+        :param queue_depth: Blocos aguardando gravação no momento.
+        """
+        self.blocks += 1
+        if overflow:
+            self.input_overflows += 1
+        if queue_depth > self.queue_high_water:
+            self.queue_high_water = queue_depth
+        n_samples = len(pcm)
+        if n_samples:
+            if len(self._samples) < n_samples:
+                self._samples = np.empty(n_samples, dtype=np.float32)
+            samples = self._samples[:n_samples]
+            np.copyto(samples, pcm)
+            self.rms = float(np.sqrt(np.dot(samples, samples) / n_samples))
+            self.peak = max(int(pcm.max()), -int(pcm.min()))
+            if self.peak >= CLIPPING_PEAK:
+                self.clipped_blocks += 1
+
+    def on_write(self, captured_at):
+        """
+        Registra a gravação de um bloco no disco.
+
+        :param captured_at: ``time.perf_counter()`` do momento da captura.
+        """
+        latency = time.perf_counter() - captured_at
+        self.latency_sum += latency
+        self.latency_count += 1
+        if latency > self.latency_max:
+            self.latency_max = latency
+        self._latency_counts[bisect.bisect_left(DEFAULT_BUCKETS, latency)] += 1
+
+    def publish_latency(self):
+        """
+        Envia ao registro de métricas (estágio 'capture_write_latency') as latências
+        acumuladas desde a última publicação.
+        """
+        with self._publish_lock:
+            counts, total_sum = list(self._latency_counts), self.latency_sum
+            delta = [current - published for current, published in zip(counts, self._published_counts)]
+            if any(delta):
+                registry.merge_stage("capture_write_latency", delta, total_sum - self._published_sum)
+            self._published_counts, self._published_sum = counts, total_sum
+
+    def snapshot(self):
+        """
+        Estado atual da captura.
+
+        :return: Dicionário com contadores, latências, nível do sinal e status ('ok' ou 'atrasada').
+        """
+        latency_avg = self.latency_sum / self.latency_count if self.latency_count else 0.0
+        lagging = (self.input_overflows or self.dropped_blocks or self.latency_max > LATENCY_WARNING_SECONDS
+                   or self.queue_high_water > QUEUE_WARNING_BLOCKS)
+        return {
+            "blocks": self.blocks,
+            "input_overflows": self.input_overflows,
+            "dropped_blocks": self.dropped_blocks,
+            "clipped_blocks": self.clipped_blocks,
+            "queue_high_water": self.queue_high_water,
+            "write_latency_avg_s": round(latency_avg, 4),
+            "write_latency_max_s": round(self.latency_max, 4),
+            "rms_dbfs": round(to_dbfs(self.rms), 1),
+            "peak_dbfs": round(to_dbfs(self.peak), 1),
+            "status": "atrasada" if lagging else "ok"
+        }
+
+
+def publish_capture_gauges(healths):
+    """
+    Publica no /metrics o agregado das capturas em andamento e as latências de escrita acumuladas.
+
+    :param healths: CaptureHealth das gravações ativas.
+    """
+    snapshots = []
+    for health in healths:
+        health.publish_latency()
+        snapshots.append(health.snapshot())
+    registry.set_gauge("capture_input_overflows", sum(s["input_overflows"] for s in snapshots))
+    registry.set_gauge("capture_dropped_blocks", sum(s["dropped_blocks"] for s in snapshots))
+    registry.set_gauge("capture_queue_high_water", max((s["queue_high_water"] for s in snapshots), default=0))
+    registry.set_gauge("capture_write_latency_max_seconds", max((s["write_latency_max_s"] for s in snapshots), default=0))
+    registry.set_gauge("capture_lagging_sessions", sum(1 for s in snapshots if s["status"] != "ok"))
@@ -0,0 +1,307 @@
+import wave
+import logging
+import numpy as np
+from monitoring.metrics import timed
+
+# Quadros de análise: janela de 25 ms a cada 10 ms
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+N_MELS = 26
+N_MFCC = 13
+
+# Janelas de agrupamento: 1,5 s com passo de 0,75 s
+WINDOW_FRAMES = 150
+WINDOW_HOP_FRAMES = 75
+
+# Áudio lido por bloco (memória constante mesmo para gravações de horas)
+BLOCK_SECONDS = 60
+
+MAX_SPEAKERS = 8
+
+# Similaridade máxima entre centróides de falantes distintos (acima disso, são o mesmo falante)
+MAX_CENTROID_SIMILARITY = 0.55
+
+SPEAKER_LABEL = "Falante {}"
+
+
+def mel_filterbank(sample_rate, n_fft, n_mels=N_MELS):
+    """Banco de filtros triangulares na escala mel (n_mels x n_fft/2+1)."""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(60.0), hz_to_mel(min(sample_rate / 2, 8000.0)), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+    freqs = np.arange(n_fft // 2 + 1)
+    left, center, right = bins[:-2, None], bins[1:-1, None], bins[2:, None]
+    rising = (freqs - left) / np.maximum(center - left, 1)
+    falling = (right - freqs) / np.maximum(right - center, 1)
+    return np.clip(np.minimum(rising, falling), 0, None).astype(np.float32)
+
+
+def dct_matrix(n_mels=N_MELS, n_mfcc=N_MFCC):
+    """Matriz da DCT-II ortonormal (n_mels x n_mfcc)."""
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)
+    matrix = np.cos(np.pi / n_mels * (n[:, None] + 0.5) * k[None, :]) * np.sqrt(2.0 / n_mels)
+    matrix[:, 0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+
+class FeatureExtractor:
+    def __init__(self, sample_rate):
+        """
+        Extrai MFCCs e energia por quadro com NumPy (quadros via stride, FFT real em lote).
+
+        :param sample_rate: Taxa de amostragem do áudio.
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = int(round(FRAME_SECONDS * sample_rate))
+        self.hop = int(round(HOP_SECONDS * sample_rate))
+        self.n_fft = 1 << (self.frame_length - 1).bit_length()
+        self.window = np.hamming(self.frame_length).astype(np.float32)
+        self.mel = mel_filterbank(sample_rate, self.n_fft).T
+        self.dct = dct_matrix()
+
+    def compute(self, samples):
+        """
+        :param samples: Array float32 mono.
+        :return: (mfcc [quadros x N_MFCC], log-energia [quadros]).
+        """
+        if len(samples) < self.frame_length:
+            return np.zeros((0, N_MFCC), dtype=np.float32), np.zeros(0, dtype=np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.frame_length)[::self.hop]
+        # Pré-ênfase aplicada por quadro, sem copiar o sinal inteiro
+        emphasized = np.empty(frames.shape, dtype=np.float32)
+        emphasized[:, 0] = frames[:, 0]
+        np.subtract(frames[:, 1:], 0.97 * frames[:, :-1], out=emphasized[:, 1:])
+        emphasized *= self.window
+        power = np.abs(np.fft.rfft(emphasized, n=self.n_fft, axis=1)) ** 2
+        log_energy = np.log(power.sum(axis=1) + 1e-10).astype(np.float32)
+        log_mel = np.log(power.astype(np.float32) @ self.mel + 1e-10)
+        return log_mel @ self.dct, log_energy
+
+
+def read_features(audio_path):
+    """
+    Lê um WAV PCM 16 bits em blocos e calcula os MFCCs de todo o áudio.
+
+    :param audio_path: Caminho do arquivo .wav.
+    :return: (mfcc, log-energia, duração em segundos).
+    """
+    with wave.open(audio_path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError("A diarização requer áudio PCM de 16 bits.")
+        channels, sample_rate = wf.getnchannels(), wf.getframerate()
+        extractor = FeatureExtractor(sample_rate)
+        block_frames = BLOCK_SECONDS * sample_rate
+        # Sobreposição entre blocos para que os quadros sigam contínuos
+        overlap = extractor.frame_length - extractor.hop
+        carry = np.zeros(0, dtype=np.float32)
+        mfccs, energies = [], []
+        while True:
+            data = wf.readframes(block_frames)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+            if channels > 1:
+                samples = samples.reshape(-1, channels).mean(axis=1)
+            samples = np.concatenate((carry, samples / 32768.0))
+            usable = (len(samples) - extractor.frame_length) // extractor.hop + 1
+            if usable <= 0:
+                carry = samples
+                continue
+            mfcc, energy = extractor.compute(samples[:(usable - 1) * extractor.hop + extractor.frame_length])
+            mfccs.append(mfcc)
+            energies.append(energy)
+            carry = samples[usable * extractor.hop:] if overlap else np.zeros(0, dtype=np.float32)
+        duration = wf.getnframes() / sample_rate
+
+    if not mfccs:
+        return np.zeros((0, N_MFCC), dtype=np.float32), np.zeros(0, dtype=np.float32), duration
+    return np.concatenate(mfccs), np.concatenate(energies), duration
+
+
+def speech_mask(log_energy):
+    """Detecção de fala por energia, com limiar adaptado ao ruído de fundo do áudio."""
+    if not len(log_energy):
+        return np.zeros(0, dtype=bool)
+    floor, peak = np.percentile(log_energy, [10, 95])
+    return log_energy > floor + 0.35 * (peak - floor)
+
+
+def window_embeddings(mfcc, speech):
+    """
+    Resume cada janela de 1,5 s pela média e desvio dos MFCCs dos quadros de fala.
+
+    :return: (embeddings L2-normalizados, índice do quadro inicial de cada janela).
+    """
+    n_windows = max((len(mfcc) - WINDOW_FRAMES) // WINDOW_HOP_FRAMES + 1, 0)
+    if n_windows == 0 or not speech.any():
+        return np.zeros((0, 2 * (N_MFCC - 1)), dtype=np.float32), np.zeros(0, dtype=int)
+
+    # Normalização cepstral global (remove o efeito do canal/microfone); c0 é descartado
+    coeffs = mfcc[:, 1:]
+    coeffs = (coeffs - coeffs[speech].mean(axis=0)) / (coeffs[speech].std(axis=0) + 1e-6)
+    weights = speech.astype(np.float32)
+
+    # Somas acumuladas: média e variância de todas as janelas sem laço em Python
+    cum_w = np.concatenate(([0.0], np.cumsum(weights)))
+    cum_x = np.vstack((np.zeros((1, coeffs.shape[1])), np.cumsum(coeffs * weights[:, None], axis=0)))
+    cum_x2 = np.vstack((np.zeros((1, coeffs.shape[1])), np.cumsum(coeffs ** 2 * weights[:, None], axis=0)))
+    starts = np.arange(n_windows) * WINDOW_HOP_FRAMES
+    ends = starts + WINDOW_FRAMES
+    count = cum_w[ends] - cum_w[starts]
+    keep = count >= WINDOW_FRAMES * 0.3
+    count = np.maximum(count[:, None], 1.0)
+    mean = (cum_x[ends] - cum_x[starts]) / count
+    std = np.sqrt(np.clip((cum_x2[ends] - cum_x2[starts]) / count - mean ** 2, 0, None))
+    embeddings = np.hstack((mean, std))[keep]
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-9
+    return embeddings.astype(np.float32), starts[keep]
+
+
+def kmeans(points, k, iterations=30, seed=0):
+    """K-means esférico (similaridade de cosseno) com inicialização k-means++."""
+    rng = np.random.default_rng(seed)
+    centers = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        distance = np.min(1.0 - points @ np.array(centers).T, axis=1).clip(0)
+        total = distance.sum()
+        centers.append(points[rng.choice(len(points), p=distance / total)] if total > 0 else points[rng.integers(len(points))])
+    centers = np.array(centers)
+    labels = np.zeros(len(points), dtype=int)
+    for iteration in range(iterations):
+        new_labels = np.argmax(points @ centers.T, axis=1)
+        if iteration and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        one_hot = np.eye(k, dtype=points.dtype)[labels]
+        sums = one_hot.T @ points
+        empty = one_hot.sum(axis=0) == 0
+        sums[empty] = centers[empty]
+        centers = sums / (np.linalg.norm(sums, axis=1, keepdims=True) + 1e-9)
+    return labels
+
+
+def centroid_similarity(points, labels, k):
+    """Maior similaridade de cosseno entre os centróides de dois grupos distintos."""
+    sums = np.eye(k, dtype=points.dtype)[labels].T @ points
+    centers = sums / (np.linalg.norm(sums, axis=1, keepdims=True) + 1e-9)
+    similarity = centers @ centers.T
+    np.fill_diagonal(similarity, -1.0)
+    return float(similarity.max())
+
+
+def cluster_speakers(embeddings, num_speakers=None, max_speakers=MAX_SPEAKERS, sample_size=600):
+    """
+    Agrupa as janelas em falantes.
+
+    :param embeddings: Embeddings das janelas.
+    :param num_speakers: Número exato de falantes, se conhecido.
+    :param max_speakers: Limite superior quando o número é estimado.
+    :param sample_size: Janelas usadas para estimar o número de falantes.
+    :return: Rótulo (inteiro) de cada janela.
+    """
+    if len(embeddings) < 2:
+        return np.zeros(len(embeddings), dtype=int)
+    if num_speakers:
+        return kmeans(embeddings, min(num_speakers, len(embeddings)))
+
+    # Estima k em uma amostra (custo independente da duração da reunião): aumenta o
+    # número de grupos até que dois centróides fiquem parecidos demais (mesmo falante dividido)
+    rng = np.random.default_rng(0)
+    sample = embeddings if len(embeddings) <= sample_size else embeddings[rng.choice(len(embeddings), sample_size, replace=False)]
+    best_k = 1
+    for k in range(2, min(max_speakers, len(sample) - 1) + 1):
+        if centroid_similarity(sample, kmeans(sample, k), k) > MAX_CENTROID_SIMILARITY:
+            break
+        best_k = k
+    return kmeans(embeddings, best_k) if best_k > 1 else np.zeros(len(embeddings), dtype=int)
+
+
+def smooth_labels(labels, width=5):
+    """Filtro de moda: remove trocas de falante isoladas de uma única janela."""
+    if len(labels) < width:
+        return labels
+    k = labels.max() + 1
+    votes = np.eye(k)[labels]
+    kernel = np.ones(width)
+    smoothed = np.stack([np.convolve(votes[:, c], kernel, mode="same") for c in range(k)], axis=1)
+    return np.argmax(smoothed, axis=1)
+
+
+def diarize(audio_path, num_speakers=None, max_speakers=MAX_SPEAKERS):
+    """
+    Identifica quem falou quando (offline, apenas CPU).
+
+    :param audio_path: Caminho do arquivo .wav.
+    :param num_speakers: Número exato de falantes, se conhecido.
+    :param max_speakers: Limite superior quando o número é estimado.
+    :return: Lista de turnos {"speaker", "start", "end"} em segundos.
+    """
+    with timed("diarization") as span:
+        mfcc, log_energy, duration = read_features(audio_path)
+        span.fields["audio_seconds"] = round(duration, 2)
+        speech = speech_mask(log_energy)
+        embeddings, starts = window_embeddings(mfcc, speech)
+        if not len(embeddings):
+            return []
+        labels = smooth_labels(cluster_speakers(embeddings, num_speakers, max_speakers))
+
+        # Rótulos na ordem em que os falantes aparecem
+        _, first_seen = np.unique(labels, return_index=True)
+        order = np.argsort(np.argsort(first_seen))
+        labels = order[labels]
+
+        # Fronteiras dos turnos no meio da sobreposição entre janelas vizinhas
+        centers = (starts + WINDOW_FRAMES / 2) * HOP_SECONDS
+        change = np.flatnonzero(np.diff(labels)) + 1
+        bounds = np.concatenate(([0.0], (centers[change - 1] + centers[change]) / 2, [duration]))
+        segment_labels = labels[np.concatenate(([0], change))]
+        turns = [
+            {"speaker": SPEAKER_LABEL.format(int(label) + 1), "start": round(float(start), 2), "end": round(float(end), 2)}
+            for label, start, end in zip(segment_labels, bounds[:-1], bounds[1:])
+        ]
+    logging.info(f"🗣️ Diarização: {len(np.unique(labels))} falante(s), {len(turns)} turnos em {duration:.0f}s de áudio.")
+    return turns
+
+
+def assign_speakers(segments, turns):
+    """
+    Associa a cada segmento da transcrição o falante com maior sobreposição no tempo.
+
+    :param segments: Lista de {"start", "end", "text"}.
+    :param turns: Turnos retornados por ``diarize``.
+    :return: Nova lista de segmentos com a chave "speaker".
+    """
+    if not segments or not turns:
+        return [dict(segment) for segment in segments]
+    seg_start = np.array([s["start"] for s in segments], dtype=float)[:, None]
+    seg_end = np.array([s["end"] for s in segments], dtype=float)[:, None]
+    turn_start = np.array([t["start"] for t in turns], dtype=float)[None, :]
+    turn_end = np.array([t["end"] for t in turns], dtype=float)[None, :]
+    overlap = np.clip(np.minimum(seg_end, turn_end) - np.maximum(seg_start, turn_start), 0, None)
+
+    speakers = sorted({t["speaker"] for t in turns}, key=lambda name: int(name.split()[-1]))
+    speaker_index = np.array([speakers.index(t["speaker"]) for t in turns])
+    per_speaker = np.zeros((len(segments), len(speakers)))
+    np.add.at(per_speaker.T, speaker_index, overlap.T)
+    best = np.argmax(per_speaker, axis=1)
+    return [dict(segment, speaker=speakers[i]) for segment, i in zip(segments, best)]
+
+
+def format_speaker_transcript(segments):
+    """Texto da transcrição com uma linha por turno: 'Falante 1: ...'."""
+    lines = []
+    for segment in segments:
+        text = segment["text"].strip()
+        if not text:
+            continue
+        if lines and lines[-1][0] == segment.get("speaker"):
+            lines[-1][1].append(text)
+        else:
+            lines.append((segment.get("speaker"), [text]))
+    return "\n".join(f"{speaker}: {' '.join(texts)}" if speaker else " ".join(texts) for speaker, texts in lines)
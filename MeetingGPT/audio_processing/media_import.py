@@ -0,0 +1,84 @@
+import os
+import shutil
+import logging
+import tempfile
+import subprocess
+from monitoring.metrics import timed
+from audio_processing.segmented_recording import SegmentedRecordingWriter, SegmentedRecording
+from audio_processing.streamlitwebrtc import ASR_SAMPLE_RATE
+
+# Formatos aceitos no envio de arquivos (áudio e vídeo de Teams/Zoom/celular)
+SUPPORTED_EXTENSIONS = ("wav", "mp3", "m4a", "aac", "ogg", "oga", "opus", "flac", "webm", "mp4", "mov", "mkv", "wma")
+
+# Bytes lidos por vez do upload e da saída do ffmpeg (memória constante)
+CHUNK_BYTES = 256 * 1024
+
+FFMPEG = os.environ.get("MEETINGGPT_FFMPEG", "ffmpeg")
+
+
+class MediaDecodeError(RuntimeError):
+    """Levantada quando o arquivo enviado não pode ser decodificado."""
+
+
+def spool_upload(uploaded_file, path):
+    """
+    Copia o arquivo enviado para o disco em blocos.
+
+    Contêineres como mp4/m4a de celular guardam o índice (moov) no final do
+    arquivo, então o ffmpeg precisa de um arquivo com acesso aleatório, não de um pipe.
+
+    :param uploaded_file: Objeto com ``read`` (ex.: UploadedFile do Streamlit).
+    :param path: Caminho de destino.
+    :return: Tamanho copiado em bytes.
+    """
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    with open(path, "wb") as spool:
+        shutil.copyfileobj(uploaded_file, spool, CHUNK_BYTES)
+        return spool.tell()
+
+
+def decode_media(source_path, recording_dir, max_bytes=None, ffmpeg=FFMPEG):
+    """
+    Decodifica qualquer áudio/vídeo para o formato da transcrição (mono, 16 bits, 16 kHz),
+    lendo a saída do ffmpeg em blocos direto para uma gravação segmentada.
+
+    :param source_path: Arquivo de origem.
+    :param recording_dir: Diretório da gravação segmentada de destino.
+    :param max_bytes: Limite de bytes de áudio decodificado (cota do usuário, opcional).
+    :param ffmpeg: Executável do ffmpeg.
+    :return: SegmentedRecording com o áudio decodificado.
+    """
+    if shutil.which(ffmpeg) is None:
+        raise MediaDecodeError("O ffmpeg não está instalado no servidor.")
+
+    command = [ffmpeg, "-nostdin", "-loglevel", "error", "-i", source_path,
+               "-vn", "-ac", "1", "-ar", str(ASR_SAMPLE_RATE), "-f", "s16le", "pipe:1"]
+    writer = SegmentedRecordingWriter(recording_dir, sample_rate=ASR_SAMPLE_RATE, max_bytes=max_bytes)
+    # stderr vai para um arquivo: um pipe cheio bloquearia o ffmpeg
+    with tempfile.TemporaryFile() as stderr, \
+            timed("decode", payload_bytes=os.path.getsize(source_path)):
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+        pending = b""
+        try:
+            for chunk in iter(lambda: process.stdout.read(CHUNK_BYTES), b""):
+                data = pending + chunk
+                # Mantém o byte ímpar (meia amostra) para o próximo bloco
+                cut = len(data) - len(data) % 2
+                writer.write(data[:cut])
+                pending = data[cut:]
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+            writer.close()
+        stderr.seek(0)
+        errors = stderr.read().decode("utf-8", errors="replace").strip()
+
+    if returncode != 0 or not writer.total_frames:
+        shutil.rmtree(recording_dir, ignore_errors=True)
+        logging.error(f"❌ ffmpeg falhou ({returncode}) ao decodificar {source_path}: {errors[-500:]}")
+        raise MediaDecodeError("Não foi possível ler o áudio do arquivo enviado.")
+
+    recording = SegmentedRecording(recording_dir)
+    logging.info(f"📼 Arquivo decodificado: {recording.duration:.1f}s de áudio em {len(recording.segments)} segmentos.")
+    return recording
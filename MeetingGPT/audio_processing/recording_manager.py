@@ -0,0 +1,305 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime
+from monitoring.metrics import registry
+from audio_processing.segmented_recording import find_incomplete_recordings, recover_recording
+from audio_processing.streamlitwebrtc import RECORDINGS_PATH, CAPTURE_BACKEND, create_recorder
+from storage.artifact_store import get_artifact_store
+from audio_processing.capture_health import publish_capture_gauges
+from audio_processing.media_import import spool_upload, decode_media
+
+# Limites da instância (configuráveis por variável de ambiente)
+MAX_CONCURRENT_RECORDINGS = int(os.environ.get("MEETINGGPT_MAX_RECORDINGS", 8))
+MAX_RECORDINGS_PER_USER = int(os.environ.get("MEETINGGPT_MAX_RECORDINGS_PER_USER", 1))
+MAX_BYTES_PER_USER = int(os.environ.get("MEETINGGPT_MAX_BYTES_PER_USER", 2 * 1024 ** 3))
+
+# Gravações ativas há mais tempo que isso são consideradas abandonadas (aba fechada, sessão perdida)
+MAX_RECORDING_SECONDS = int(os.environ.get("MEETINGGPT_MAX_RECORDING_SECONDS", 4 * 3600))
+
+# Bytes por bloco enfileirado pelo callback do PyAudio (1024 frames, 16 bits, mono)
+_PYAUDIO_BLOCK_BYTES = 1024 * 2
+
+
+class RecordingCapacityError(RuntimeError):
+    """Levantada quando a instância ou o usuário atingiu o limite de gravações/armazenamento."""
+
+
+def new_recording_id():
+    """Gera um identificador de gravação sem colisões (timestamp legível + sufixo aleatório)."""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}"
+
+
+class RecordingManager:
+    def __init__(self, root=RECORDINGS_PATH, max_concurrent=MAX_CONCURRENT_RECORDINGS,
+                 max_per_user=MAX_RECORDINGS_PER_USER, max_bytes_per_user=MAX_BYTES_PER_USER):
+        """
+        Serviço único por processo que cria, limita e contabiliza as gravações.
+
+        :param root: Diretório raiz das gravações (um subdiretório por usuário).
+        :param max_concurrent: Gravações simultâneas na instância.
+        :param max_per_user: Gravações simultâneas por usuário.
+        :param max_bytes_per_user: Espaço em disco máximo por usuário.
+        """
+        self.root = root
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_bytes_per_user = max_bytes_per_user
+        self._active = {}  # recording_id -> {"user_id", "recorder" (None em importações), "recording_dir", "started"}
+        self._usage = {}   # user_id -> bytes em disco
+        self._pyaudio = None
+        self._lock = threading.Lock()
+        # Gauges de captura atualizados a cada leitura do /metrics
+        registry.add_collector(self._publish_gauges)
+
+    def user_dir(self, user_id):
+        """Diretório exclusivo das gravações segmentadas do usuário."""
+        return os.path.join(self.root, f"user_{user_id}")
+
+    def audio_namespace(self, user_id):
+        """Namespace do ArtifactStore onde ficam os áudios montados do usuário."""
+        return f"audio/user_{user_id}"
+
+    def _shared_pyaudio(self):
+        # Uma única instância de PortAudio por processo, em vez de uma por sessão
+        if self._pyaudio is None:
+            import pyaudio
+            self._pyaudio = pyaudio.PyAudio()
+        return self._pyaudio
+
+    def user_usage_bytes(self, user_id):
+        """
+        Espaço ocupado pelo usuário (varredura do disco apenas na primeira consulta).
+
+        :param user_id: ID do usuário.
+        :return: Total em bytes.
+        """
+        with self._lock:
+            if user_id not in self._usage:
+                total = 0
+                for root in (self.user_dir(user_id), get_artifact_store().namespace_dir(self.audio_namespace(user_id))):
+                    for dirpath, _, filenames in os.walk(root):
+                        total += sum(os.path.getsize(os.path.join(dirpath, name)) for name in filenames)
+                self._usage[user_id] = total
+            return self._usage[user_id]
+
+    def adjust_usage(self, user_id, delta_bytes):
+        """Atualiza a contabilidade de disco do usuário (ex.: após limpeza de artefatos)."""
+        with self._lock:
+            if user_id in self._usage:
+                self._usage[user_id] = max(self._usage[user_id] + delta_bytes, 0)
+
+    def _pop_stale(self):
+        """
+        Retira da lista de ativas as gravações abandonadas (chamar com ``_lock`` adquirido).
+
+        :return: Lista de (recording_id, entrada) a encerrar fora do lock com ``_reap``.
+        """
+        now = time.monotonic()
+        stale = [rid for rid, entry in self._active.items() if now - entry["started"] > MAX_RECORDING_SECONDS]
+        return [(recording_id, self._active.pop(recording_id)) for recording_id in stale]
+
+    def _reap(self, stale):
+        """Encerra gravações abandonadas (E/S de disco feita fora do lock)."""
+        for recording_id, entry in stale:
+            logging.warning(f"⚠️ Gravação abandonada encerrada: {recording_id} (usuário {entry['user_id']}).")
+            if entry["recorder"] is None:
+                continue
+            try:
+                if entry["recorder"].is_recording:
+                    entry["recorder"].stop_recording()
+                entry["recorder"].cleanup()
+            except Exception as e:
+                logging.error(f"❌ Erro ao encerrar gravação abandonada {recording_id}: {e}")
+
+    def _publish_gauges(self):
+        stats = self.stats()
+        registry.set_gauge("active_recordings", stats["active_recordings"])
+        registry.set_gauge("recording_buffered_bytes", stats["buffered_bytes"])
+        with self._lock:
+            recorders = [entry["recorder"] for entry in self._active.values() if entry["recorder"] is not None]
+        publish_capture_gauges([recorder.health for recorder in recorders])
+
+    def start_recording(self, user_id, backend=CAPTURE_BACKEND):
+        """
+        Reserva capacidade e inicia uma nova gravação para o usuário.
+
+        :param user_id: ID do usuário.
+        :param backend: 'webrtc' ou 'pyaudio'.
+        :return: Gravador já iniciado (com o atributo ``recording_id``).
+        """
+        usage = self.user_usage_bytes(user_id)
+        if usage >= self.max_bytes_per_user:
+            raise RecordingCapacityError("Limite de armazenamento do usuário atingido. Exclua gravações antigas.")
+
+        recording_id = new_recording_id()
+        recorder = self._reserve(user_id, recording_id, lambda recording_dir: create_recorder(
+            backend,
+            recording_dir=recording_dir,
+            audio=self._shared_pyaudio() if backend == "pyaudio" else None,
+            max_bytes=self.max_bytes_per_user - usage
+        ))
+
+        try:
+            recorder.start_recording()
+        except Exception:
+            self.release(recording_id)
+            raise
+        self._publish_gauges()
+        logging.info(f"🎙️ Gravação {recording_id} iniciada (usuário {user_id}, backend {backend}).")
+        return recorder
+
+    def _reserve(self, user_id, recording_id, create=None):
+        """
+        Confere os limites de simultaneidade e registra a gravação (ou importação) como ativa.
+
+        :param user_id: ID do usuário.
+        :param recording_id: ID da nova gravação.
+        :param create: Função que recebe o diretório da gravação e cria o gravador (None em importações).
+        :return: Gravador criado (com o atributo ``recording_id``) ou None.
+        :raises RecordingCapacityError: Se a instância ou o usuário atingiu o limite.
+        """
+        recording_dir = os.path.join(self.user_dir(user_id), recording_id)
+        with self._lock:
+            stale = self._pop_stale()
+        # Libera a capacidade das gravações abandonadas antes de conferir os limites
+        self._reap(stale)
+        with self._lock:
+            if len(self._active) >= self.max_concurrent:
+                raise RecordingCapacityError("O servidor atingiu o limite de gravações simultâneas. Tente novamente em instantes.")
+            if sum(1 for entry in self._active.values() if entry["user_id"] == user_id) >= self.max_per_user:
+                raise RecordingCapacityError("Já existe uma gravação ou importação em andamento para este usuário.")
+            recorder = create(recording_dir) if create else None
+            if recorder is not None:
+                recorder.recording_id = recording_id
+            self._active[recording_id] = {"user_id": user_id, "recorder": recorder, "recording_dir": recording_dir,
+                                          "started": time.monotonic()}
+        return recorder
+
+    def stop_recording(self, recorder):
+        """
+        Finaliza a gravação, monta o WAV no armazenamento do usuário e libera a capacidade.
+
+        :param recorder: Gravador retornado por ``start_recording``.
+        :return: Caminho do arquivo de áudio salvo.
+        """
+        with self._lock:
+            entry = self._active.get(recorder.recording_id)
+        try:
+            recorder.stop_recording()
+            audio_path = recorder.save_audio(self.audio_namespace(entry["user_id"]) if entry else "audio")
+            if entry:
+                self.user_usage_bytes(entry["user_id"])
+                self.adjust_usage(entry["user_id"], recorder.bytes_written + os.path.getsize(audio_path))
+            return audio_path
+        finally:
+            self.release(recorder.recording_id)
+
+    def release(self, recording_id):
+        """Remove a gravação da lista de ativas e libera seus recursos."""
+        with self._lock:
+            entry = self._active.pop(recording_id, None)
+        if entry and entry["recorder"] is not None:
+            # Latências ainda não publicadas pelo coletor do /metrics
+            entry["recorder"].health.publish_latency()
+            entry["recorder"].cleanup()
+        self._publish_gauges()
+
+    def stats(self):
+        """
+        Contabilidade atual da instância.
+
+        :return: Dicionário com gravações ativas, por usuário e bytes em buffer.
+        """
+        with self._lock:
+            entries = list(self._active.values())
+        per_user = {}
+        buffered = 0
+        for entry in entries:
+            per_user[entry["user_id"]] = per_user.get(entry["user_id"], 0) + 1
+            pending = getattr(entry["recorder"], "queue", None)
+            if pending is not None:
+                buffered += pending.qsize() * _PYAUDIO_BLOCK_BYTES
+        return {
+            "active_recordings": len(entries),
+            "max_concurrent": self.max_concurrent,
+            "per_user": per_user,
+            "buffered_bytes": buffered
+        }
+
+    def import_media(self, user_id, uploaded_file):
+        """
+        Importa um arquivo de áudio/vídeo enviado pelo usuário como uma nova gravação.
+
+        A importação ocupa uma vaga de gravação (limites da instância e do usuário)
+        enquanto o arquivo é decodificado.
+
+        :param user_id: ID do usuário.
+        :param uploaded_file: Objeto com ``read`` (ex.: UploadedFile do Streamlit).
+        :return: (recording_id, caminho do WAV montado no armazenamento).
+        :raises RecordingCapacityError: Sem espaço do usuário ou sem vaga para mais uma gravação.
+        """
+        usage = self.user_usage_bytes(user_id)
+        if usage >= self.max_bytes_per_user:
+            raise RecordingCapacityError("Limite de armazenamento do usuário atingido. Exclua gravações antigas.")
+
+        recording_id = new_recording_id()
+        self._reserve(user_id, recording_id)
+        recording_dir = os.path.join(self.user_dir(user_id), recording_id)
+        store = get_artifact_store()
+        try:
+            spool_path = store.new_temp_path(os.path.splitext(getattr(uploaded_file, "name", ""))[1])
+            try:
+                spool_upload(uploaded_file, spool_path)
+                recording = decode_media(spool_path, recording_dir, max_bytes=self.max_bytes_per_user - usage)
+            finally:
+                if os.path.exists(spool_path):
+                    os.remove(spool_path)
+
+            temp_path = recording.assemble(store.new_temp_path(".wav"))
+            audio_path = store.commit_file(temp_path, self.audio_namespace(user_id), ".wav")
+        finally:
+            self.release(recording_id)
+        self.adjust_usage(user_id, recording.total_frames * 2 + os.path.getsize(audio_path))
+        logging.info(f"📤 Arquivo importado como gravação {recording_id} (usuário {user_id}).")
+        return recording_id, audio_path
+
+    def find_incomplete(self, user_id):
+        """
+        Gravações interrompidas do usuário (excluindo as que estão em andamento).
+
+        :param user_id: ID do usuário.
+        :return: Lista de diretórios recuperáveis.
+        """
+        with self._lock:
+            active = {os.path.abspath(entry["recording_dir"]) for entry in self._active.values()}
+        return [path for path in find_incomplete_recordings(self.user_dir(user_id))
+                if os.path.abspath(path) not in active]
+
+    def recover(self, recording_dir, user_id):
+        """
+        Recupera uma gravação interrompida e monta o WAV correspondente.
+
+        :param recording_dir: Diretório da gravação.
+        :param user_id: ID do usuário dono da gravação.
+        :return: Caminho do arquivo de áudio montado.
+        """
+        recording = recover_recording(recording_dir)
+        store = get_artifact_store()
+        temp_path = recording.assemble(store.new_temp_path(".wav"))
+        return store.commit_file(temp_path, self.audio_namespace(user_id), ".wav")
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_recording_manager():
+    """Retorna o RecordingManager compartilhado pelo processo."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = RecordingManager()
+        return _manager
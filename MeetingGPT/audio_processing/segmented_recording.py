@@ -0,0 +1,399 @@
+import os
+import sys
+import json
+import wave
+import bisect
+import struct
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from monitoring.logging_config import setup_logging
+
+# Duração padrão de cada segmento em segundos
+SEGMENT_SECONDS = 60
+
+# Manifesto append-only de cada gravação
+MANIFEST_NAME = "manifest.jsonl"
+MANIFEST_VERSION = 1
+
+
+def _append_manifest(directory, entry):
+    """Acrescenta uma linha ao manifesto e força a gravação em disco (fsync)."""
+    with open(os.path.join(directory, MANIFEST_NAME), "a", encoding="utf-8") as manifest:
+        manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        manifest.flush()
+        os.fsync(manifest.fileno())
+
+
+def _segment_name(index):
+    return f"segment_{index:05d}.wav"
+
+
+def _pcm_offset(path):
+    """
+    Localiza o início do chunk 'data' de um WAV, mesmo com cabeçalho incompleto.
+
+    :param path: Caminho do arquivo WAV.
+    :return: Deslocamento (em bytes) do primeiro byte de áudio.
+    """
+    with open(path, "rb") as wav_file:
+        header = wav_file.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError(f"Arquivo WAV inválido: {path}")
+        while True:
+            chunk = wav_file.read(8)
+            if len(chunk) < 8:
+                raise ValueError(f"Chunk 'data' não encontrado: {path}")
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+            if chunk_id == b"data":
+                return wav_file.tell()
+            wav_file.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+class SegmentedRecordingWriter:
+    def __init__(self, directory, sample_rate, channels=1, sampwidth=2, segment_seconds=SEGMENT_SECONDS, max_bytes=None):
+        """
+        Grava o áudio em segmentos WAV de duração fixa mais um manifesto append-only.
+
+        Cada segmento fechado é registrado no manifesto com deslocamento, duração e
+        checksum; assim, uma queda do processo perde no máximo o segmento em aberto,
+        que ainda pode ser recuperado por ``recover_recording``.
+
+        :param directory: Diretório exclusivo da gravação.
+        :param sample_rate: Taxa de amostragem em Hz.
+        :param channels: Número de canais.
+        :param sampwidth: Bytes por amostra.
+        :param segment_seconds: Duração de cada segmento em segundos.
+        :param max_bytes: Limite de bytes de áudio; o excedente é descartado (opcional).
+        """
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sampwidth = sampwidth
+        self.segment_seconds = segment_seconds
+        self.frame_bytes = channels * sampwidth
+        self.segment_frames = int(sample_rate * segment_seconds)
+        self.max_bytes = max_bytes
+        self.total_frames = 0
+        self.closed = False
+        self.truncated = False
+        self._index = 0
+        self._wav = None
+        self._hash = None
+        self._segment_start = 0
+        self._frames_in_segment = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        _append_manifest(directory, {
+            "type": "header",
+            "version": MANIFEST_VERSION,
+            "sample_rate": sample_rate,
+            "channels": channels,
+            "sampwidth": sampwidth,
+            "segment_seconds": segment_seconds,
+            "created_at": datetime.now().isoformat()
+        })
+
+    @property
+    def bytes_written(self):
+        return self.total_frames * self.frame_bytes
+
+    def _open_segment(self):
+        self._wav = wave.open(os.path.join(self.directory, _segment_name(self._index)), "wb")
+        self._wav.setnchannels(self.channels)
+        self._wav.setsampwidth(self.sampwidth)
+        self._wav.setframerate(self.sample_rate)
+        self._hash = hashlib.sha256()
+        self._segment_start = self.total_frames
+        self._frames_in_segment = 0
+
+    def _close_segment(self):
+        path = os.path.join(self.directory, _segment_name(self._index))
+        self._wav.close()
+        self._wav = None
+        with open(path, "rb+") as segment_file:
+            os.fsync(segment_file.fileno())
+        _append_manifest(self.directory, {
+            "type": "segment",
+            "index": self._index,
+            "file": _segment_name(self._index),
+            "start_frame": self._segment_start,
+            "frames": self._frames_in_segment,
+            "sample_rate": self.sample_rate,
+            "sha256": self._hash.hexdigest()
+        })
+        self._index += 1
+
+    def write(self, data):
+        """
+        Acrescenta bytes PCM intercalados, abrindo novos segmentos quando necessário.
+
+        :param data: Bytes de áudio (múltiplo do tamanho de um frame).
+        """
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("A gravação segmentada já foi encerrada.")
+            view = memoryview(data)
+            if self.max_bytes is not None and self.bytes_written + len(view) > self.max_bytes:
+                allowed = max(self.max_bytes - self.bytes_written, 0)
+                view = view[:allowed - allowed % self.frame_bytes]
+                if not self.truncated:
+                    self.truncated = True
+                    logging.warning(f"⚠️ Limite de armazenamento atingido; áudio excedente descartado em {self.directory}.")
+            while len(view):
+                if self._wav is None:
+                    self._open_segment()
+                room = (self.segment_frames - self._frames_in_segment) * self.frame_bytes
+                chunk = view[:room]
+                self._wav.writeframesraw(chunk)
+                self._hash.update(chunk)
+                frames = len(chunk) // self.frame_bytes
+                self._frames_in_segment += frames
+                self.total_frames += frames
+                view = view[len(chunk):]
+                if self._frames_in_segment >= self.segment_frames:
+                    self._close_segment()
+
+    def close(self):
+        """
+        Fecha o segmento em aberto e marca a gravação como concluída no manifesto.
+        """
+        with self._lock:
+            if self.closed:
+                return
+            if self._wav is not None:
+                if self._frames_in_segment:
+                    self._close_segment()
+                else:
+                    self._wav.close()
+                    self._wav = None
+                    os.remove(os.path.join(self.directory, _segment_name(self._index)))
+            _append_manifest(self.directory, {"type": "end", "total_frames": self.total_frames,
+                                              "closed_at": datetime.now().isoformat()})
+            self.closed = True
+
+
+def read_manifest(directory):
+    """
+    Lê o manifesto de uma gravação segmentada.
+
+    :param directory: Diretório da gravação.
+    :return: Tupla (cabeçalho, lista de segmentos, entrada de encerramento ou None).
+    """
+    header, segments, end = None, [], None
+    with open(os.path.join(directory, MANIFEST_NAME), "r", encoding="utf-8") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Última linha parcialmente escrita durante uma queda
+                logging.warning(f"⚠️ Linha inválida ignorada no manifesto de {directory}.")
+                continue
+            if entry["type"] == "header":
+                header = entry
+            elif entry["type"] == "segment":
+                segments.append(entry)
+            elif entry["type"] == "end":
+                end = entry
+    if header is None:
+        raise ValueError(f"Manifesto sem cabeçalho: {directory}")
+    return header, segments, end
+
+
+class SegmentedRecording:
+    def __init__(self, directory):
+        """
+        Leitor de uma gravação segmentada com acesso aleatório por intervalo de tempo.
+
+        :param directory: Diretório da gravação.
+        """
+        self.directory = directory
+        self.header, self.segments, self.end = read_manifest(directory)
+        self.sample_rate = self.header["sample_rate"]
+        self.channels = self.header["channels"]
+        self.sampwidth = self.header["sampwidth"]
+        self._starts = [segment["start_frame"] for segment in self.segments]
+
+    @property
+    def complete(self):
+        return self.end is not None
+
+    @property
+    def total_frames(self):
+        if not self.segments:
+            return 0
+        last = self.segments[-1]
+        return last["start_frame"] + last["frames"]
+
+    @property
+    def duration(self):
+        return self.total_frames / self.sample_rate
+
+    def segment_paths(self):
+        """Caminhos dos segmentos registrados, em ordem."""
+        return [os.path.join(self.directory, segment["file"]) for segment in self.segments]
+
+    def read_range(self, start_s, end_s):
+        """
+        Lê apenas os segmentos que cobrem o intervalo [start_s, end_s).
+
+        :param start_s: Início em segundos.
+        :param end_s: Fim em segundos.
+        :return: Bytes PCM do intervalo.
+        """
+        start = max(int(start_s * self.sample_rate), 0)
+        end = min(int(end_s * self.sample_rate), self.total_frames)
+        chunks = []
+        index = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        while start < end and index < len(self.segments):
+            segment = self.segments[index]
+            offset = start - segment["start_frame"]
+            count = min(segment["frames"] - offset, end - start)
+            with wave.open(os.path.join(self.directory, segment["file"]), "rb") as wf:
+                wf.setpos(offset)
+                chunks.append(wf.readframes(count))
+            start += count
+            index += 1
+        return b"".join(chunks)
+
+    def verify(self):
+        """
+        Confere o checksum de cada segmento.
+
+        :return: Lista com os índices dos segmentos corrompidos ou ausentes.
+        """
+        corrupted = []
+        for segment in self.segments:
+            path = os.path.join(self.directory, segment["file"])
+            try:
+                with wave.open(path, "rb") as wf:
+                    digest = hashlib.sha256(wf.readframes(wf.getnframes())).hexdigest()
+                if digest != segment["sha256"]:
+                    corrupted.append(segment["index"])
+            except (OSError, EOFError, wave.Error):
+                corrupted.append(segment["index"])
+        return corrupted
+
+    def assemble(self, output_path, block_frames=65536):
+        """
+        Concatena os segmentos em um único WAV, em blocos (memória constante).
+
+        :param output_path: Caminho do arquivo de saída.
+        :param block_frames: Frames copiados por leitura.
+        :return: Caminho do arquivo gerado.
+        """
+        with wave.open(output_path, "wb") as out:
+            out.setnchannels(self.channels)
+            out.setsampwidth(self.sampwidth)
+            out.setframerate(self.sample_rate)
+            for path in self.segment_paths():
+                with wave.open(path, "rb") as wf:
+                    while True:
+                        data = wf.readframes(block_frames)
+                        if not data:
+                            break
+                        out.writeframes(data)
+        return output_path
+
+
+def recover_recording(directory):
+    """
+    Recupera uma gravação interrompida (queda do processo, reinício do container).
+
+    Segmentos presentes no disco mas ausentes do manifesto têm o cabeçalho WAV
+    reconstruído a partir do tamanho do arquivo e são registrados; em seguida a
+    gravação é marcada como encerrada.
+
+    :param directory: Diretório da gravação.
+    :return: SegmentedRecording pronta para transcrição ou montagem.
+    """
+    header, segments, end = read_manifest(directory)
+    if end is not None:
+        return SegmentedRecording(directory)
+
+    frame_bytes = header["channels"] * header["sampwidth"]
+    index = segments[-1]["index"] + 1 if segments else 0
+    start_frame = segments[-1]["start_frame"] + segments[-1]["frames"] if segments else 0
+
+    while os.path.exists(os.path.join(directory, _segment_name(index))):
+        path = os.path.join(directory, _segment_name(index))
+        try:
+            offset = _pcm_offset(path)
+        except ValueError as e:
+            logging.warning(f"⚠️ Segmento irrecuperável descartado: {e}")
+            break
+        size = os.path.getsize(path) - offset
+        size -= size % frame_bytes
+        if size <= 0:
+            os.remove(path)
+            break
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as raw:
+            raw.seek(offset)
+            pcm = raw.read(size)
+        digest.update(pcm)
+        repaired = path + ".tmp"
+        with wave.open(repaired, "wb") as wf:
+            wf.setnchannels(header["channels"])
+            wf.setsampwidth(header["sampwidth"])
+            wf.setframerate(header["sample_rate"])
+            wf.writeframes(pcm)
+        os.replace(repaired, path)
+
+        frames = size // frame_bytes
+        _append_manifest(directory, {
+            "type": "segment",
+            "index": index,
+            "file": _segment_name(index),
+            "start_frame": start_frame,
+            "frames": frames,
+            "sample_rate": header["sample_rate"],
+            "sha256": digest.hexdigest(),
+            "recovered": True
+        })
+        start_frame += frames
+        index += 1
+
+    _append_manifest(directory, {"type": "end", "total_frames": start_frame, "recovered": True,
+                                 "closed_at": datetime.now().isoformat()})
+    logging.info(f"🩹 Gravação recuperada: {directory} ({start_frame / header['sample_rate']:.1f}s)")
+    return SegmentedRecording(directory)
+
+
+def find_incomplete_recordings(root):
+    """
+    Procura gravações sem entrada de encerramento no manifesto.
+
+    :param root: Diretório que contém os diretórios de gravação.
+    :return: Lista de diretórios de gravações interrompidas.
+    """
+    incomplete = []
+    if not os.path.isdir(root):
+        return incomplete
+    for name in sorted(os.listdir(root)):
+        directory = os.path.join(root, name)
+        if not os.path.exists(os.path.join(directory, MANIFEST_NAME)):
+            continue
+        try:
+            if read_manifest(directory)[2] is None:
+                incomplete.append(directory)
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠️ Manifesto ilegível em {directory}: {e}")
+    return incomplete
+
+
+# Exemplo de uso: python -m audio_processing.segmented_recording <diretório da gravação> [saída.wav]
+if __name__ == "__main__":
+    setup_logging()
+    recording_dir = sys.argv[1]
+    recording = recover_recording(recording_dir)
+    print(f"🎧 Duração: {recording.duration:.1f}s em {len(recording.segments)} segmentos.")
+    print(f"🔎 Segmentos corrompidos: {recording.verify() or 'nenhum'}")
+    if len(sys.argv) > 2:
+        print(f"✅ Áudio montado em: {recording.assemble(sys.argv[2])}")
@@ -1,114 +1,304 @@
-import streamlit as st
-from streamlit_webrtc import webrtc_streamer, WebRtcMode, RTCConfiguration
-import av
-import queue
 import os
-import wave
-from datetime import datetime
+import time
+import uuid
+import logging
+import threading
+import numpy as np
+from monitoring.logging_config import setup_logging
+from monitoring.metrics import timed, observe_stage
+from audio_processing.segmented_recording import SegmentedRecordingWriter, SegmentedRecording
+from storage.artifact_store import ARTIFACT_ROOT, get_artifact_store
+from audio_processing.capture_health import CaptureHealth
 
-# 📌 Exibir que o programa foi iniciado
-st.markdown("### 🚀 Iniciando Gravador de Áudio WebRTC...")
+# 📁 Diretório das gravações segmentadas por sessão (os áudios montados vão para o ArtifactStore)
+RECORDINGS_PATH = os.path.join(ARTIFACT_ROOT, "audio", "recordings")
 
-# 📁 Diretório onde os áudios serão salvos
-AUDIO_SAVE_PATH = r"C:\Users\Novaes Engenharia\MeetingGPT\data\audio"
-os.makedirs(AUDIO_SAVE_PATH, exist_ok=True)
-st.markdown(f"✅ **Diretório de áudio configurado:** `{AUDIO_SAVE_PATH}`")
+# Formato de áudio entregue à transcrição (mono, 16 bits, 16 kHz — suficiente para o Whisper)
+ASR_SAMPLE_RATE = 16000
+
+# Backend de captura: 'webrtc' (navegador) ou 'pyaudio' (microfone do servidor)
+CAPTURE_BACKEND = os.environ.get("MEETINGGPT_CAPTURE_BACKEND", "webrtc").lower()
 
 # 🔹 Configuração WebRTC
-RTC_CONFIG = RTCConfiguration({"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]})
-st.markdown("✅ **Configuração WebRTC carregada!**")
-
-# 🔊 Fila para armazenar os frames de áudio
-audio_queue = queue.Queue()
-st.markdown("✅ **Fila de áudio inicializada!**")
-
-
-def audio_callback(frame: av.AudioFrame):
-    """Captura os frames de áudio e os coloca na fila."""
-    audio_data = frame.to_ndarray()
-    audio_queue.put(audio_data.tobytes())
-    st.markdown("🎤 **Frame de áudio capturado e adicionado à fila!**")
-
-
-def salvar_audio():
-    """Salva o áudio capturado em um arquivo WAV e converte para MP3."""
-    if audio_queue.empty():
-        st.warning("⚠️ Nenhum áudio capturado.")
-        return None
-
-    st.markdown("🟡 **Iniciando processo de salvamento do áudio...**")
-
-    # 🔹 Nome do arquivo com timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename_wav = f"audio_{timestamp}.wav"
-    filename_mp3 = f"audio_{timestamp}.mp3"
-
-    filepath_wav = os.path.join(AUDIO_SAVE_PATH, filename_wav)
-    filepath_mp3 = os.path.join(AUDIO_SAVE_PATH, filename_mp3)
-
-    st.markdown(f"📁 **Criando arquivo de áudio:** `{filename_wav}`")
-
-    # 🔹 Processar e salvar o áudio
-    with wave.open(filepath_wav, "wb") as wf:
-        wf.setnchannels(1)  # Mono
-        wf.setsampwidth(2)  # 16 bits
-        wf.setframerate(44100)  # Taxa de amostragem padrão
-        while not audio_queue.empty():
-            wf.writeframes(audio_queue.get())
-
-    st.markdown(f"✅ **Áudio salvo em WAV:** `{filepath_wav}`")
-
-    # 🔥 Converter para MP3
-    try:
-        from pydub import AudioSegment
-        st.markdown("🟡 **Convertendo áudio WAV para MP3...**")
-        audio = AudioSegment.from_wav(filepath_wav)
-        audio.export(filepath_mp3, format="mp3")
-        os.remove(filepath_wav)  # Remove o arquivo WAV após conversão
-        st.markdown(f"✅ **Áudio convertido para MP3:** `{filepath_mp3}`")
-        return filepath_mp3
-    except Exception as e:
-        st.error(f"❌ Erro ao converter para MP3: {e}")
-        return filepath_wav
-
-
-# 🔹 Interface do Streamlit (Fluxo principal)
-st.title("🎙️ Gravador de Áudio WebRTC")
-
-# ✅ O WebRTC deve estar no fluxo principal do Streamlit
-with st.container():
-    st.markdown("🟡 **Iniciando WebRTC para captura de áudio...**")
-
-    webrtc_ctx = webrtc_streamer(
-        key="audio-recorder",
-        mode=WebRtcMode.SENDONLY,
-        rtc_configuration=RTC_CONFIG,
-        media_stream_constraints={"audio": True, "video": False},
-        async_processing=True,
-    )
-
-    if webrtc_ctx and webrtc_ctx.state.playing:
-        st.markdown("🎙️ **Gravando... Pressione 'Stop' para finalizar.**")
-
-        while webrtc_ctx.state.playing:
-            if webrtc_ctx.audio_receiver:
-                try:
-                    frames = webrtc_ctx.audio_receiver.get_frames(timeout=1)
-                    for frame in frames:
-                        audio_queue.put(frame.to_ndarray().tobytes())
-                        st.markdown("🎤 **Adicionando frame de áudio à fila...**")  # <- Debug
-                except queue.Empty:
-                    st.markdown("⚠️ **Fila de áudio vazia. Nenhum frame recebido.**")  # <- Debug
-                    continue
-            else:
-                st.markdown("⚠️ **WebRTC não está recebendo áudio!**")  # <- Debug
-                break
-
-        # 🔥 Salvar automaticamente após pressionar "Stop"
-        st.markdown("🟡 **Processando áudio após interrupção...**")
-        filepath = salvar_audio()
-        if filepath:
-            st.markdown(f"✅ **Áudio salvo com sucesso:** `{filepath}`")
-            st.audio(filepath, format="audio/mp3")
-        else:
-            st.markdown("⚠️ **Erro ao salvar áudio.**")
+RTC_CONFIG = {"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]}
+
+
+def to_mono_int16(samples, channels, planar):
+    """
+    Converte o array de um av.AudioFrame em mono int16 (vetorizado).
+
+    :param samples: Array retornado por ``frame.to_ndarray()``.
+    :param channels: Número de canais do frame.
+    :param planar: True para formatos planares (um canal por linha).
+    :return: Array float64 mono na escala de int16.
+    """
+    data = samples.astype(np.float64, copy=False)
+    if np.issubdtype(samples.dtype, np.floating):
+        data = data * 32767.0
+    if channels <= 1:
+        return data.reshape(-1)
+    if planar:
+        return data.reshape(channels, -1).mean(axis=0)
+    # Formato intercalado (packed): L R L R ... em uma única linha
+    return data.reshape(-1, channels).mean(axis=1)
+
+
+class StreamingResampler:
+    def __init__(self, target_rate=ASR_SAMPLE_RATE):
+        """
+        Reamostrador linear com estado, para blocos contínuos de áudio.
+
+        Mantém a última amostra e a fase fracionária entre blocos, evitando
+        descontinuidades nas bordas dos frames. Na redução de taxa aplica antes
+        um filtro de média móvel (também com histórico) contra aliasing.
+
+        :param target_rate: Taxa de amostragem de saída em Hz.
+        """
+        self.target_rate = target_rate
+        self.source_rate = None
+        self._position = 0.0
+        self._carry = None
+        self._history = np.zeros(0)
+
+    def process(self, block, source_rate):
+        """
+        Reamostra um bloco mono.
+
+        :param block: Array float mono na taxa ``source_rate``.
+        :param source_rate: Taxa de amostragem de entrada em Hz.
+        :return: Array int16 na taxa alvo.
+        """
+        if self.source_rate != source_rate:
+            self.source_rate = source_rate
+            self._position, self._carry, self._history = 0.0, None, np.zeros(0)
+        if source_rate == self.target_rate:
+            return np.clip(block, -32768, 32767).astype(np.int16)
+
+        step = source_rate / self.target_rate
+        taps = int(round(step))
+        if taps > 1:
+            extended = np.concatenate((self._history, block))
+            filtered = np.convolve(extended, np.ones(taps) / taps, mode="valid")
+            self._history = extended[-(taps - 1):]
+            # Antes de haver histórico suficiente, completa com o bloco original
+            block = filtered if len(filtered) == len(block) else np.concatenate((block[:len(block) - len(filtered)], filtered))
+
+        buffer = block if self._carry is None else np.concatenate(([self._carry], block))
+        last_index = len(buffer) - 1
+        if last_index < 1:
+            self._carry = buffer[-1] if len(buffer) else self._carry
+            return np.zeros(0, dtype=np.int16)
+
+        count = int(np.floor((last_index - self._position) / step)) + 1
+        positions = self._position + step * np.arange(count)
+        positions = positions[positions <= last_index]
+        output = np.interp(positions, np.arange(len(buffer)), buffer)
+
+        # A próxima posição é relativa ao novo buffer, cujo índice 0 é a última amostra deste
+        self._position = positions[-1] + step - last_index if len(positions) else self._position - last_index
+        self._carry = buffer[-1]
+        return np.clip(output, -32768, 32767).astype(np.int16)
+
+
+class WebRTCAudioProcessor:
+    def __init__(self, recording_dir, target_rate=ASR_SAMPLE_RATE, max_bytes=None):
+        """
+        Processa os frames de áudio de UMA sessão e os grava em streaming no disco.
+
+        É chamado pela thread de trabalho do streamlit-webrtc; nunca acessa a UI.
+
+        :param recording_dir: Diretório exclusivo da gravação segmentada da sessão.
+        :param target_rate: Taxa de amostragem do arquivo gravado.
+        :param max_bytes: Limite de bytes gravados (cota do usuário, opcional).
+        """
+        self.recording_dir = recording_dir
+        self.max_bytes = max_bytes
+        self.target_rate = target_rate
+        self.resampler = StreamingResampler(target_rate)
+        self.frames_received = 0
+        self.samples_written = 0
+        self.health = CaptureHealth()
+        self._next_pts = None
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        with self._lock:
+            self._writer = SegmentedRecordingWriter(self.recording_dir, sample_rate=self.target_rate, max_bytes=self.max_bytes)
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def on_frame(self, frame):
+        """
+        Callback do streamlit-webrtc para cada av.AudioFrame recebido.
+
+        :param frame: Frame de áudio (tipicamente 48 kHz, estéreo intercalado).
+        :return: O próprio frame (não é reenviado ao navegador).
+        """
+        received_at = time.perf_counter()
+        # Salto no pts indica áudio perdido entre o navegador e o servidor
+        gap = frame.pts is not None and self._next_pts is not None and frame.pts - self._next_pts > frame.samples // 2
+        self._next_pts = None if frame.pts is None else frame.pts + frame.samples
+
+        mono = to_mono_int16(frame.to_ndarray(), len(frame.layout.channels), frame.format.is_planar)
+        pcm = self.resampler.process(mono, frame.sample_rate)
+        with self._lock:
+            if self._writer is None:
+                return frame  # Gravação já encerrada; descarta frames atrasados
+            self.health.on_block(pcm, overflow=gap)
+            self._writer.write(pcm.tobytes())
+            self.health.on_write(received_at)
+            if self._writer.truncated:
+                self.health.dropped_blocks += 1
+            self.frames_received += 1
+            self.samples_written = self._writer.total_frames
+        return frame
+
+    @property
+    def seconds_recorded(self):
+        return self.samples_written / self.target_rate
+
+
+class WebRTCRecorder:
+    def __init__(self, recording_dir=None, max_bytes=None):
+        """
+        Gravador baseado no navegador (WebRTC) com a mesma interface do AudioRecorder.
+
+        :param recording_dir: Diretório da gravação segmentada (opcional).
+        :param max_bytes: Limite de bytes gravados (cota do usuário, opcional).
+        """
+        self.session_id = uuid.uuid4().hex
+        self.recording_dir = recording_dir or os.path.join(RECORDINGS_PATH, self.session_id)
+        self.processor = WebRTCAudioProcessor(self.recording_dir, max_bytes=max_bytes)
+        self.is_recording = False
+        self.started_at = None
+
+    def start_recording(self):
+        """
+        Prepara a gravação segmentada da sessão; a captura começa quando o
+        navegador inicia o envio de áudio pelo widget.
+        """
+        try:
+            if self.is_recording:
+                logging.warning("Tentativa de iniciar uma gravação já em andamento.")
+                return
+            self.processor.open()
+            self.is_recording = True
+            self.started_at = time.perf_counter()
+            logging.info(f"🟢 Gravação WebRTC iniciada (sessão {self.session_id}).")
+        except Exception as e:
+            logging.error(f"❌ Erro ao iniciar a gravação WebRTC: {e}")
+            raise RuntimeError(f"Erro ao iniciar a gravação: {e}")
+
+    def render_widget(self, key):
+        """
+        Renderiza o componente WebRTC ligado ao processador desta sessão.
+
+        :param key: Chave única do componente no Streamlit.
+        :return: Contexto retornado por ``webrtc_streamer``.
+        """
+        from streamlit_webrtc import webrtc_streamer, WebRtcMode
+
+        return webrtc_streamer(
+            key=key,
+            mode=WebRtcMode.SENDRECV,
+            rtc_configuration=RTC_CONFIG,
+            media_stream_constraints={"audio": True, "video": False},
+            audio_frame_callback=self.processor.on_frame,
+            sendback_audio=False,
+            async_processing=True,
+        )
+
+    def stop_recording(self):
+        """
+        Finaliza a gravação e fecha o último segmento da sessão.
+        """
+        try:
+            if not self.is_recording:
+                logging.warning("Tentativa de parar uma gravação que não está em andamento.")
+                raise RuntimeError("Nenhuma gravação está em andamento para parar.")
+            self.is_recording = False
+            self.processor.close()
+            observe_stage("capture", time.perf_counter() - self.started_at,
+                          payload_bytes=self.processor.samples_written * 2, backend="webrtc",
+                          **self.processor.health.snapshot())
+            logging.info(f"🔴 Gravação WebRTC finalizada: {self.processor.seconds_recorded:.1f}s capturados.")
+        except Exception as e:
+            logging.error(f"❌ Erro ao parar a gravação WebRTC: {e}")
+            raise RuntimeError(f"Erro ao parar a gravação: {e}")
+
+    @property
+    def bytes_written(self):
+        return self.processor.samples_written * 2
+
+    @property
+    def health(self):
+        return self.processor.health
+
+    def save_audio(self, namespace="audio"):
+        """
+        Monta os segmentos da sessão em um único WAV no armazenamento de artefatos.
+
+        :param namespace: Namespace do armazenamento (ex.: 'audio/user_1').
+        :return: Caminho completo do arquivo salvo.
+        """
+        try:
+            if not self.processor.samples_written:
+                logging.error("❌ Tentativa de salvar um arquivo sem áudio.")
+                raise RuntimeError("Nenhum áudio capturado para salvar.")
+
+            store = get_artifact_store()
+            temp_path = store.new_temp_path(".wav")
+            with timed("encode", payload_bytes=self.processor.samples_written * 2, backend="webrtc"):
+                SegmentedRecording(self.recording_dir).assemble(temp_path)
+                filepath = store.commit_file(temp_path, namespace, ".wav")
+            logging.info(f"✅ Áudio salvo com sucesso: {filepath}")
+            return filepath
+        except Exception as e:
+            logging.error(f"❌ Erro ao salvar o áudio: {e}")
+            raise RuntimeError(f"Erro ao salvar o áudio: {e}")
+
+    def cleanup(self):
+        """
+        Fecha a gravação, se ainda estiver aberta (os segmentos permanecem no disco).
+        """
+        self.processor.close()
+
+
+def create_recorder(backend=CAPTURE_BACKEND, recording_dir=None, audio=None, max_bytes=None):
+    """
+    Cria o gravador do backend configurado.
+
+    :param backend: 'webrtc' (padrão) ou 'pyaudio'.
+    :param recording_dir: Diretório da gravação segmentada (opcional).
+    :param audio: Instância de PyAudio compartilhada (apenas backend 'pyaudio').
+    :param max_bytes: Limite de bytes gravados (opcional).
+    :return: Instância com start_recording/stop_recording/save_audio/cleanup.
+    """
+    if backend == "pyaudio":
+        # Importação tardia: PyAudio/PortAudio só são necessários neste backend
+        from audio_processing.audio_recorder import AudioRecorder
+        return AudioRecorder(recording_dir, audio=audio, max_bytes=max_bytes)
+    return WebRTCRecorder(recording_dir, max_bytes=max_bytes)
+
+
+# Exemplo de uso (streamlit run audio_processing/streamlitwebrtc.py)
+if __name__ == "__main__":
+    setup_logging()
+    import streamlit as st
+
+    st.title("🎙️ Gravador de Áudio WebRTC")
+    if "webrtc_recorder" not in st.session_state:
+        st.session_state["webrtc_recorder"] = WebRTCRecorder()
+        st.session_state["webrtc_recorder"].start_recording()
+
+    recorder = st.session_state["webrtc_recorder"]
+    if recorder.is_recording:
+        recorder.render_widget(key="audio-recorder")
+        if st.button("🛑 Finalizar"):
+            recorder.stop_recording()
+            st.audio(recorder.save_audio(), format="audio/wav")
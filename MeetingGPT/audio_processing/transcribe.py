@@ -1,21 +1,53 @@
+import io
 import os
+import time
 import logging
-import json
-from datetime import datetime
+from monitoring.logging_config import setup_logging
 import streamlit as st
 import openai
 import wave
+from monitoring.metrics import timed, observe_stage
+from audio_processing.segmented_recording import SegmentedRecording
+from storage.artifact_store import get_artifact_store
 
-# Configuração inicial do logger
-logging.basicConfig(
-    filename='transcribe.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Namespace do ArtifactStore onde as transcrições serão salvas
+TRANSCRIPTS_NAMESPACE = "transcripts"
+
+
+class _UploadClock(io.IOBase):
+    def __init__(self, file):
+        """
+        Arquivo de áudio entregue ao SDK que registra quando o corpo da requisição
+        terminou de ser enviado: o httpx lê o arquivo em blocos durante o envio e a
+        leitura vazia só acontece depois que o último bloco foi entregue à conexão.
+
+        :param file: Arquivo aberto em modo binário.
+        """
+        super().__init__()
+        self.file = file
+        self.sent_at = None
+
+    def read(self, size=-1):
+        chunk = self.file.read(size)
+        if not chunk:
+            self.sent_at = time.perf_counter()
+        return chunk
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self.file.seekable()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self.file.seek(offset, whence)
+
+    def tell(self):
+        return self.file.tell()
+
+    def fileno(self):
+        return self.file.fileno()
 
-# Diretório onde as transcrições serão salvas
-TRANSCRIPTS_SAVE_PATH = r'C:\Users\Novaes Engenharia\MeetingGPT\data\transcripts'
-os.makedirs(TRANSCRIPTS_SAVE_PATH, exist_ok=True)
 
 class AudioTranscriber:
     def __init__(self):
@@ -32,7 +64,7 @@ class AudioTranscriber:
             raise RuntimeError("A chave da API OpenAI é necessária para usar o transcritor.")
 
         openai.api_key = self.api_key  # Configura a chave da API no OpenAI SDK
-        logging.info(f"🔑 Chave da OpenAI carregada corretamente: {self.api_key[:10]}... (ocultado)")
+        logging.info("🔑 Chave da OpenAI carregada corretamente.")
 
     def transcribe_audio(self, audio_path):
         """
@@ -58,52 +90,108 @@ class AudioTranscriber:
 
             logging.info(f"🎤 Iniciando transcrição para o arquivo: {audio_path}")
 
-            # Chamada para a API Whisper (modelo de transcrição da OpenAI) **ATUALIZADA**
+            # Envio em streaming do arquivo (limitado a 25 MB pela API), sem carregá-lo na memória.
+            # 'upload' vai do início da chamada ao fim do envio do corpo; 'asr', daí até a resposta
             with open(audio_path, "rb") as audio_file:
-                response = openai.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="json"
-                )
-
-            # LOG da resposta para análise
-            logging.info(f"📩 Resposta da API da OpenAI: {response}")
+                upload = _UploadClock(audio_file)
+                with timed("asr", audio_seconds=round(duration, 2)) as asr:
+                    started = time.perf_counter()
+                    try:
+                        response = openai.audio.transcriptions.create(
+                            model="whisper-1",
+                            file=(os.path.basename(audio_path), upload),
+                            response_format="verbose_json"
+                        )
+                    finally:
+                        if upload.sent_at is not None:
+                            asr.start_at(upload.sent_at)
+                            observe_stage("upload", upload.sent_at - started,
+                                          payload_bytes=os.path.getsize(audio_path))
 
             # Verifica se a resposta contém a transcrição esperada
             if hasattr(response, "text"):  # ✅ Corrigido
                 transcription = response.text
             else:
-                raise ValueError(f"Resposta inesperada da API da OpenAI: {response}")
+                raise ValueError(f"Resposta inesperada da API da OpenAI: {type(response).__name__}")
+
+            # Registra apenas o tamanho da resposta (nunca a transcrição inteira)
+            logging.info(f"📩 Resposta da API da OpenAI recebida: {len(transcription)} caracteres.")
+
+            # Segmentos com tempo (usados para associar falantes na diarização)
+            segments = [
+                {"start": float(segment.start), "end": float(segment.end), "text": segment.text}
+                for segment in (getattr(response, "segments", None) or [])
+            ] or [{"start": 0.0, "end": duration, "text": transcription}]
 
             logging.info("✅ Transcrição concluída com sucesso.")
-            return {"text": transcription, "duration": duration}
+            return {"text": transcription, "duration": duration, "segments": segments}
 
         except Exception as e:
             logging.error(f"❌ Erro ao transcrever o áudio: {e}")
             raise RuntimeError(f"Erro ao transcrever o áudio: {e}")
 
-    def save_transcription(self, transcription_data, filename=None):
+    def transcribe_segments(self, recording_dir, completed=None, on_segment=None):
         """
-        Salva a transcrição em um arquivo JSON no diretório definido.
+        Transcreve diretamente os segmentos de uma gravação segmentada
+        (útil após uma queda, sem precisar montar o áudio completo).
+
+        :param recording_dir: Diretório da gravação (com manifest.jsonl).
+        :param completed: Resultados já obtidos {índice do segmento: resultado}, reutilizados sem nova chamada.
+        :param on_segment: Função chamada com (índice, resultado) assim que cada segmento é transcrito.
+        :return: Dicionário com a transcrição, duração, texto por segmento e "gaps" (trechos não transcritos).
+        """
+        try:
+            recording = SegmentedRecording(recording_dir)
+            completed = completed or {}
+            segments, gaps = [], []
+            for segment, path in zip(recording.segments, recording.segment_paths()):
+                # Segmentos muito curtos (ex.: sobra final) não são aceitos pela API: ficam registrados como lacuna
+                if segment["frames"] / recording.sample_rate < 1:
+                    start = segment["start_frame"] / recording.sample_rate
+                    gaps.append({"index": segment["index"], "start": start,
+                                 "end": start + segment["frames"] / recording.sample_rate})
+                    logging.warning(f"⚠️ Segmento {segment['index']} de {recording_dir} tem menos de 1 s "
+                                    f"({segment['frames']} quadros) e não foi transcrito.")
+                    continue
+                result = completed.get(segment["index"])
+                if result is None:
+                    result = self.transcribe_audio(path)
+                    if on_segment:
+                        on_segment(segment["index"], result)
+                offset = segment["start_frame"] / recording.sample_rate
+                segments.extend({
+                    "index": segment["index"],
+                    "start": offset + item["start"],
+                    "end": offset + item["end"],
+                    "text": item["text"]
+                } for item in result["segments"])
+
+            logging.info(f"✅ {len(recording.segments) - len(gaps)} segmentos transcritos de {recording_dir}"
+                         f" ({len(gaps)} lacunas).")
+            return {
+                "text": " ".join(item["text"].strip() for item in segments),
+                "duration": recording.duration,
+                "segments": segments,
+                "gaps": gaps
+            }
+        except Exception as e:
+            logging.error(f"❌ Erro ao transcrever os segmentos: {e}")
+            raise RuntimeError(f"Erro ao transcrever os segmentos: {e}")
+
+    def save_transcription(self, transcription_data, compress=None):
+        """
+        Salva a transcrição em um arquivo JSON no armazenamento de artefatos
+        (nome pelo hash do conteúdo, escrita atômica).
 
         :param transcription_data: Dicionário contendo a transcrição e metadados.
-        :param filename: Nome do arquivo JSON (opcional).
+        :param compress: Grava com gzip (padrão: configuração do armazenamento).
         :return: Caminho completo do arquivo salvo.
         """
         try:
             if not transcription_data or "text" not in transcription_data:
                 raise ValueError("Os dados da transcrição estão vazios.")
 
-            # Gera um nome de arquivo com timestamp, se não fornecido
-            if not filename:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"transcription_{timestamp}.json"
-
-            filepath = os.path.join(TRANSCRIPTS_SAVE_PATH, filename)
-
-            # Salva os dados em um arquivo JSON
-            with open(filepath, 'w', encoding='utf-8') as json_file:
-                json.dump(transcription_data, json_file, ensure_ascii=False, indent=4)
+            filepath = get_artifact_store().put_json(transcription_data, TRANSCRIPTS_NAMESPACE, compress=compress)
 
             logging.info(f"📄 Transcrição salva com sucesso: {filepath}")
             return filepath
@@ -114,6 +202,7 @@ class AudioTranscriber:
 
 # Exemplo de uso
 if __name__ == "__main__":
+    setup_logging()
     transcriber = AudioTranscriber()
     audio_file_path = input("Insira o caminho completo do arquivo de áudio para transcrição: ")
 
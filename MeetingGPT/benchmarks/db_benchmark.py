@@ -0,0 +1,91 @@
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.measure import StageMeasurement
+
+# Tamanhos de tabela avaliados
+DEFAULT_SIZES = (1000, 100000)
+
+# Quantidade de inserções individuais cronometradas via insert_record
+_TIMED_INSERTS = 200
+
+# Registros por transação na carga da massa de dados
+_SEED_BATCH = 5000
+
+# Usuários distintos na massa de dados (o usuário 1 recebe ~1/N dos registros)
+_USERS = 50
+
+
+def _fake_record(i, rng):
+    return {
+        "user_id": (i % _USERS) + 1,
+        "type": "meeting" if i % 3 else "diary",
+        "title": f"Registro {i}",
+        "participants": "Ana, Bruno, Carla",
+        "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "start_time": "10:00",
+        "end_time": "11:00",
+        "transcript": "Texto da transcrição " * 50,
+        "insights": "Insights gerados " * 20
+    }
+
+
+def run_db_benchmark(sizes=DEFAULT_SIZES, work_dir=None):
+    """
+    Microbenchmarks do DatabaseMeeting com tabelas de tamanhos diferentes.
+
+    :param sizes: Quantidades de linhas da tabela 'meetings'.
+    :param work_dir: Diretório de trabalho (temporário se omitido).
+    :return: Dicionário {"<linhas>": {métrica: valor}}.
+    """
+    from database import database_meeting
+
+    work_dir = work_dir or tempfile.mkdtemp(prefix="meetinggpt_dbbench_")
+    os.makedirs(work_dir, exist_ok=True)
+    rng = random.Random(42)
+    results = {}
+
+    for size in sizes:
+        database_meeting.DATABASE_PATH = os.path.join(work_dir, f"meetings_{size}.db")
+        if os.path.exists(database_meeting.DATABASE_PATH):
+            os.remove(database_meeting.DATABASE_PATH)
+
+        db = database_meeting.DatabaseMeeting()
+        try:
+            # Massa de dados carregada em lote pelo repositório, pelo mesmo caminho de escrita
+            # do uso real (não faz parte da medição)
+            seeded = size - _TIMED_INSERTS
+            for start in range(0, seeded, _SEED_BATCH):
+                db.insert_records(_fake_record(i, rng) for i in range(start, min(start + _SEED_BATCH, seeded)))
+
+            # Inserções individuais pelo caminho real (uma transação por registro)
+            start = time.perf_counter()
+            for i in range(_TIMED_INSERTS):
+                db.insert_record(_fake_record(size + i, rng))
+            insert_ms = (time.perf_counter() - start) * 1000 / _TIMED_INSERTS
+
+            with StageMeasurement("fetch_records_by_user") as by_user:
+                db.fetch_records_by_user(1)
+
+            with StageMeasurement("fetch_all_records") as fetch_all:
+                db.fetch_all_records()
+
+            # Histórico em cache: a primeira leitura carrega, a segunda não acessa o banco
+            db.cached_records_by_user(1)
+            with StageMeasurement("cached_records_by_user") as cached:
+                db.cached_records_by_user(1)
+
+            results[str(size)] = {
+                "insert_record_ms": round(insert_ms, 4),
+                "fetch_records_by_user": by_user.as_dict(),
+                "fetch_all_records": fetch_all.as_dict(),
+                "cached_records_by_user": cached.as_dict()
+            }
+            print(f"🗄️ DB {size} linhas: insert {insert_ms:.3f} ms/registro, "
+                  f"por usuário {by_user.seconds:.3f}s (cache {cached.seconds:.6f}s), todos {fetch_all.seconds:.3f}s")
+        finally:
+            db.close_connection()
+
+    return results
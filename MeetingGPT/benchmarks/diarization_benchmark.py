@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+from benchmarks.measure import StageMeasurement
+from benchmarks.synthetic_audio import generate_conversation, write_wav
+
+# Fator de tempo real máximo aceito (segundos de CPU por segundo de áudio)
+MAX_REAL_TIME_FACTOR = 0.1
+
+
+def run_diarization_benchmark(durations=(300, 3600), n_speakers=2, work_dir=None):
+    """
+    Mede a diarização local em conversas sintéticas.
+
+    :param durations: Durações (s) das conversas.
+    :param n_speakers: Número de falantes das conversas.
+    :param work_dir: Diretório de trabalho (temporário se omitido).
+    :return: Dicionário {"<duração>s": medições, fator de tempo real e falantes encontrados}.
+    """
+    from audio_processing.diarization import diarize
+
+    work_dir = work_dir or tempfile.mkdtemp(prefix="meetinggpt_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+    results = {}
+    for duration in durations:
+        samples, _ = generate_conversation(duration, n_speakers=n_speakers, seed=duration)
+        wav_path = write_wav(os.path.join(work_dir, f"conversation_{duration}s.wav"), samples, 16000)
+        del samples
+
+        with StageMeasurement("diarization") as m:
+            turns = diarize(wav_path)
+        stages = m.as_dict()
+        stages["real_time_factor"] = round(stages["cpu_seconds"] / duration, 5)
+        stages["speakers_found"] = len({turn["speaker"] for turn in turns})
+        results[f"{duration}s"] = stages
+
+        status = "✅" if stages["real_time_factor"] < MAX_REAL_TIME_FACTOR else "❌"
+        print(f"{status} Diarização {duration}s: RTF {stages['real_time_factor']}, {stages['speakers_found']} falante(s)")
+    return results
@@ -0,0 +1,416 @@
+"""
+Teste de carga com sessões simultâneas: cada sessão percorre login → tela de
+reuniões → transcrição e insights → histórico em um AppTest (streamlit.testing)
+sem navegador, contra o servidor stub da OpenAI e áudio sintético.
+
+Cada sessão roda no seu próprio processo: o AppTest usa o Runtime global do
+Streamlit, que não pode ser compartilhado por sessões simultâneas no mesmo
+processo. As sessões de um nível começam juntas (barreira) após os imports.
+
+Uso (a partir da pasta MeetingGPT):
+
+    python -m benchmarks.load_test --sessions 1 5 10 20
+    python -m benchmarks.load_test --sessions 10 --duration 60 --llm-latency 2 --output load_results.json
+
+Para cada nível de concorrência: p50/p95/p99 de cada etapa, CPU e pico de RSS somados
+dos processos das sessões e as esperas por lock do SQLite (escritas que levaram mais
+que LOCK_WAIT_MS).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import sqlite3
+import sqlite3.dbapi2
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from benchmarks.measure import StageMeasurement
+from benchmarks.pipeline_benchmark import _configure_openai
+from benchmarks.stub_openai_server import StubConfig, start_stub_server
+from benchmarks.synthetic_audio import generate_speech_like, write_wav
+from monitoring.logging_config import setup_logging
+
+STEPS = ("login", "meeting", "transcription", "history")
+
+# Escrita mais lenta que isto é contada como espera por lock (sem disputa, leva ~1 ms)
+LOCK_WAIT_MS = 50
+
+# Espera máxima (s) para todos os processos de um nível terminarem os imports
+START_TIMEOUT = 300
+
+_PASSWORD = "carga-123"
+_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "ALTER", "DROP", "BEGIN")
+
+
+class _SQLiteWaits:
+    def __init__(self):
+        """Duração das escritas e erros 'database is locked' observados durante a carga."""
+        self.write_ms = []
+        self.locked_errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.write_ms.append(seconds * 1000)
+
+    def locked(self):
+        with self._lock:
+            self.locked_errors += 1
+
+    def reset(self):
+        with self._lock:
+            self.write_ms, self.locked_errors = [], 0
+
+    def merge(self, write_ms, locked_errors):
+        """Acrescenta as medições de um processo de sessão."""
+        with self._lock:
+            self.write_ms.extend(write_ms)
+            self.locked_errors += locked_errors
+
+    def summary(self):
+        with self._lock:
+            write_ms, locked_errors = list(self.write_ms), self.locked_errors
+        return {
+            "writes": len(write_ms),
+            "write_p95_ms": round(_percentile(write_ms, 0.95), 3),
+            "write_max_ms": round(max(write_ms, default=0), 3),
+            "lock_waits": sum(1 for value in write_ms if value > LOCK_WAIT_MS),
+            "lock_wait_seconds": round(sum(value - LOCK_WAIT_MS for value in write_ms if value > LOCK_WAIT_MS) / 1000, 3),
+            "locked_errors": locked_errors
+        }
+
+
+_waits = _SQLiteWaits()
+
+
+def _timed_write(statement, call):
+    if not statement.lstrip().upper().startswith(_WRITE_PREFIXES):
+        return call()
+    start = time.perf_counter()
+    try:
+        return call()
+    except sqlite3.OperationalError as e:
+        if "locked" in str(e):
+            _waits.locked()
+        raise
+    finally:
+        _waits.observe(time.perf_counter() - start)
+
+
+class _WaitTimingCursor(sqlite3.Cursor):
+    def execute(self, sql, *args):
+        return _timed_write(sql, lambda: super(_WaitTimingCursor, self).execute(sql, *args))
+
+    def executemany(self, sql, *args):
+        return _timed_write(sql, lambda: super(_WaitTimingCursor, self).executemany(sql, *args))
+
+    def executescript(self, script):
+        return _timed_write(script, lambda: super(_WaitTimingCursor, self).executescript(script))
+
+
+class _WaitTimingConnection(sqlite3.Connection):
+    def cursor(self, factory=_WaitTimingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, *args):
+        return self.cursor().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        return self.cursor().executemany(sql, *args)
+
+    def commit(self):
+        # O COMMIT é onde o escritor espera os leitores liberarem o banco
+        return _timed_write("COMMIT", super().commit)
+
+
+@contextmanager
+def _wait_timing():
+    """Mede as escritas das conexões abertas no bloco; ``sqlite3.connect`` é restaurado ao sair."""
+    from monitoring import rerun_profiler
+
+    # O profiler de reruns também instrumenta sqlite3.connect; na carga vale a medição de locks
+    profiler_enabled = rerun_profiler.uninstall()
+    previous_connect = sqlite3.connect, sqlite3.dbapi2.connect
+    original_connect = rerun_profiler.original_connect()
+
+    def connect(*args, **kwargs):
+        kwargs.setdefault("factory", _WaitTimingConnection)
+        return original_connect(*args, **kwargs)
+
+    sqlite3.connect = sqlite3.dbapi2.connect = connect
+    try:
+        yield
+    finally:
+        sqlite3.connect, sqlite3.dbapi2.connect = previous_connect
+        if profiler_enabled:
+            rerun_profiler.enable()
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _app(database_path):
+    # Executado pelo AppTest: o app completo, apontado para o banco da carga
+    from database import database_meeting, database_user
+    database_meeting.DATABASE_PATH = database_user.DATABASE_PATH = database_path
+
+    from meeting_main import main
+    main()
+
+
+def _button(at, label):
+    for button in at.button:
+        if button.label == label:
+            return button
+    raise LookupError(f"botão '{label}' não encontrado")
+
+
+def _failure(at):
+    messages = [element.value for element in at.exception] + [element.value for element in at.error]
+    return str(messages[0]) if messages else None
+
+
+def _session(index, database_path, audio_path, timeout, timings):
+    """
+    Uma sessão completa; preenche ``timings`` ({etapa: segundos}) e devolve o erro da
+    primeira etapa que falhar (ou None).
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_function(_app, args=(database_path,), default_timeout=timeout)
+    at.run()
+
+    def step(name, action):
+        # Uma falha da sessão (inclusive do próprio AppTest) é erro da etapa, não do nível inteiro
+        start = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        timings[name] = time.perf_counter() - start
+        return _failure(at)
+
+    at.text_input(key="username").input(f"carga{index}")
+    at.text_input(key="password").input(_PASSWORD)
+    error = step("login", lambda: _button(at, "Entrar").click().run())
+    if error or not at.session_state["user_logged"]:
+        return f"login: {error or 'credenciais recusadas'}"
+
+    error = step("meeting", lambda: at.sidebar.selectbox[0].select("📅 Tela de Reuniões").run())
+    if error:
+        return f"meeting: {error}"
+
+    # Datas diferentes por sessão: o cache de insights (conteúdo + data) não é compartilhado
+    data = dict(at.session_state["meeting_data"])
+    data.update(title=f"Carga {index}", participants="Ana, Bruno", date=f"2025-01-{index % 28 + 1:02d}")
+    at.session_state["meeting_data"] = data
+    at.session_state["audio_file_path"] = audio_path
+    at.run()
+    error = step("transcription", lambda: _button(at, "📝 Gerar Transcrição e Insights").click().run())
+    if error or not any("Dados salvos" in element.value for element in at.success):
+        return f"transcription: {error or 'registro não salvo'}"
+
+    error = step("history", lambda: at.sidebar.selectbox[0].select("📂 Histórico").run())
+    return f"history: {error}" if error else None
+
+
+def _configure_paths(work_dir, database_path):
+    from audio_processing.recording_manager import get_recording_manager
+    from database import database_meeting, database_user
+    from storage.artifact_store import configure_artifact_store
+
+    database_meeting.DATABASE_PATH = database_user.DATABASE_PATH = database_path
+    configure_artifact_store(os.path.join(work_dir, "artifacts"))
+    get_recording_manager().root = os.path.join(work_dir, "recordings")
+
+
+def _session_process(index, settings, barrier, results):
+    """
+    Processo de uma sessão: configura o ambiente, aguarda as demais sessões do nível e
+    envia para ``results`` as etapas, o erro, a CPU, o pico de RSS e as escritas medidas.
+    """
+    timings, error = {}, None
+    measurement = StageMeasurement(f"session_{index}")
+    try:
+        _configure_openai(settings["base_url"])
+        _configure_paths(settings["work_dir"], settings["database_path"])
+        # Imports pesados antes da barreira: não entram no tempo das etapas
+        import meeting_main  # noqa: F401
+        from streamlit.testing.v1 import AppTest  # noqa: F401
+        barrier.wait(START_TIMEOUT)
+        with _wait_timing(), measurement:
+            error = _session(index, settings["database_path"], settings["audio_path"], settings["timeout"], timings)
+    except Exception as e:
+        # Qualquer falha da sessão (inclusive fora das etapas) é registrada, nunca propagada
+        error = f"sessão {index}: {type(e).__name__}: {e}"
+    summary = _waits.summary()
+    with _waits._lock:
+        write_ms = list(_waits.write_ms)
+    results.put({
+        "index": index,
+        "timings": timings,
+        "error": error,
+        "seconds": measurement.seconds or 0,
+        "cpu_seconds": measurement.cpu_seconds or 0,
+        "peak_rss_mb": round(measurement.peak_rss / (1024 * 1024), 2),
+        "write_ms": write_ms,
+        "locked_errors": summary["locked_errors"]
+    })
+
+
+def _run_level(level, settings, audio_paths, timeout):
+    """
+    Executa ``level`` sessões, uma por processo.
+
+    :return: Lista com o resultado de cada sessão (na ordem dos índices).
+    """
+    context = multiprocessing.get_context("spawn")
+    results, barrier = context.Queue(), context.Barrier(level)
+    processes = [
+        context.Process(target=_session_process, name=f"load-session-{index}",
+                        args=(index, dict(settings, audio_path=audio_paths[index]), barrier, results))
+        for index in range(level)
+    ]
+    for process in processes:
+        process.start()
+
+    collected = {}
+    deadline = time.monotonic() + START_TIMEOUT + 4 * timeout
+    while len(collected) < level and time.monotonic() < deadline:
+        try:
+            item = results.get(timeout=1)
+            collected[item["index"]] = item
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break
+    for process in processes:
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    return [collected.get(index) or {
+        "index": index, "timings": {}, "seconds": 0, "cpu_seconds": 0, "peak_rss_mb": 0, "write_ms": [],
+        "locked_errors": 0, "error": f"sessão {index}: processo encerrado sem resultado (código {processes[index].exitcode})"
+    } for index in range(level)]
+
+
+def _prepare(work_dir, max_sessions, duration):
+    from database import database_meeting, database_user
+
+    database_path = os.path.join(work_dir, "load.db")
+    if os.path.exists(database_path):
+        os.remove(database_path)
+    _configure_paths(work_dir, database_path)
+
+    users = database_user.DatabaseUser()
+    try:
+        for index in range(max_sessions):
+            users.insert_user(f"Usuário de carga {index}", f"carga{index}", _PASSWORD)
+    finally:
+        users.close_connection()
+    database_meeting.DatabaseMeeting().close_connection()
+
+    source = os.path.join(work_dir, "audio", f"synthetic_{duration}s.wav")
+    os.makedirs(os.path.dirname(source), exist_ok=True)
+    write_wav(source, generate_speech_like(duration, seed=duration))
+    return database_path, source
+
+
+def run_load_test(levels=(1, 5, 10), duration=10, work_dir=None, stub_config=None, timeout=600):
+    """
+    Executa níveis crescentes de sessões simultâneas.
+
+    :param levels: Quantidades de sessões simultâneas.
+    :param duration: Duração (s) do áudio sintético de cada sessão.
+    :param work_dir: Diretório de trabalho (temporário se omitido).
+    :param stub_config: Latências simuladas do servidor stub.
+    :param timeout: Tempo máximo de cada execução do script (s).
+    :return: Dicionário {"<sessões>": {"steps", "errors", "cpu_percent", "peak_rss_mb", "sqlite"}};
+             CPU e RSS são somados dos processos das sessões.
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix="meetinggpt_load_")
+    os.makedirs(work_dir, exist_ok=True)
+    os.environ.setdefault("MEETINGGPT_METRICS_PORT", "off")
+
+    server, base_url = start_stub_server(config=stub_config or StubConfig())
+    _configure_openai(base_url)
+    database_path, source = _prepare(work_dir, max(levels), duration)
+    settings = {"work_dir": work_dir, "database_path": database_path, "base_url": base_url, "timeout": timeout}
+
+    results = {}
+    try:
+        for level in levels:
+            # Cada sessão envia a sua cópia do áudio (checkpoints e artefatos independentes)
+            audio_paths = []
+            for index in range(level):
+                path = os.path.join(work_dir, "audio", f"nivel{level}_sessao{index}.wav")
+                shutil.copyfile(source, path)
+                audio_paths.append(path)
+
+            _waits.reset()
+            sessions = _run_level(level, settings, audio_paths, timeout)
+            for session in sessions:
+                _waits.merge(session["write_ms"], session["locked_errors"])
+
+            steps = {}
+            for name in STEPS:
+                values = [session["timings"][name] * 1000 for session in sessions if name in session["timings"]]
+                steps[name] = {
+                    "p50_ms": round(_percentile(values, 0.5), 1),
+                    "p95_ms": round(_percentile(values, 0.95), 1),
+                    "p99_ms": round(_percentile(values, 0.99), 1),
+                    "completed": len(values)
+                }
+            errors = [session["error"] for session in sessions if session["error"]]
+            # As sessões começam juntas: a duração do nível é a da sessão mais longa
+            seconds = max(session["seconds"] for session in sessions) or 1e-9
+            results[str(level)] = {
+                "steps": steps,
+                "errors": errors,
+                "seconds": round(seconds, 6),
+                "cpu_percent": round(100 * sum(session["cpu_seconds"] for session in sessions) / seconds, 1),
+                "peak_rss_mb": round(sum(session["peak_rss_mb"] for session in sessions), 2),
+                "sqlite": _waits.summary()
+            }
+            sqlite_summary = results[str(level)]["sqlite"]
+            print(f"👥 {level} sessão(ões): " + ", ".join(
+                f"{name} p95 {steps[name]['p95_ms']} ms" for name in STEPS
+            ) + f" | CPU {results[str(level)]['cpu_percent']}%, RSS {results[str(level)]['peak_rss_mb']} MB, "
+                f"{sqlite_summary['lock_waits']} espera(s) por lock, {len(errors)} erro(s)")
+    finally:
+        server.shutdown()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga com sessões simultâneas do MeetingGPT.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10], help="Sessões simultâneas por nível.")
+    parser.add_argument("--duration", type=int, default=10, help="Duração (s) do áudio sintético.")
+    parser.add_argument("--asr-latency", type=float, default=0.5, help="Latência simulada da transcrição (s).")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Latência simulada do LLM (s).")
+    parser.add_argument("--output", help="Arquivo JSON de saída.")
+    args = parser.parse_args(argv)
+
+    stub_config = StubConfig(asr_latency=args.asr_latency, llm_latency=args.llm_latency)
+    results = run_load_test(args.sessions, args.duration, stub_config=stub_config)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, ensure_ascii=False, indent=2)
+        print(f"📄 Resultados salvos em: {args.output}")
+    return 1 if any(level["errors"] for level in results.values()) else 0
+
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows não possui o módulo resource
+    resource = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes():
+    """
+    Retorna o RSS atual do processo em bytes (Linux via /proc; fallback para o pico do getrusage).
+    """
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # No macOS o valor é em bytes; no Linux, em KB
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageMeasurement:
+    def __init__(self, name, interval=0.01):
+        """
+        Mede tempo de parede, tempo de CPU e pico de RSS de um estágio.
+
+        Um thread amostra o RSS a cada ``interval`` segundos enquanto o estágio
+        estiver em execução, de modo que o pico reportado é o do estágio e não o
+        do processo inteiro.
+
+        :param name: Nome do estágio.
+        :param interval: Intervalo de amostragem do RSS em segundos.
+        """
+        self.name = name
+        self.interval = interval
+        self.seconds = None
+        self.cpu_seconds = None
+        self.rss_start = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, current_rss_bytes())
+
+    def __enter__(self):
+        self.rss_start = self.peak_rss = current_rss_bytes()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        self._cpu_start = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._start
+        self.cpu_seconds = time.process_time() - self._cpu_start
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss_bytes())
+        return False
+
+    def as_dict(self):
+        """Resultado do estágio em formato serializável."""
+        return {
+            "seconds": round(self.seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 2),
+            "rss_delta_mb": round((self.peak_rss - self.rss_start) / (1024 * 1024), 2)
+        }
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import wave
+
+from audio_processing.segmented_recording import SegmentedRecordingWriter
+from benchmarks.measure import StageMeasurement
+from benchmarks.stub_openai_server import StubConfig, start_stub_server
+from benchmarks.synthetic_audio import DEFAULT_DURATIONS, generate_wav_set
+
+# Tamanho do buffer usado pelo AudioRecorder (frames_per_buffer)
+_FRAMES_PER_BUFFER = 1024
+
+
+def _load_frames(wav_path):
+    """Lê o WAV em blocos do mesmo tamanho que o callback do PyAudio entregaria."""
+    frames = []
+    with wave.open(wav_path, "rb") as wf:
+        while True:
+            data = wf.readframes(_FRAMES_PER_BUFFER)
+            if not data:
+                break
+            frames.append(data)
+    return frames
+
+
+def _configure_openai(base_url):
+    """Aponta o SDK da OpenAI e o LangChain para o servidor stub."""
+    os.environ["OPENAI_API_KEY"] = "sk-benchmark-stub"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_BASE"] = base_url
+
+    import openai
+    openai.api_key = os.environ["OPENAI_API_KEY"]
+    openai.base_url = base_url.rstrip("/") + "/"
+
+
+def run_pipeline_benchmark(durations=DEFAULT_DURATIONS, work_dir=None, stub_config=None):
+    """
+    Executa o fluxo gravação → salvamento → transcrição → insights → inserção
+    contra o servidor stub, medindo cada estágio.
+
+    :param durations: Durações (s) dos áudios sintéticos.
+    :param work_dir: Diretório de trabalho (temporário se omitido).
+    :param stub_config: Configuração de latência do servidor stub.
+    :return: Dicionário {"<duração>s": {estágio: medições}}.
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix="meetinggpt_bench_")
+    wavs = generate_wav_set(os.path.join(work_dir, "synthetic"), durations)
+
+    server, base_url = start_stub_server(config=stub_config or StubConfig())
+    _configure_openai(base_url)
+
+    # Artefatos e banco são redirecionados para o diretório de trabalho
+    from storage.artifact_store import configure_artifact_store
+    from audio_processing import audio_recorder
+    from database import database_meeting
+    from audio_processing.transcribe import AudioTranscriber
+    from insights.insights_generator import InsightsGenerator
+
+    configure_artifact_store(os.path.join(work_dir, "artifacts"))
+    database_meeting.DATABASE_PATH = os.path.join(work_dir, "pipeline.db")
+
+    results = {}
+    try:
+        for duration, wav_path in wavs.items():
+            stages = {}
+            frames = _load_frames(wav_path)
+
+            recorder = audio_recorder.AudioRecorder(os.path.join(work_dir, "recordings", f"{duration}s"))
+            try:
+                # Simula a captura: os blocos passam pelo gravador segmentado como no callback
+                recorder.writer = SegmentedRecordingWriter(recorder.recording_dir, sample_rate=44100)
+                for frame in frames:
+                    recorder.writer.write(frame)
+                recorder.writer.close()
+                with StageMeasurement("save_audio") as m:
+                    saved_path = recorder.save_audio()
+                stages["save_audio"] = m.as_dict()
+            finally:
+                recorder.cleanup()
+            del frames
+
+            transcriber = AudioTranscriber()
+            with StageMeasurement("transcribe") as m:
+                transcription = transcriber.transcribe_audio(saved_path)
+            stages["transcribe"] = m.as_dict()
+
+            generator = InsightsGenerator()
+            with StageMeasurement("insights") as m:
+                insights = generator.generate_insights(transcription["text"])
+            stages["insights"] = m.as_dict()
+
+            db = database_meeting.DatabaseMeeting()
+            try:
+                with StageMeasurement("db_insert") as m:
+                    db.insert_record({
+                        "user_id": 1,
+                        "type": "meeting",
+                        "title": f"Benchmark {duration}s",
+                        "participants": "Ana, Bruno",
+                        "date": "2025-01-15",
+                        "start_time": "10:00",
+                        "end_time": "11:00",
+                        "transcript": transcription["text"],
+                        "insights": insights["insights"]
+                    })
+                stages["db_insert"] = m.as_dict()
+            finally:
+                db.close_connection()
+
+            stages["total_seconds"] = round(sum(s["seconds"] for s in stages.values()), 6)
+            results[f"{duration}s"] = stages
+            print(f"⏱️ Pipeline {duration}s: {stages['total_seconds']:.3f}s")
+    finally:
+        server.shutdown()
+
+    return results
@@ -0,0 +1,266 @@
+"""
+Custo de cada execução (rerun) das telas, medido com AppTest (streamlit.testing)
+e o profiler de reruns, comparado com um orçamento por tela.
+
+Uso (a partir da pasta MeetingGPT):
+
+    python -m benchmarks.render_budget
+    python -m benchmarks.render_budget --records 1000 --reruns 30 --output render_results.json
+
+Sai com código 1 quando alguma tela estoura o orçamento ou termina com erro.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+
+from monitoring.logging_config import setup_logging
+
+# Orçamento por execução de cada tela (médias sobre o ciclo de INTERACTIONS; tempos no p95).
+# Conexões e consultas não dependem da máquina: um aumento indica trabalho novo a cada
+# interação. O p95 do login inclui a conferência da senha (bcrypt) e o histórico, a
+# conexão de leitura da estimativa do export.
+RENDER_BUDGETS = {
+    "login": {"p95_ms": 500, "db_connections": 1, "queries": 0.25},
+    "meeting": {"p95_ms": 150, "db_connections": 1, "queries": 0},
+    "diary": {"p95_ms": 150, "db_connections": 1, "queries": 0},
+    "history": {"p95_ms": 600, "db_connections": 1.1, "queries": 6},
+    "config": {"p95_ms": 150, "db_connections": 2, "queries": 3}
+}
+
+# Registros do usuário avaliado (o histórico cresce com eles)
+DEFAULT_RECORDS = 200
+DEFAULT_RERUNS = 20
+
+
+def _screen_app(screen, database_path, user_id):
+    # Executado pelo AppTest: o corpo é o script da página
+    import os
+    import streamlit as st
+    from database import database_meeting, database_user
+    from monitoring.rerun_profiler import profile_rerun
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-render-budget")
+    database_meeting.DATABASE_PATH = database_user.DATABASE_PATH = database_path
+    st.session_state["user_id"] = user_id
+
+    with profile_rerun(screen):
+        page = None
+        try:
+            if screen == "login":
+                from frontend.Screen_login import LoginScreen
+                page = LoginScreen()
+            elif screen == "meeting":
+                from frontend.Screen_meeting import MeetingScreen
+                page = MeetingScreen(user_id=user_id)
+            elif screen == "diary":
+                from frontend.Screen_dmental import DiaryScreen
+                page = DiaryScreen(user_id=user_id)
+            elif screen == "history":
+                from frontend.Screen_historico import HistoryScreen
+                page = HistoryScreen(user_id=user_id)
+            elif screen == "config":
+                from frontend.Screen_config import ConfigScreen
+                page = ConfigScreen()
+            page.render()
+        finally:
+            # Como no meeting_main: a conexão da tela é liberada ao final de cada execução
+            if page is not None and hasattr(page, "cleanup"):
+                page.cleanup()
+
+
+def _seed(database_path, records, user_id):
+    from database import database_meeting, database_user
+
+    database_meeting.DATABASE_PATH = database_user.DATABASE_PATH = database_path
+    users = database_user.DatabaseUser()
+    try:
+        users.insert_user("Ana Lima", "ana", "senha-forte")
+    finally:
+        users.close_connection()
+    db = database_meeting.DatabaseMeeting()
+    rng = random.Random(7)
+    try:
+        db.insert_records({
+            "user_id": user_id,
+            "type": "meeting" if i % 3 else "diary",
+            "title": f"Registro {i}",
+            "participants": rng.choice(["Ana, Bruno", "Carla; Davi e Ana", ""]),
+            "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "start_time": "10:00",
+            "end_time": "11:00",
+            "transcript": "Texto da transcrição " * 50,
+            "insights": "Insights gerados " * 20
+        } for i in range(records))
+    finally:
+        db.close_connection()
+
+
+def _labeled(elements, label):
+    return next((element for element in elements if element.label == label), None)
+
+
+def _keyed(at, kind, key):
+    return next((element for element in at.get(kind) if element.key == key), None)
+
+
+def _type_title(at):
+    at.text_input[0].input(f"Reunião {random.random():.6f}")
+
+
+def _pick_date(at):
+    at.date_input[0].set_value(datetime.date(2025, random.randint(1, 12), random.randint(1, 28)))
+
+
+def _history_person(index):
+    def action(at):
+        person = _keyed(at, "selectbox", "history_person")
+        person.select(person.options[min(index, len(person.options) - 1)])
+    return action
+
+
+def _history_click(key):
+    def action(at):
+        button = _keyed(at, "button", key)
+        if button is not None and not button.disabled:
+            button.click()
+    return action
+
+
+# Interações de cada tela, repetidas em ciclo (uma por execução medida): os caminhos que
+# o orçamento protege — login com conferência da senha, paginação, filtro por participante,
+# arquivados, itens de ação, exportação e configurações salvas
+INTERACTIONS = {
+    "login": (
+        lambda at: _keyed(at, "text_input", "username").input("ana"),
+        lambda at: _keyed(at, "text_input", "password").input("senha-errada"),
+        lambda at: at.checkbox[0].check(),
+        lambda at: _labeled(at.button, "Entrar").click(),
+        lambda at: at.checkbox[0].uncheck(),
+    ),
+    "meeting": (
+        _type_title,
+        lambda at: at.text_area[0].input(random.choice(["Ana, Bruno", "Carla; Davi e Ana"])),
+        _pick_date,
+    ),
+    "diary": (
+        _type_title,
+        _pick_date,
+    ),
+    "history": (
+        lambda at: _keyed(at, "number_input", "history_page").increment(),
+        lambda at: _keyed(at, "checkbox", "history_show_archived").check(),
+        _history_person(1),
+        _history_click("history_person_next"),
+        _history_click("history_person_previous"),
+        lambda at: _keyed(at, "text_input", "history_action_owner").input("Ana"),
+        _history_person(0),
+        lambda at: _keyed(at, "checkbox", "history_show_archived").uncheck(),
+        lambda at: _keyed(at, "radio", "export_format").set_value("jsonl"),
+        _history_click("export_prepare"),
+    ),
+    "config": (
+        lambda at: at.text_input[0].input(f"sk-{random.random():.6f}"),
+        lambda at: _labeled(at.button, "Salvar Chave").click(),
+        lambda at: at.number_input[0].set_value(random.randint(1, 365)),
+        lambda at: _labeled(at.button, "Salvar Retenção").click(),
+    )
+}
+
+
+def _interact(at, screen, step):
+    # Cada mudança de widget reexecuta o script, como no navegador
+    actions = INTERACTIONS[screen]
+    actions[step % len(actions)](at)
+    at.run()
+
+
+def run_render_benchmark(screens=tuple(RENDER_BUDGETS), records=DEFAULT_RECORDS, reruns=DEFAULT_RERUNS,
+                         work_dir=None, timeout=60):
+    """
+    Mede as execuções de cada tela (a primeira, com imports e conexões frias, fica de fora).
+
+    :param screens: Telas avaliadas.
+    :param records: Registros do usuário na base de teste.
+    :param reruns: Execuções medidas por tela.
+    :param work_dir: Diretório de trabalho (temporário se omitido).
+    :param timeout: Tempo máximo de cada execução (s).
+    :return: Dicionário {tela: resumo do profiler (+ "error" se a tela falhou)}.
+    """
+    from streamlit.testing.v1 import AppTest
+    from monitoring import rerun_profiler
+
+    work_dir = work_dir or tempfile.mkdtemp(prefix="meetinggpt_render_")
+    os.makedirs(work_dir, exist_ok=True)
+    database_path = os.path.join(work_dir, "render.db")
+    if os.path.exists(database_path):
+        os.remove(database_path)
+    # Instrumenta antes de popular a base: no backend SQLAlchemy as conexões abertas
+    # aqui voltam ao pool e são reaproveitadas pelas telas
+    rerun_profiler.enable()
+    _seed(database_path, records, user_id=1)
+
+    results = {}
+    for screen in screens:
+        at = AppTest.from_function(_screen_app, args=(screen, database_path, 1), default_timeout=timeout)
+        at.run()
+        rerun_profiler.reset()
+        for step in range(reruns):
+            _interact(at, screen, step)
+        summary = rerun_profiler.rerun_summary(screen).get(screen, {})
+        errors = [element.value for element in at.exception] + [element.value for element in at.error]
+        if errors:
+            summary["error"] = str(errors[0])
+        results[screen] = summary
+        print(f"🖥️ {screen}: p50 {summary.get('p50_ms')} ms, p95 {summary.get('p95_ms')} ms, "
+              f"{summary.get('db_connections')} conexão(ões), {summary.get('queries')} consulta(s) por execução")
+    return results
+
+
+def check_budgets(results, budgets=RENDER_BUDGETS):
+    """
+    Compara os resultados com o orçamento.
+
+    :return: Lista de violações (tela, métrica, limite, medido).
+    """
+    violations = []
+    for screen, summary in results.items():
+        if "error" in summary:
+            violations.append((screen, "error", None, summary["error"]))
+            continue
+        for metric, limit in budgets.get(screen, {}).items():
+            if summary.get(metric, 0) > limit:
+                violations.append((screen, metric, limit, summary[metric]))
+    return violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Orçamento de execução (rerun) das telas do MeetingGPT.")
+    parser.add_argument("--screens", nargs="+", default=list(RENDER_BUDGETS), choices=list(RENDER_BUDGETS))
+    parser.add_argument("--records", type=int, default=DEFAULT_RECORDS, help="Registros do usuário na base de teste.")
+    parser.add_argument("--reruns", type=int, default=DEFAULT_RERUNS, help="Execuções medidas por tela.")
+    parser.add_argument("--output", help="Arquivo JSON de saída.")
+    args = parser.parse_args(argv)
+
+    results = run_render_benchmark(args.screens, args.records, args.reruns)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, ensure_ascii=False, indent=2)
+        print(f"📄 Resultados salvos em: {args.output}")
+
+    violations = check_budgets(results)
+    if violations:
+        print("❌ Orçamento de execução estourado:")
+        for screen, metric, limit, value in violations:
+            print(f"   {screen}.{metric}: {value} (limite {limit})")
+        return 1
+    print("✅ Todas as telas dentro do orçamento.")
+    return 0
+
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
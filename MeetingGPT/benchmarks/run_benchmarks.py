@@ -0,0 +1,127 @@
+"""
+Executa a suíte de benchmarks do MeetingGPT e compara com uma linha de base.
+
+Uso (a partir da pasta MeetingGPT):
+
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+
+from monitoring.logging_config import setup_logging
+
+# Métricas comparadas com a linha de base (quanto menor, melhor)
+_COMPARED_SUFFIXES = ("seconds", "peak_rss_mb", "_ms")
+
+
+def flatten(results, prefix=""):
+    """Achata o dicionário de resultados em chaves do tipo 'pipeline.60s.transcribe.seconds'."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    Compara os resultados atuais com a linha de base.
+
+    :param current: Resultados atuais.
+    :param baseline: Resultados de referência.
+    :param tolerance: Piora relativa tolerada (0.2 = 20%).
+    :return: Lista de regressões (métrica, base, atual, variação relativa).
+    """
+    regressions = []
+    current_flat = flatten(current.get("results", {}))
+    baseline_flat = flatten(baseline.get("results", {}))
+    for name, base_value in baseline_flat.items():
+        if not name.endswith(_COMPARED_SUFFIXES) or name not in current_flat or base_value <= 0:
+            continue
+        change = (current_flat[name] - base_value) / base_value
+        if change > tolerance:
+            regressions.append((name, base_value, current_flat[name], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline e do banco de dados do MeetingGPT.")
+    parser.add_argument("--durations", type=int, nargs="+", default=[10, 60, 300], help="Durações (s) dos áudios sintéticos.")
+    parser.add_argument("--db-sizes", type=int, nargs="+", default=[1000, 100000], help="Tamanhos da tabela 'meetings'.")
+    parser.add_argument("--skip-pipeline", action="store_true")
+    parser.add_argument("--skip-db", action="store_true")
+    parser.add_argument("--skip-diarization", action="store_true")
+    parser.add_argument("--skip-render", action="store_true")
+    parser.add_argument("--diarization-durations", type=int, nargs="+", default=[300, 3600],
+                        help="Durações (s) das conversas sintéticas diarizadas.")
+    parser.add_argument("--asr-latency", type=float, default=0.5, help="Latência simulada da transcrição (s).")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Latência simulada do LLM (s).")
+    parser.add_argument("--output", default="bench_results.json", help="Arquivo JSON de saída.")
+    parser.add_argument("--baseline", help="Arquivo JSON de referência para comparação.")
+    parser.add_argument("--save-baseline", help="Salva os resultados também como nova linha de base.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Piora relativa tolerada antes de acusar regressão.")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="meetinggpt_bench_")
+    results = {}
+    if not args.skip_pipeline:
+        from benchmarks.pipeline_benchmark import run_pipeline_benchmark
+        from benchmarks.stub_openai_server import StubConfig
+
+        stub_config = StubConfig(asr_latency=args.asr_latency, llm_latency=args.llm_latency)
+        results["pipeline"] = run_pipeline_benchmark(args.durations, os.path.join(work_dir, "pipeline"), stub_config)
+    if not args.skip_db:
+        from benchmarks.db_benchmark import run_db_benchmark
+
+        results["db"] = run_db_benchmark(args.db_sizes, os.path.join(work_dir, "db"))
+    if not args.skip_diarization:
+        from benchmarks.diarization_benchmark import run_diarization_benchmark
+
+        results["diarization"] = run_diarization_benchmark(args.diarization_durations, work_dir=os.path.join(work_dir, "diarization"))
+    if not args.skip_render:
+        from benchmarks.render_budget import run_render_benchmark
+
+        results["render"] = run_render_benchmark(work_dir=os.path.join(work_dir, "render"))
+
+    report = {
+        "meta": {
+            "generated_at": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "asr_latency": args.asr_latency,
+            "llm_latency": args.llm_latency
+        },
+        "results": results
+    }
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, ensure_ascii=False, indent=2)
+        print(f"📄 Resultados salvos em: {path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as json_file:
+            baseline = json.load(json_file)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("❌ Regressões encontradas:")
+            for name, base_value, value, change in regressions:
+                print(f"   {name}: {base_value} -> {value} (+{change:.0%})")
+            return 1
+        print("✅ Nenhuma regressão em relação à linha de base.")
+    return 0
+
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Vocabulário usado para gerar transcrições/insights sintéticos
+_WORDS = (
+    "reunião projeto cliente prazo entrega equipe orçamento revisão contrato "
+    "cronograma relatório decisão ação responsável próxima semana validar proposta"
+).split()
+
+# Bytes de WAV (44,1 kHz, 16 bits, mono) por segundo de áudio
+_WAV_BYTES_PER_SECOND = 44100 * 2
+
+
+def _fake_text(n_words, offset=0):
+    """Gera um texto determinístico com ``n_words`` palavras."""
+    words = [_WORDS[(i + offset) % len(_WORDS)] for i in range(max(n_words, 1))]
+    sentences = [" ".join(words[i:i + 12]).capitalize() + "." for i in range(0, len(words), 12)]
+    return " ".join(sentences)
+
+
+class StubConfig:
+    def __init__(self, asr_latency=0.5, asr_latency_per_mb=0.05, llm_latency=1.0, llm_latency_per_token=0.002,
+                 words_per_second=2.5, completion_tokens=400):
+        """
+        Configuração das latências simuladas do servidor stub.
+
+        :param asr_latency: Latência fixa (s) do endpoint de transcrição.
+        :param asr_latency_per_mb: Latência adicional (s) por MB de áudio enviado.
+        :param llm_latency: Latência fixa (s) do endpoint de chat.
+        :param llm_latency_per_token: Latência adicional (s) por token gerado.
+        :param words_per_second: Palavras "faladas" por segundo de áudio.
+        :param completion_tokens: Tokens gerados em cada resposta de chat.
+        """
+        self.asr_latency = asr_latency
+        self.asr_latency_per_mb = asr_latency_per_mb
+        self.llm_latency = llm_latency
+        self.llm_latency_per_token = llm_latency_per_token
+        self.words_per_second = words_per_second
+        self.completion_tokens = completion_tokens
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    config = StubConfig()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Silencia o log padrão do http.server para não distorcer as medições
+        pass
+
+    def _read_body(self):
+        """Lê o corpo da requisição em blocos, sem mantê-lo inteiro em memória."""
+        remaining = int(self.headers.get("Content-Length", 0))
+        total = remaining
+        first_chunk = b""
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            if not first_chunk:
+                first_chunk = chunk
+            remaining -= len(chunk)
+        return total, first_chunk
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        cfg = self.config
+        if self.path.endswith("/audio/transcriptions"):
+            size, _ = self._read_body()
+            time.sleep(cfg.asr_latency + cfg.asr_latency_per_mb * size / (1024 * 1024))
+            seconds = size / _WAV_BYTES_PER_SECOND
+            # Formato verbose_json: texto completo e segmentos de ~5 s com tempo
+            segments = [
+                {"id": i, "start": start, "end": min(start + 5.0, seconds),
+                 "text": " " + _fake_text(int(5 * cfg.words_per_second), i)}
+                for i, start in enumerate(float(s) for s in range(0, max(int(seconds), 1), 5))
+            ]
+            self._send_json({
+                "task": "transcribe",
+                "language": "portuguese",
+                "duration": seconds,
+                "text": "".join(segment["text"] for segment in segments).strip(),
+                "segments": segments
+            })
+        elif self.path.endswith("/chat/completions"):
+            # Corpo do chat lido inteiro: o response_format pode vir depois de um prompt longo
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                request = json.loads(body.decode("utf-8", errors="ignore"))
+            except ValueError:
+                request = {}
+            model = request.get("model", "gpt-4o-mini")
+            time.sleep(cfg.llm_latency + cfg.llm_latency_per_token * cfg.completion_tokens)
+            if request.get("response_format"):
+                # Saída estruturada (JSON Schema dos insights)
+                content = json.dumps({
+                    "summary": _fake_text(40)[:300],
+                    "topics": [_fake_text(3, 3), _fake_text(3, 7)],
+                    "insights": [_fake_text(12, 1), _fake_text(12, 5)],
+                    "decisions": [_fake_text(10, 9)],
+                    "risks": [_fake_text(10, 4)],
+                    "action_items": [{"task": _fake_text(8, 2), "owner": "Maria", "due_date": "2025-01-31"},
+                                     {"task": _fake_text(8, 11), "owner": None, "due_date": None}]
+                }, ensure_ascii=False)
+            else:
+                content = "Resumo: " + _fake_text(40) + "\n\nTopicos abordados:\n- " + _fake_text(8, 3) + "\n- " + _fake_text(8, 7)
+            self._send_json({
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": cfg.completion_tokens,
+                          "total_tokens": cfg.completion_tokens}
+            })
+        else:
+            self._read_body()
+            self._send_json({"error": {"message": f"Endpoint não suportado: {self.path}"}}, status=404)
+
+
+def start_stub_server(host="127.0.0.1", port=0, config=None):
+    """
+    Inicia o servidor stub em uma thread daemon.
+
+    :param host: Endereço de escuta.
+    :param port: Porta de escuta (0 = porta livre aleatória).
+    :param config: Instância de StubConfig (opcional).
+    :return: Tupla (servidor, base_url) — base_url já inclui o sufixo ``/v1``.
+    """
+    handler = type("StubHandler", (_StubHandler,), {"config": config or StubConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="stub-openai", daemon=True)
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}/v1"
+    return server, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor stub compatível com os endpoints da OpenAI usados pelo MeetingGPT.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--asr-latency", type=float, default=0.5)
+    parser.add_argument("--asr-latency-per-mb", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--llm-latency-per-token", type=float, default=0.002)
+    args = parser.parse_args()
+
+    stub_config = StubConfig(args.asr_latency, args.asr_latency_per_mb, args.llm_latency, args.llm_latency_per_token)
+    stub_server, url = start_stub_server(args.host, args.port, stub_config)
+    print(f"🧪 Servidor stub da OpenAI em execução: {url} (Ctrl+C para encerrar)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub_server.shutdown()
@@ -0,0 +1,112 @@
+import os
+import wave
+import numpy as np
+
+# Durações padrão (em segundos) usadas pelos benchmarks
+DEFAULT_DURATIONS = (10, 60, 300)
+
+
+def generate_speech_like(duration_s, sample_rate=44100, seed=0, f0_hz=160, brightness=1.0):
+    """
+    Gera um sinal sintético com características de fala (voz com harmônicos,
+    sílabas de ~4 Hz, pausas entre frases e ruído de fundo).
+
+    :param duration_s: Duração do sinal em segundos.
+    :param sample_rate: Taxa de amostragem em Hz.
+    :param seed: Semente do gerador aleatório (resultados reprodutíveis).
+    :param f0_hz: Frequência fundamental média (timbre do falante).
+    :param brightness: Decaimento dos harmônicos (maior = voz mais "aberta").
+    :return: Array int16 mono com as amostras.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(duration_s * sample_rate)
+    t = np.arange(n, dtype=np.float64) / sample_rate
+
+    # Frequência fundamental variando lentamente entre ~100 e ~220 Hz (entonação)
+    f0 = f0_hz + 0.3 * f0_hz * np.sin(2 * np.pi * 0.3 * t + rng.uniform(0, np.pi)) + 10 * np.sin(2 * np.pi * 2.1 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+
+    # Harmônicos com decaimento (aproximação do trato vocal)
+    voice = np.zeros(n, dtype=np.float64)
+    for k in range(1, 9):
+        voice += np.sin(k * phase) / k ** (1.0 / brightness)
+
+    # Envelope silábico (~4 sílabas por segundo)
+    syllables = np.clip(np.sin(2 * np.pi * 4.0 * t + rng.uniform(0, np.pi)), 0, None) ** 2
+
+    # Pausas entre frases: blocos de 0,5 s silenciados aleatoriamente (~20%)
+    block = int(0.5 * sample_rate)
+    n_blocks = n // block + 1
+    gate = np.repeat(rng.random(n_blocks) > 0.2, block)[:n].astype(np.float64)
+
+    signal = voice * syllables * gate
+    signal += 0.01 * rng.standard_normal(n)  # Ruído de fundo
+    signal /= max(np.max(np.abs(signal)), 1e-9)
+    return (signal * 0.6 * 32767).astype(np.int16)
+
+
+def write_wav(path, samples, sample_rate=44100):
+    """
+    Salva amostras int16 mono em um arquivo WAV.
+
+    :param path: Caminho do arquivo de saída.
+    :param samples: Array int16 com as amostras.
+    :param sample_rate: Taxa de amostragem em Hz.
+    :return: Caminho do arquivo salvo.
+    """
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.tobytes())
+    return path
+
+
+def generate_conversation(duration_s, sample_rate=16000, n_speakers=2, turn_s=(3, 12), seed=0):
+    """
+    Gera uma conversa sintética alternando falantes com timbres distintos.
+
+    :param duration_s: Duração total em segundos.
+    :param sample_rate: Taxa de amostragem em Hz.
+    :param n_speakers: Número de falantes.
+    :param turn_s: Duração mínima e máxima de cada turno (s).
+    :param seed: Semente do gerador aleatório.
+    :return: (amostras int16, lista de turnos {"speaker", "start", "end"}).
+    """
+    rng = np.random.default_rng(seed)
+    voices = [(110 + 75 * i, 0.6 + 0.8 * i) for i in range(n_speakers)]
+    chunks, turns, position, speaker = [], [], 0.0, 0
+    while position < duration_s:
+        length = min(rng.uniform(*turn_s), duration_s - position)
+        f0_hz, brightness = voices[speaker]
+        chunks.append(generate_speech_like(length, sample_rate, seed=int(rng.integers(1 << 31)),
+                                           f0_hz=f0_hz, brightness=brightness))
+        turns.append({"speaker": speaker, "start": round(position, 2), "end": round(position + length, 2)})
+        position += length
+        speaker = (speaker + int(rng.integers(1, n_speakers))) % n_speakers if n_speakers > 1 else 0
+    return np.concatenate(chunks), turns
+
+
+def generate_wav_set(directory, durations=DEFAULT_DURATIONS, sample_rate=44100):
+    """
+    Gera um conjunto de WAVs sintéticos com as durações informadas.
+
+    :param directory: Diretório onde os arquivos serão criados.
+    :param durations: Durações em segundos.
+    :param sample_rate: Taxa de amostragem em Hz.
+    :return: Dicionário {duração: caminho do arquivo}.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for duration in durations:
+        path = os.path.join(directory, f"synthetic_{duration}s.wav")
+        if not os.path.exists(path):
+            write_wav(path, generate_speech_like(duration, sample_rate, seed=duration), sample_rate)
+        paths[duration] = path
+    return paths
+
+
+if __name__ == "__main__":
+    generated = generate_wav_set(os.path.join("bench_data", "audio"))
+    for seconds, file_path in generated.items():
+        print(f"🎧 {seconds}s -> {file_path}")
@@ -0,0 +1,167 @@
+import argparse
+import datetime
+import logging
+from utils.text import split_participants
+from monitoring.logging_config import setup_logging
+
+# Linhas lidas por vez na reconstrução (memória constante)
+REBUILD_BATCH = 500
+
+
+def week_start(date_text):
+    """Segunda-feira da semana da data (AAAA-MM-DD) ou None se a data for inválida."""
+    try:
+        day = datetime.date.fromisoformat(str(date_text)[:10])
+    except ValueError:
+        return None
+    return (day - datetime.timedelta(days=day.weekday())).isoformat()
+
+
+def record_minutes(record):
+    """
+    Duração do registro em minutos a partir de start_time/end_time ('HH:MM').
+
+    Um término anterior ao início é tratado como virada da meia-noite.
+    """
+    try:
+        start = datetime.datetime.strptime(record["start_time"], "%H:%M")
+        end = datetime.datetime.strptime(record["end_time"], "%H:%M")
+    except (TypeError, ValueError, KeyError):
+        return 0
+    return int((end - start).total_seconds() // 60) % (24 * 60)
+
+
+def create_tables(connection):
+    """
+    Cria as tabelas agregadas do painel do histórico (por semana, totais e por
+    participante), mantidas a cada escrita por ``apply_record``; um banco anterior
+    a elas é preenchido uma única vez.
+
+    :param connection: Conexão com o banco de reuniões.
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.executescript('''
+            CREATE TABLE IF NOT EXISTS analytics_weekly (
+                user_id INTEGER NOT NULL,
+                week_start TEXT NOT NULL,  -- segunda-feira (AAAA-MM-DD)
+                type TEXT NOT NULL,
+                records INTEGER NOT NULL DEFAULT 0,
+                minutes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, week_start, type)
+            );
+
+            CREATE TABLE IF NOT EXISTS analytics_totals (
+                user_id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                records INTEGER NOT NULL DEFAULT 0,
+                minutes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, type)
+            );
+
+            CREATE TABLE IF NOT EXISTS analytics_participants (
+                user_id INTEGER NOT NULL,
+                participant_key TEXT NOT NULL,  -- nome sem acentos/minúsculas
+                participant TEXT NOT NULL,
+                meetings INTEGER NOT NULL DEFAULT 0,
+                minutes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, participant_key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_analytics_participants_top ON analytics_participants(user_id, meetings);
+        ''')
+        connection.commit()
+        logging.info("✅ Tabelas de analytics criadas/verificadas com sucesso.")
+
+        # Banco anterior às tabelas de analytics: preenche uma única vez
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM analytics_totals), EXISTS (SELECT 1 FROM meetings)")
+        has_analytics, has_records = cursor.fetchone()
+        if has_records and not has_analytics:
+            rebuild(connection)
+    except Exception as e:
+        logging.error(f"❌ Erro ao criar as tabelas de analytics: {e}")
+        raise
+
+
+def apply_record(cursor, record, sign=1):
+    """
+    Soma (sign=1) ou subtrai (sign=-1) um registro das tabelas de analytics.
+
+    Executado pelo caminho de escrita, na mesma transação da alteração do registro.
+
+    :param cursor: Cursor da conexão (transação do chamador).
+    :param record: Dicionário/Row com user_id, type, date, start_time, end_time e participants.
+    :param sign: 1 ao inserir, -1 ao excluir.
+    """
+    week = week_start(record["date"])
+    minutes = record_minutes(record)
+    if week:
+        cursor.execute('''
+            INSERT INTO analytics_weekly (user_id, week_start, type, records, minutes) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, week_start, type) DO UPDATE SET
+                records = records + excluded.records, minutes = minutes + excluded.minutes
+        ''', (record["user_id"], week, record["type"], sign, sign * minutes))
+    cursor.execute('''
+        INSERT INTO analytics_totals (user_id, type, records, minutes) VALUES (?, ?, ?, ?)
+        ON CONFLICT(user_id, type) DO UPDATE SET
+            records = records + excluded.records, minutes = minutes + excluded.minutes
+    ''', (record["user_id"], record["type"], sign, sign * minutes))
+    if record["type"] == "meeting":
+        cursor.executemany('''
+            INSERT INTO analytics_participants (user_id, participant_key, participant, meetings, minutes)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, participant_key) DO UPDATE SET
+                meetings = meetings + excluded.meetings, minutes = minutes + excluded.minutes
+        ''', [(record["user_id"], key, name, sign, sign * minutes)
+              for key, name in split_participants(record["participants"])])
+    if sign < 0:
+        # Linhas zeradas (tudo excluído) não precisam ocupar espaço
+        cursor.execute("DELETE FROM analytics_weekly WHERE user_id = ? AND records <= 0", (record["user_id"],))
+        cursor.execute("DELETE FROM analytics_participants WHERE user_id = ? AND meetings <= 0", (record["user_id"],))
+
+
+def rebuild(connection, user_id=None):
+    """
+    Reconstrói as tabelas de analytics a partir de 'meetings' (backfill ou correção).
+
+    :param connection: Conexão com o banco de reuniões.
+    :param user_id: Reconstrói apenas um usuário (opcional).
+    :return: Quantidade de registros processados.
+    """
+    where, params = ("WHERE user_id = ?", (user_id,)) if user_id is not None else ("", ())
+    processed = 0
+    writer, reader = connection.cursor(), connection.cursor()
+    with connection:
+        for table in ("analytics_weekly", "analytics_totals", "analytics_participants"):
+            writer.execute(f"DELETE FROM {table} {where}", params)
+        reader.execute(
+            f"SELECT user_id, type, date, start_time, end_time, participants FROM meetings {where} ORDER BY id", params
+        )
+        while True:
+            rows = reader.fetchmany(REBUILD_BATCH)
+            if not rows:
+                break
+            for row in rows:
+                apply_record(writer, row)
+            processed += len(rows)
+    logging.info(f"📊 Analytics reconstruídos: {processed} registro(s).")
+    return processed
+
+
+# Execução manual: python -m database.analytics --rebuild [--user-id N]
+if __name__ == "__main__":
+    setup_logging()
+    from database.repository import get_meeting_repository
+
+    parser = argparse.ArgumentParser(description="Manutenção das tabelas de analytics do histórico.")
+    parser.add_argument("--rebuild", action="store_true", help="Recalcula as tabelas a partir de 'meetings'.")
+    parser.add_argument("--user-id", type=int, default=None, help="Restringe a um usuário.")
+    args = parser.parse_args()
+
+    database = get_meeting_repository()
+    try:
+        if args.rebuild:
+            print(f"📊 {rebuild(database.connection, args.user_id)} registro(s) processado(s).")
+        else:
+            parser.print_help()
+    finally:
+        database.close_connection()
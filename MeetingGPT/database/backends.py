@@ -0,0 +1,162 @@
+import os
+import sqlite3
+import logging
+import threading
+
+# URL do SQLAlchemy, apenas sqlite (ex.: sqlite:////dados/meetinggpt.db). Sem ela, sqlite3 direto no arquivo local
+DATABASE_URL = os.environ.get("MEETINGGPT_DATABASE_URL", "")
+
+# Pool de conexões do backend SQLAlchemy (compartilhado pelas sessões do processo)
+POOL_SIZE = int(os.environ.get("MEETINGGPT_DB_POOL_SIZE", 5))
+POOL_MAX_OVERFLOW = int(os.environ.get("MEETINGGPT_DB_POOL_OVERFLOW", 10))
+POOL_TIMEOUT = int(os.environ.get("MEETINGGPT_DB_POOL_TIMEOUT", 30))
+
+# Cache do histórico em memória com o SQLAlchemy: desligado por padrão, pois as escritas de
+# outro processo no mesmo arquivo (ex.: vários workers no host) não invalidariam o cache deste
+POOL_PROCESS_CACHE = os.environ.get("MEETINGGPT_DB_PROCESS_CACHE", "off").lower() == "on"
+
+
+class SQLiteBackend:
+    name = "sqlite"
+    process_cache = True  # um único processo escreve no arquivo
+
+    def __init__(self):
+        """
+        Uma conexão sqlite3 por repositório, aberta no arquivo informado a cada ``connect``
+        (o caminho vem do módulo do repositório, que os benchmarks redirecionam).
+        """
+        self._schemas = set()
+        self._lock = threading.Lock()
+
+    def connect(self, path, read_only=False):
+        """
+        Abre uma conexão (linhas como sqlite3.Row).
+
+        :param path: Arquivo do banco.
+        :param read_only: Abre somente leitura (exports).
+        :return: (conexão, lease); o lease é devolvido em ``release``.
+        """
+        if read_only:
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+        else:
+            connection = sqlite3.connect(path)
+        connection.row_factory = sqlite3.Row
+        return connection, connection
+
+    def release(self, lease):
+        """Fecha a conexão."""
+        lease.close()
+
+    def needs_schema(self, path, schema):
+        """
+        Indica se as tabelas ``schema`` ainda não foram criadas/verificadas neste processo
+        (um arquivo apagado e recriado no mesmo caminho é verificado de novo).
+        """
+        with self._lock:
+            return (os.path.abspath(path), schema) not in self._schemas or not os.path.exists(path)
+
+    def schema_ready(self, path, schema):
+        """Registra que as tabelas ``schema`` já foram verificadas para o arquivo."""
+        with self._lock:
+            self._schemas.add((os.path.abspath(path), schema))
+
+
+class SQLAlchemyBackend:
+    name = "sqlalchemy"
+
+    def __init__(self, url, pool_size=POOL_SIZE, max_overflow=POOL_MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT,
+                 process_cache=POOL_PROCESS_CACHE, **engine_options):
+        """
+        Conexões emprestadas de um pool do SQLAlchemy (QueuePool, com pre-ping), reaproveitadas
+        entre execuções e sessões em vez de abertas a cada rerun.
+
+        As consultas dos repositórios usam o dialeto do SQLite: só URLs ``sqlite`` são aceitas
+        (arquivo ou memória nos testes de contrato). O pool serve um único host; várias réplicas
+        sobre um banco servidor (PostgreSQL, MySQL) estão fora do escopo deste backend.
+
+        :param url: URL do SQLAlchemy.
+        :param pool_size: Conexões mantidas abertas no pool.
+        :param max_overflow: Conexões extras permitidas em picos.
+        :param pool_timeout: Espera máxima (s) por uma conexão livre.
+        :param process_cache: Usa o cache do histórico em memória (apenas com um único processo).
+        :param engine_options: Opções adicionais de ``create_engine`` (ex.: poolclass).
+        """
+        if not url.startswith("sqlite"):
+            raise ValueError(
+                f"MEETINGGPT_DATABASE_URL não suportada: '{url.split(':', 1)[0]}'. Os repositórios usam SQL "
+                "do SQLite; informe uma URL sqlite:// (ex.: sqlite:////dados/meetinggpt.db)."
+            )
+        try:
+            from sqlalchemy import create_engine, event
+        except ImportError as e:
+            raise RuntimeError("O backend SQLAlchemy exige o pacote 'sqlalchemy' instalado.") from e
+
+        if "poolclass" not in engine_options:
+            engine_options.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout)
+        # O pool entrega a mesma conexão a threads diferentes (uma por sessão do Streamlit)
+        engine_options.setdefault("connect_args", {"check_same_thread": False, "timeout": 30})
+        self.url = url
+        self.process_cache = process_cache
+        self.engine = create_engine(url, pool_pre_ping=True, **engine_options)
+        self._schemas = set()
+        self._lock = threading.Lock()
+
+        @event.listens_for(self.engine, "connect")
+        def _configure(dbapi_connection, connection_record):
+            dbapi_connection.row_factory = sqlite3.Row
+
+        logging.info(f"🔗 Backend SQLAlchemy configurado ({self.engine.url.render_as_string(hide_password=True)}).")
+
+    def connect(self, path=None, read_only=False):
+        """
+        Empresta uma conexão do pool (``path`` e ``read_only`` são ignorados: vale a URL).
+
+        :return: (conexão do driver, lease do pool).
+        """
+        lease = self.engine.raw_connection()
+        return lease.driver_connection, lease
+
+    def release(self, lease):
+        """Devolve a conexão ao pool (transações pendentes são desfeitas)."""
+        lease.close()
+
+    def needs_schema(self, path, schema):
+        """Indica se as tabelas ``schema`` ainda não foram verificadas neste processo."""
+        with self._lock:
+            return schema not in self._schemas
+
+    def schema_ready(self, path, schema):
+        """Registra que as tabelas ``schema`` já foram verificadas."""
+        with self._lock:
+            self._schemas.add(schema)
+
+    def dispose(self):
+        """Fecha as conexões do pool."""
+        self.engine.dispose()
+
+
+# Backend compartilhado pelo processo
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Retorna o backend do processo: SQLAlchemy se MEETINGGPT_DATABASE_URL estiver definida, senão SQLite."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = SQLAlchemyBackend(DATABASE_URL) if DATABASE_URL else SQLiteBackend()
+        return _backend
+
+
+def set_backend(backend):
+    """
+    Substitui o backend do processo (testes de contrato e benchmarks).
+
+    :param backend: SQLiteBackend, SQLAlchemyBackend ou None para voltar à configuração do ambiente.
+    :return: Backend anterior.
+    """
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+        return previous
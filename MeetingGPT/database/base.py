@@ -0,0 +1,39 @@
+import logging
+from database.backends import get_backend
+
+
+class ConnectionRepository:
+    def __init__(self, backend=None, share=None):
+        """
+        Conexão dos repositórios do banco de reuniões: própria (obtida do backend, com as
+        tabelas criadas/verificadas na primeira conexão do processo) ou a de outro repositório.
+
+        :param backend: Backend de conexões (padrão: ``database.backends.get_backend()``).
+        :param share: Repositório cuja conexão é reaproveitada (opcional); quem a abriu a fecha.
+        """
+        try:
+            if share is not None:
+                self.backend, self.connection, self._lease = share.backend, share.connection, None
+            else:
+                from database.database_meeting import open_connection
+                self.backend = backend or get_backend()
+                self.connection, self._lease = open_connection(self.backend)
+            self.cursor = self.connection.cursor()
+        except Exception as e:
+            logging.error(f"❌ Erro ao conectar ao banco de dados: {e}")
+            raise
+
+    def close_connection(self):
+        """
+        Fecha a conexão com o banco de dados. Em um repositório que compartilha a conexão
+        de outro, não faz nada: a conexão é fechada por quem a abriu.
+        """
+        if self._lease is None:
+            return
+        try:
+            self.cursor.close()
+            self.backend.release(self._lease)
+            logging.info("🔌 Conexão com o banco de dados fechada.")
+        except Exception as e:
+            logging.error(f"❌ Erro ao fechar a conexão com o banco de dados: {e}")
+            raise
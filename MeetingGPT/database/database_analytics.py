@@ -0,0 +1,100 @@
+from monitoring.metrics import timed
+from utils.text import normalize_key
+from database.base import ConnectionRepository
+from database.repository import AnalyticsRepository
+
+
+class DatabaseAnalytics(ConnectionRepository, AnalyticsRepository):
+    """
+    Leituras do painel do histórico e do índice de participantes; as tabelas são
+    mantidas pelo caminho de escrita dos registros (``database.analytics`` e ``database.people``).
+    """
+
+    def fetch_analytics(self, user_id, weeks=12, top_participants=10):
+        """
+        Dados do painel do histórico, lidos das tabelas agregadas (custo independente
+        do tamanho do histórico).
+
+        :param user_id: ID do usuário.
+        :param weeks: Semanas mais recentes exibidas.
+        :param top_participants: Participantes mais frequentes exibidos.
+        :return: Dicionário com "totals", "weekly" e "participants".
+        """
+        with timed("db", operation="fetch_analytics"):
+            self.cursor.execute("SELECT type, records, minutes FROM analytics_totals WHERE user_id = ?", (user_id,))
+            totals = {row["type"]: dict(row) for row in self.cursor.fetchall()}
+            self.cursor.execute('''
+                SELECT week_start, type, records, minutes FROM analytics_weekly
+                WHERE user_id = ? AND week_start IN (
+                    SELECT DISTINCT week_start FROM analytics_weekly WHERE user_id = ?
+                    ORDER BY week_start DESC LIMIT ?
+                )
+                ORDER BY week_start
+            ''', (user_id, user_id, weeks))
+            weekly = [dict(row) for row in self.cursor.fetchall()]
+            self.cursor.execute('''
+                SELECT participant, meetings, minutes FROM analytics_participants
+                WHERE user_id = ? ORDER BY meetings DESC, minutes DESC LIMIT ?
+            ''', (user_id, top_participants))
+            participants = [dict(row) for row in self.cursor.fetchall()]
+        return {"totals": totals, "weekly": weekly, "participants": participants}
+
+    def fetch_people(self, user_id):
+        """
+        Participantes do usuário que aparecem em pelo menos um registro.
+
+        :param user_id: ID do usuário.
+        :return: Lista de dicionários com id, person_key e display_name, em ordem alfabética.
+        """
+        with timed("db", operation="fetch_people"):
+            self.cursor.execute('''
+                SELECT id, person_key, display_name FROM people p
+                WHERE user_id = ? AND EXISTS (SELECT 1 FROM meeting_participants WHERE person_id = p.id)
+                ORDER BY person_key
+            ''', (user_id,))
+            return [dict(row) for row in self.cursor.fetchall()]
+
+    def fetch_person_timeline(self, user_id, person, limit=50, before=None, include_archived=True):
+        """
+        Linha do tempo de um participante: registros em que ele aparece, do mais recente
+        ao mais antigo, paginados pelo índice (custo proporcional à página, não ao histórico).
+
+        :param user_id: ID do usuário.
+        :param person: Nome do participante (maiúsculas e acentos são ignorados).
+        :param limit: Registros por página.
+        :param before: (data, id) do último registro da página anterior (opcional).
+        :param include_archived: Inclui os registros arquivados.
+        :return: Lista de dicionários (sem transcrição nem insights).
+        """
+        query = '''
+            SELECT m.id, m.type, m.title, m.participants, m.date, m.start_time, m.end_time,
+                   m.summary_preview, m.tags, m.archived
+            FROM meeting_participants mp JOIN meetings m ON m.id = mp.meeting_id
+            WHERE mp.person_id = (SELECT id FROM people WHERE user_id = ? AND person_key = ?)
+        '''
+        params = [user_id, normalize_key(person)]
+        if before:
+            query += " AND (mp.meeting_date, mp.meeting_id) < (?, ?)"
+            params.extend(before)
+        if not include_archived:
+            query += " AND m.archived = 0"
+        query += " ORDER BY mp.meeting_date DESC, mp.meeting_id DESC LIMIT ?"
+        params.append(limit)
+        with timed("db", operation="fetch_person_timeline"):
+            self.cursor.execute(query, params)
+            return [dict(row) for row in self.cursor.fetchall()]
+
+    def fetch_person_record_ids(self, user_id, person):
+        """
+        IDs de todos os registros em que o participante aparece (filtro do histórico).
+
+        :param user_id: ID do usuário.
+        :param person: Nome do participante (maiúsculas e acentos são ignorados).
+        :return: Conjunto de IDs.
+        """
+        with timed("db", operation="fetch_person_record_ids"):
+            self.cursor.execute('''
+                SELECT meeting_id FROM meeting_participants
+                WHERE person_id = (SELECT id FROM people WHERE user_id = ? AND person_key = ?)
+            ''', (user_id, normalize_key(person)))
+            return {row["meeting_id"] for row in self.cursor.fetchall()}
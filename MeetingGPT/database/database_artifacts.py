@@ -0,0 +1,257 @@
+import os
+import logging
+from database.base import ConnectionRepository
+from database.repository import ArtifactRepository
+
+
+def create_tables(connection):
+    """
+    Cria as tabelas de artefatos (áudios, gravações, JSONs) e de políticas de retenção.
+
+    :param connection: Conexão com o banco de reuniões.
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.executescript('''
+            CREATE TABLE IF NOT EXISTS artifacts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                meeting_id INTEGER,
+                user_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,  -- 'audio', 'recording', 'transcript' ou 'insights'
+                path TEXT NOT NULL,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                codec TEXT,
+                state TEXT NOT NULL DEFAULT 'raw',  -- 'raw', 'transcoded', 'failed' ou 'deleted'
+                created_at TEXT NOT NULL DEFAULT (datetime('now')),
+                attempts INTEGER NOT NULL DEFAULT 0,  -- falhas de compressão
+                next_attempt_at TEXT,  -- nova tentativa de compressão não antes desta data
+                FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE
+            );
+            CREATE INDEX IF NOT EXISTS idx_artifacts_meeting ON artifacts(meeting_id);
+            CREATE INDEX IF NOT EXISTS idx_artifacts_state ON artifacts(state, kind);
+            CREATE INDEX IF NOT EXISTS idx_artifacts_user_created ON artifacts(user_id, created_at);
+
+            CREATE TABLE IF NOT EXISTS retention_policies (
+                user_id INTEGER PRIMARY KEY,
+                retention_days INTEGER NOT NULL  -- 0 = manter para sempre
+            );
+        ''')
+        # Bancos criados antes das novas tentativas de compressão
+        cursor.execute("PRAGMA table_info(artifacts)")
+        columns = [row["name"] for row in cursor.fetchall()]
+        if "attempts" not in columns:
+            cursor.execute("ALTER TABLE artifacts ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            logging.info("✅ Coluna 'attempts' adicionada com sucesso na tabela 'artifacts'.")
+        if "next_attempt_at" not in columns:
+            cursor.execute("ALTER TABLE artifacts ADD COLUMN next_attempt_at TEXT")
+            logging.info("✅ Coluna 'next_attempt_at' adicionada com sucesso na tabela 'artifacts'.")
+        connection.commit()
+        logging.info("✅ Tabelas 'artifacts' e 'retention_policies' criadas/verificadas com sucesso.")
+    except Exception as e:
+        logging.error(f"❌ Erro ao criar as tabelas de artefatos: {e}")
+        raise
+
+
+def delete_record_artifacts(cursor, owned, params):
+    """
+    Remove os artefatos dos registros excluídos (sem commit: transação de quem chama).
+
+    :param cursor: Cursor da conexão.
+    :param owned: Subconsulta com os IDs dos registros excluídos.
+    :param params: Parâmetros da subconsulta.
+    :return: Lista de dicionários com os artefatos ativos removidos.
+    """
+    cursor.execute(f"SELECT * FROM artifacts WHERE state != 'deleted' AND meeting_id IN ({owned})", params)
+    artifacts = [dict(row) for row in cursor.fetchall()]
+    cursor.execute(f"DELETE FROM artifacts WHERE meeting_id IN ({owned})", params)
+    return artifacts
+
+
+def path_referenced(cursor, path):
+    """Indica se algum artefato ativo ainda aponta para o arquivo."""
+    cursor.execute("SELECT 1 FROM artifacts WHERE path = ? AND state != 'deleted' LIMIT 1", (path,))
+    return cursor.fetchone() is not None
+
+
+class DatabaseArtifacts(ConnectionRepository, ArtifactRepository):
+    def register_artifact(self, meeting_id, user_id, kind, path, codec=None):
+        """
+        Vincula um arquivo (ou diretório) gerado pelo pipeline a uma reunião/diário.
+
+        :param meeting_id: ID do registro na tabela 'meetings'.
+        :param user_id: ID do usuário dono do artefato.
+        :param kind: 'audio', 'recording', 'transcript' ou 'insights'.
+        :param path: Caminho do arquivo ou diretório.
+        :param codec: Formato do conteúdo (ex.: 'wav', 'opus', 'json').
+        :return: ID do artefato.
+        """
+        try:
+            if os.path.isdir(path):
+                size = sum(os.path.getsize(os.path.join(dirpath, name))
+                           for dirpath, _, names in os.walk(path) for name in names)
+            else:
+                size = os.path.getsize(path) if os.path.exists(path) else 0
+            self.cursor.execute('''
+                INSERT INTO artifacts (meeting_id, user_id, kind, path, bytes, codec)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (meeting_id, user_id, kind, path, size, codec))
+            self.connection.commit()
+            logging.info(f"📎 Artefato '{kind}' vinculado ao registro {meeting_id}: {path}")
+            return self.cursor.lastrowid
+        except Exception as e:
+            logging.error(f"❌ Erro ao registrar artefato {path}: {e}")
+            raise
+
+    def fetch_artifacts(self, meeting_id):
+        """
+        Busca os artefatos ativos vinculados a um registro.
+
+        :param meeting_id: ID do registro.
+        :return: Lista de dicionários com os artefatos.
+        """
+        try:
+            self.cursor.execute("SELECT * FROM artifacts WHERE meeting_id = ? AND state != 'deleted'", (meeting_id,))
+            return [dict(row) for row in self.cursor.fetchall()]
+        except Exception as e:
+            logging.error(f"❌ Erro ao buscar artefatos do registro {meeting_id}: {e}")
+            raise
+
+    def set_retention_policy(self, user_id, retention_days):
+        """
+        Define por quantos dias os artefatos do usuário são mantidos (0 = para sempre).
+
+        :param user_id: ID do usuário.
+        :param retention_days: Dias de retenção.
+        """
+        try:
+            self.cursor.execute('''
+                INSERT INTO retention_policies (user_id, retention_days) VALUES (?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET retention_days = excluded.retention_days
+            ''', (user_id, int(retention_days)))
+            self.connection.commit()
+            logging.info(f"🗓️ Retenção do usuário {user_id} definida para {retention_days} dias.")
+        except Exception as e:
+            logging.error(f"❌ Erro ao definir a política de retenção: {e}")
+            raise
+
+    def get_retention_policy(self, user_id):
+        """
+        Retorna os dias de retenção do usuário (ou None se não houver política própria).
+        """
+        self.cursor.execute("SELECT retention_days FROM retention_policies WHERE user_id = ?", (user_id,))
+        row = self.cursor.fetchone()
+        return row["retention_days"] if row else None
+
+    def artifact_shared(self, artifact):
+        """
+        Indica se outro artefato ativo aponta para o mesmo arquivo (conteúdo endereçado por hash).
+
+        :param artifact: Dicionário do artefato (com 'id' e 'path').
+        :return: True se o arquivo ainda é referenciado.
+        """
+        self.cursor.execute(
+            "SELECT COUNT(*) FROM artifacts WHERE path = ? AND id != ? AND state != 'deleted'",
+            (artifact["path"], artifact["id"])
+        )
+        return self.cursor.fetchone()[0] > 0
+
+    def fetch_transcode_candidates(self, limit, kinds=("audio", "recording")):
+        """
+        Áudios e gravações ainda brutos cujo registro já possui transcrição
+        (os que falharam recentemente só voltam após o intervalo de nova tentativa).
+
+        :param limit: Máximo de artefatos.
+        :param kinds: Tipos de artefato considerados.
+        :return: Lista de dicionários com os artefatos, em ordem de ID.
+        """
+        placeholders = ", ".join("?" for _ in kinds)
+        self.cursor.execute(f'''
+            SELECT a.* FROM artifacts a JOIN meetings m ON m.id = a.meeting_id
+            WHERE a.state = 'raw' AND a.kind IN ({placeholders})
+              AND (a.next_attempt_at IS NULL OR a.next_attempt_at <= datetime('now'))
+              AND m.transcript IS NOT NULL AND m.transcript != ''
+            ORDER BY a.id LIMIT ?
+        ''', (*kinds, limit))
+        return [dict(row) for row in self.cursor.fetchall()]
+
+    def mark_transcode_failed(self, artifact_id, max_attempts, retry_seconds):
+        """
+        Registra uma falha de compressão: a próxima tentativa espera ``retry_seconds``
+        dobrados a cada falha e, após ``max_attempts`` falhas, o artefato passa a 'failed'
+        (mantido como está, fora da fila de compressão).
+
+        :param artifact_id: ID do artefato.
+        :param max_attempts: Falhas toleradas antes de desistir.
+        :param retry_seconds: Espera após a primeira falha.
+        :return: Novo estado do artefato ('raw' ou 'failed').
+        """
+        self.cursor.execute('''
+            UPDATE artifacts SET
+                attempts = attempts + 1,
+                state = CASE WHEN attempts + 1 >= :max THEN 'failed' ELSE state END,
+                next_attempt_at = datetime('now', '+' || (:retry * (1 << MIN(attempts, 20))) || ' seconds')
+            WHERE id = :id
+        ''', {"id": artifact_id, "max": max_attempts, "retry": retry_seconds})
+        self.connection.commit()
+        self.cursor.execute("SELECT state FROM artifacts WHERE id = ?", (artifact_id,))
+        row = self.cursor.fetchone()
+        return row["state"] if row else None
+
+    def fetch_expired_artifacts(self, default_retention_days, limit):
+        """
+        Artefatos ativos que ultrapassaram a retenção do usuário.
+
+        :param default_retention_days: Retenção de usuários sem política própria (0 = para sempre).
+        :param limit: Máximo de artefatos.
+        :return: Lista de dicionários com os artefatos, dos mais antigos aos mais novos.
+        """
+        self.cursor.execute('''
+            SELECT a.* FROM artifacts a LEFT JOIN retention_policies r ON r.user_id = a.user_id
+            WHERE a.state != 'deleted'
+              AND COALESCE(r.retention_days, :days) > 0
+              AND a.created_at < datetime('now', '-' || COALESCE(r.retention_days, :days) || ' days')
+            ORDER BY a.created_at LIMIT :limit
+        ''', {"days": default_retention_days, "limit": limit})
+        return [dict(row) for row in self.cursor.fetchall()]
+
+    def mark_artifact_deleted(self, artifact_id):
+        """
+        Marca um artefato como removido do disco.
+
+        :param artifact_id: ID do artefato.
+        """
+        self.cursor.execute("UPDATE artifacts SET state = 'deleted', bytes = 0 WHERE id = ?", (artifact_id,))
+        self.connection.commit()
+
+    def mark_artifacts_transcoded(self, source_path, target_path, codec, size):
+        """
+        Aponta todos os artefatos brutos de ``source_path`` para o arquivo comprimido.
+
+        :param source_path: Arquivo original.
+        :param target_path: Arquivo comprimido.
+        :param codec: Codec do arquivo comprimido.
+        :param size: Tamanho em bytes do arquivo comprimido.
+        """
+        self.cursor.execute(
+            "UPDATE artifacts SET path = ?, codec = ?, bytes = ?, state = 'transcoded' WHERE path = ? AND state = 'raw'",
+            (target_path, codec, size, source_path)
+        )
+        self.connection.commit()
+
+    def disk_usage_report(self, user_id=None):
+        """
+        Uso de disco por usuário e tipo de artefato.
+
+        :param user_id: Restringe o relatório a um usuário (opcional).
+        :return: Lista de dicionários {user_id, kind, state, artifacts, bytes}.
+        """
+        query = '''
+            SELECT user_id, kind, state, COUNT(*) AS artifacts, SUM(bytes) AS bytes
+            FROM artifacts WHERE state != 'deleted'
+        '''
+        params = ()
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params = (user_id,)
+        self.cursor.execute(query + " GROUP BY user_id, kind, state ORDER BY user_id, kind", params)
+        return [dict(row) for row in self.cursor.fetchall()]
@@ -0,0 +1,144 @@
+import json
+import logging
+from monitoring.metrics import timed
+from database.base import ConnectionRepository
+from database.repository import CheckpointRepository
+
+
+def create_tables(connection):
+    """
+    Cria as tabelas de checkpoints do processamento (transcrição por trecho e insights)
+    e o cache de resumos por hash do conteúdo.
+
+    :param connection: Conexão com o banco de reuniões.
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.executescript('''
+            CREATE TABLE IF NOT EXISTS pipeline_checkpoints (
+                recording_id TEXT NOT NULL,
+                unit TEXT NOT NULL,  -- ex.: 'transcript:3', 'transcript', 'insights'
+                payload TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT (datetime('now')),
+                PRIMARY KEY (recording_id, unit)
+            );
+
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                content_hash TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT (datetime('now')),
+                last_used_at TEXT  -- último acerto (limpeza por idade/quantidade)
+            );
+        ''')
+        # Bancos criados antes da limpeza do cache de resumos
+        cursor.execute("PRAGMA table_info(summary_cache)")
+        if "last_used_at" not in [row["name"] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE summary_cache ADD COLUMN last_used_at TEXT")
+            logging.info("✅ Coluna 'last_used_at' adicionada com sucesso na tabela 'summary_cache'.")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_summary_cache_used ON summary_cache(last_used_at)")
+        connection.commit()
+        logging.info("✅ Tabelas 'pipeline_checkpoints' e 'summary_cache' criadas/verificadas com sucesso.")
+    except Exception as e:
+        logging.error(f"❌ Erro ao criar a tabela de checkpoints: {e}")
+        raise
+
+
+class DatabaseCheckpoints(ConnectionRepository, CheckpointRepository):
+    def save_checkpoint(self, recording_id, unit, payload):
+        """
+        Persiste o resultado de uma etapa assim que ela termina.
+
+        :param recording_id: ID da gravação processada.
+        :param unit: Nome da etapa (ex.: 'transcript:3').
+        :param payload: Dados serializáveis em JSON.
+        """
+        try:
+            with timed("db", operation="save_checkpoint"):
+                self.cursor.execute('''
+                    INSERT OR REPLACE INTO pipeline_checkpoints (recording_id, unit, payload) VALUES (?, ?, ?)
+                ''', (recording_id, unit, json.dumps(payload, ensure_ascii=False)))
+                self.connection.commit()
+        except Exception as e:
+            logging.error(f"❌ Erro ao salvar o checkpoint {unit} da gravação {recording_id}: {e}")
+            raise
+
+    def load_checkpoints(self, recording_id):
+        """
+        Busca as etapas já concluídas de uma gravação.
+
+        :param recording_id: ID da gravação.
+        :return: Dicionário {etapa: dados}.
+        """
+        try:
+            self.cursor.execute("SELECT unit, payload FROM pipeline_checkpoints WHERE recording_id = ?", (recording_id,))
+            return {row["unit"]: json.loads(row["payload"]) for row in self.cursor.fetchall()}
+        except Exception as e:
+            logging.error(f"❌ Erro ao buscar os checkpoints da gravação {recording_id}: {e}")
+            raise
+
+    def clear_checkpoints(self, recording_id):
+        """Remove os checkpoints de uma gravação já salva."""
+        try:
+            self.cursor.execute("DELETE FROM pipeline_checkpoints WHERE recording_id = ?", (recording_id,))
+            self.connection.commit()
+        except Exception as e:
+            logging.error(f"❌ Erro ao remover os checkpoints da gravação {recording_id}: {e}")
+            raise
+
+    def get_cached_summary(self, content_hash):
+        """Resumo já gerado para um conteúdo (ou None); o acerto renova a entrada."""
+        self.cursor.execute("SELECT summary FROM summary_cache WHERE content_hash = ?", (content_hash,))
+        row = self.cursor.fetchone()
+        if not row:
+            return None
+        self.cursor.execute("UPDATE summary_cache SET last_used_at = datetime('now') WHERE content_hash = ?",
+                            (content_hash,))
+        self.connection.commit()
+        return row["summary"]
+
+    def cache_summary(self, content_hash, summary):
+        """Guarda o resumo gerado para um conteúdo."""
+        try:
+            self.cursor.execute(
+                "INSERT OR REPLACE INTO summary_cache (content_hash, summary, last_used_at) VALUES (?, ?, datetime('now'))",
+                (content_hash, summary)
+            )
+            self.connection.commit()
+        except Exception as e:
+            logging.error(f"❌ Erro ao salvar o resumo em cache: {e}")
+            raise
+
+    def prune_summary_cache(self, max_entries, max_age_days):
+        """
+        Remove os resumos em cache sem uso há mais de ``max_age_days`` dias e, acima de
+        ``max_entries`` entradas, os usados há mais tempo (o cache é por conteúdo e
+        compartilhado entre registros, por isso não é limpo ao excluir um registro).
+
+        :param max_entries: Entradas mantidas (0 = sem limite).
+        :param max_age_days: Idade máxima desde o último uso (0 = sem limite).
+        :return: Quantidade de entradas removidas.
+        """
+        try:
+            removed = 0
+            if max_age_days > 0:
+                self.cursor.execute(
+                    "DELETE FROM summary_cache WHERE COALESCE(last_used_at, created_at) < datetime('now', ?)",
+                    (f"-{int(max_age_days)} days",)
+                )
+                removed += self.cursor.rowcount
+            if max_entries > 0:
+                self.cursor.execute('''
+                    DELETE FROM summary_cache WHERE content_hash IN (
+                        SELECT content_hash FROM summary_cache
+                        ORDER BY COALESCE(last_used_at, created_at) DESC LIMIT -1 OFFSET ?
+                    )
+                ''', (int(max_entries),))
+                removed += self.cursor.rowcount
+            self.connection.commit()
+            if removed:
+                logging.info(f"🧹 {removed} resumo(s) removido(s) do cache.")
+            return removed
+        except Exception as e:
+            self.connection.rollback()
+            logging.error(f"❌ Erro ao limpar o cache de resumos: {e}")
+            raise
@@ -0,0 +1,73 @@
+import logging
+import datetime
+from database.base import ConnectionRepository
+from database.repository import DigestRepository
+
+
+def create_tables(connection):
+    """
+    Cria a tabela dos resumos por período (dia, semana e mês), invalidados a cada
+    escrita em um registro dentro do período.
+
+    :param connection: Conexão com o banco de reuniões.
+    """
+    try:
+        connection.cursor().execute('''
+            CREATE TABLE IF NOT EXISTS digests (
+                user_id INTEGER NOT NULL,
+                type TEXT NOT NULL,  -- 'meeting', 'diary' ou 'all'
+                level TEXT NOT NULL,  -- 'day', 'week' ou 'month'
+                period_start TEXT NOT NULL,  -- AAAA-MM-DD (segunda-feira na semana, dia 1 no mês)
+                summary TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT (datetime('now')),
+                PRIMARY KEY (user_id, type, level, period_start)
+            )
+        ''')
+        connection.commit()
+        logging.info("✅ Tabela 'digests' criada/verificada com sucesso.")
+    except Exception as e:
+        logging.error(f"❌ Erro ao criar a tabela 'digests': {e}")
+        raise
+
+
+def invalidate_digests(cursor, user_id, dates):
+    """
+    Descarta os resumos do dia, da semana e do mês de cada data (em qualquer filtro de tipo).
+
+    Sem commit: executado dentro da transação que alterou os registros.
+
+    :param cursor: Cursor da conexão.
+    :param user_id: ID do usuário dono dos registros.
+    :param dates: Datas (AAAA-MM-DD) dos registros alterados; inválidas são ignoradas.
+    """
+    periods = set()
+    for value in dates:
+        try:
+            day = datetime.date.fromisoformat(str(value)[:10])
+        except ValueError:
+            continue
+        periods.add(("day", day.isoformat()))
+        periods.add(("week", (day - datetime.timedelta(days=day.weekday())).isoformat()))
+        periods.add(("month", day.replace(day=1).isoformat()))
+    cursor.executemany(
+        "DELETE FROM digests WHERE user_id = ? AND level = ? AND period_start = ?",
+        [(user_id, level, start) for level, start in periods]
+    )
+
+
+class DatabaseDigests(ConnectionRepository, DigestRepository):
+    def get_digest(self, user_id, record_type, level, period_start):
+        """Resumo do período em cache (ou None)."""
+        self.cursor.execute(
+            "SELECT summary FROM digests WHERE user_id = ? AND type = ? AND level = ? AND period_start = ?",
+            (user_id, record_type, level, period_start)
+        )
+        row = self.cursor.fetchone()
+        return row["summary"] if row else None
+
+    def save_digest(self, user_id, record_type, level, period_start, summary):
+        """Guarda o resumo de um período."""
+        self.cursor.execute('''
+            INSERT OR REPLACE INTO digests (user_id, type, level, period_start, summary) VALUES (?, ?, ?, ?, ?)
+        ''', (user_id, record_type, level, period_start, summary))
+        self.connection.commit()
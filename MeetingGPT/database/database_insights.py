@@ -0,0 +1,169 @@
+import logging
+from monitoring.metrics import timed
+from utils.text import normalize_key
+from database.base import ConnectionRepository
+from database.repository import InsightsRepository
+
+
+def create_tables(connection):
+    """
+    Cria as tabelas dos insights estruturados (itens de ação e decisões), indexadas
+    para consultas entre reuniões (ex.: itens em aberto de um responsável no mês).
+
+    :param connection: Conexão com o banco de reuniões.
+    """
+    try:
+        connection.cursor().executescript('''
+            CREATE TABLE IF NOT EXISTS action_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                meeting_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                task TEXT NOT NULL,
+                owner TEXT,
+                owner_key TEXT,  -- responsável sem acentos/minúsculas
+                due_date TEXT,  -- AAAA-MM-DD
+                status TEXT NOT NULL DEFAULT 'open',  -- 'open' ou 'done'
+                created_at TEXT NOT NULL DEFAULT (datetime('now')),
+                FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE
+            );
+            CREATE INDEX IF NOT EXISTS idx_action_items_user_status_due ON action_items(user_id, status, due_date);
+            CREATE INDEX IF NOT EXISTS idx_action_items_owner ON action_items(user_id, owner_key, status, due_date);
+            CREATE INDEX IF NOT EXISTS idx_action_items_meeting ON action_items(meeting_id);
+
+            CREATE TABLE IF NOT EXISTS decisions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                meeting_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT (datetime('now')),
+                FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE
+            );
+            CREATE INDEX IF NOT EXISTS idx_decisions_user ON decisions(user_id, created_at);
+            CREATE INDEX IF NOT EXISTS idx_decisions_meeting ON decisions(meeting_id);
+        ''')
+        connection.commit()
+        logging.info("✅ Tabelas 'action_items' e 'decisions' criadas/verificadas com sucesso.")
+    except Exception as e:
+        logging.error(f"❌ Erro ao criar as tabelas de insights estruturados: {e}")
+        raise
+
+
+def write_structured_insights(cursor, meeting_id, user_id, structured):
+    """
+    Substitui os itens de ação e as decisões de um registro.
+
+    Sem commit: executado dentro da transação de quem chama (ex.: a inserção do registro).
+
+    :param cursor: Cursor da conexão.
+    :param meeting_id: ID do registro.
+    :param user_id: ID do usuário dono do registro.
+    :param structured: Insights estruturados (ver ``insights.structured``).
+    """
+    cursor.execute("DELETE FROM action_items WHERE meeting_id = ?", (meeting_id,))
+    cursor.execute("DELETE FROM decisions WHERE meeting_id = ?", (meeting_id,))
+    cursor.executemany('''
+        INSERT INTO action_items (meeting_id, user_id, task, owner, owner_key, due_date)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(meeting_id, user_id, item["task"], item.get("owner"),
+           normalize_key(item.get("owner")) or None, item.get("due_date"))
+          for item in structured.get("action_items", [])])
+    cursor.executemany(
+        "INSERT INTO decisions (meeting_id, user_id, text) VALUES (?, ?, ?)",
+        [(meeting_id, user_id, text) for text in structured.get("decisions", [])]
+    )
+
+
+class DatabaseInsights(ConnectionRepository, InsightsRepository):
+    def save_structured_insights(self, meeting_id, user_id, structured):
+        """
+        Grava os itens de ação e decisões de um registro (substitui os anteriores).
+
+        :param meeting_id: ID do registro.
+        :param user_id: ID do usuário dono do registro.
+        :param structured: Insights estruturados (ver ``insights.structured``).
+        """
+        try:
+            with timed("db", operation="save_structured_insights"):
+                with self.connection:
+                    write_structured_insights(self.cursor, meeting_id, user_id, structured)
+            logging.info(f"📋 Insights estruturados do registro {meeting_id} salvos "
+                         f"({len(structured.get('action_items', []))} itens de ação, "
+                         f"{len(structured.get('decisions', []))} decisões).")
+        except Exception as e:
+            logging.error(f"❌ Erro ao salvar os insights estruturados do registro {meeting_id}: {e}")
+            raise
+
+    def fetch_action_items(self, user_id, status="open", owner=None, due_from=None, due_to=None):
+        """
+        Itens de ação do usuário entre todas as reuniões.
+
+        :param user_id: ID do usuário.
+        :param status: 'open', 'done' ou None para todos.
+        :param owner: Responsável (comparação sem acentos/maiúsculas).
+        :param due_from: Prazo mínimo (AAAA-MM-DD).
+        :param due_to: Prazo máximo (AAAA-MM-DD).
+        :return: Lista de dicionários com o item e o título/data da reunião.
+        """
+        conditions, params = ["a.user_id = ?"], [user_id]
+        if status:
+            conditions.append("a.status = ?")
+            params.append(status)
+        if owner:
+            conditions.append("a.owner_key = ?")
+            params.append(normalize_key(owner))
+        if due_from:
+            conditions.append("a.due_date >= ?")
+            params.append(due_from)
+        if due_to:
+            conditions.append("a.due_date <= ?")
+            params.append(due_to)
+        with timed("db", operation="fetch_action_items"):
+            self.cursor.execute(f'''
+                SELECT a.*, m.title AS meeting_title, m.date AS meeting_date
+                FROM action_items a JOIN meetings m ON m.id = a.meeting_id
+                WHERE {" AND ".join(conditions)}
+                ORDER BY a.due_date IS NULL, a.due_date, a.id
+            ''', params)
+            return [dict(row) for row in self.cursor.fetchall()]
+
+    def fetch_decisions(self, user_id, date_from=None, date_to=None):
+        """
+        Decisões do usuário entre todas as reuniões.
+
+        :param user_id: ID do usuário.
+        :param date_from: Data mínima da reunião (AAAA-MM-DD).
+        :param date_to: Data máxima da reunião (AAAA-MM-DD).
+        :return: Lista de dicionários com a decisão e o título/data da reunião.
+        """
+        conditions, params = ["d.user_id = ?"], [user_id]
+        if date_from:
+            conditions.append("m.date >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("m.date <= ?")
+            params.append(date_to)
+        with timed("db", operation="fetch_decisions"):
+            self.cursor.execute(f'''
+                SELECT d.*, m.title AS meeting_title, m.date AS meeting_date
+                FROM decisions d JOIN meetings m ON m.id = d.meeting_id
+                WHERE {" AND ".join(conditions)}
+                ORDER BY m.date DESC, d.id
+            ''', params)
+            return [dict(row) for row in self.cursor.fetchall()]
+
+    def set_action_item_status(self, user_id, item_id, status):
+        """
+        Marca um item de ação como 'open' ou 'done'.
+
+        :param user_id: ID do usuário dono do item.
+        :param item_id: ID do item.
+        :param status: Novo status.
+        """
+        try:
+            self.cursor.execute("UPDATE action_items SET status = ? WHERE id = ? AND user_id = ?",
+                                (status, item_id, user_id))
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            logging.error(f"❌ Erro ao alterar o status do item de ação {item_id}: {e}")
+            raise RuntimeError(f"Erro ao alterar o status do item de ação: {e}")
@@ -1,13 +1,11 @@
-import sqlite3
 import os
 import logging
-
-# Configuração inicial do logger
-logging.basicConfig(
-    filename='database_meeting.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from monitoring.metrics import timed
+from database.history_cache import get_history_cache
+from database import analytics, people, database_artifacts, database_checkpoints, database_digests, database_insights
+from database.base import ConnectionRepository
+from database.repository import MeetingRepository
+from monitoring.logging_config import setup_logging
 
 # Obtém o diretório base do projeto (garantindo que o caminho seja correto no Streamlit Cloud)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -22,101 +20,354 @@ if not os.path.exists(DATABASE_DIR):
 # Define o caminho correto do banco de dados
 DATABASE_PATH = os.path.join(DATABASE_DIR, "database_meeting.db")
 
-class DatabaseMeeting:
-    def __init__(self):
+# Colunas que alteram os agregados do painel do histórico
+ANALYTICS_COLUMNS = {"type", "date", "start_time", "end_time", "participants"}
+
+# IDs por cláusula IN (abaixo do limite de variáveis de versões antigas do SQLite)
+SQL_IN_CHUNK = 500
+
+
+def _chunks(ids, size=SQL_IN_CHUNK):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        chunk = ids[start:start + size]
+        yield chunk, ",".join("?" * len(chunk))
+
+
+def create_tables(connection):
+    """
+    Cria a tabela de reuniões/diários se ainda não existir.
+
+    :param connection: Conexão com o banco de reuniões.
+    """
+    try:
+        connection.cursor().execute('''
+            CREATE TABLE IF NOT EXISTS meetings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                type TEXT NOT NULL,  -- Tipo: 'meeting' ou 'diary'
+                title TEXT,
+                participants TEXT,
+                date TEXT NOT NULL,
+                start_time TEXT,
+                end_time TEXT,
+                transcript TEXT,
+                insights TEXT,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        ''')
+        connection.commit()
+        logging.info("✅ Tabela 'meetings' criada/verificada com sucesso.")
+    except Exception as e:
+        logging.error(f"❌ Erro ao criar a tabela 'meetings': {e}")
+        raise
+
+
+def check_and_update_schema(connection):
+    """
+    Verifica se as colunas 'user_id', 'archived', 'tags' e 'summary_preview' estão na
+    tabela 'meetings' e adiciona as que faltarem.
+
+    :param connection: Conexão com o banco de reuniões.
+    """
+    try:
+        cursor = connection.cursor()
+        # Obtém os nomes das colunas na tabela
+        cursor.execute("PRAGMA table_info(meetings)")
+        columns = [row["name"] for row in cursor.fetchall()]
+
+        # Se 'user_id' não estiver na tabela, adiciona a coluna
+        if "user_id" not in columns:
+            cursor.execute("ALTER TABLE meetings ADD COLUMN user_id INTEGER REFERENCES users(id) ON DELETE CASCADE")
+            connection.commit()
+            logging.info("✅ Coluna 'user_id' adicionada com sucesso na tabela 'meetings'.")
+        else:
+            logging.info("ℹ️ Coluna 'user_id' já existe na tabela 'meetings'. Nenhuma alteração necessária.")
+
+        # Ações em lote do histórico: arquivamento e etiquetas
+        if "archived" not in columns:
+            cursor.execute("ALTER TABLE meetings ADD COLUMN archived INTEGER NOT NULL DEFAULT 0")
+            connection.commit()
+            logging.info("✅ Coluna 'archived' adicionada com sucesso na tabela 'meetings'.")
+        if "tags" not in columns:
+            cursor.execute("ALTER TABLE meetings ADD COLUMN tags TEXT NOT NULL DEFAULT ''")
+            connection.commit()
+            logging.info("✅ Coluna 'tags' adicionada com sucesso na tabela 'meetings'.")
+
+        # Resumo extrativo local, disponível mesmo sem os insights do LLM
+        if "summary_preview" not in columns:
+            cursor.execute("ALTER TABLE meetings ADD COLUMN summary_preview TEXT NOT NULL DEFAULT ''")
+            connection.commit()
+            logging.info("✅ Coluna 'summary_preview' adicionada com sucesso na tabela 'meetings'.")
+    except Exception as e:
+        logging.error(f"❌ Erro ao verificar/adicionar coluna 'user_id': {e}")
+        raise
+
+
+def create_schema(connection):
+    """
+    Cria/verifica as tabelas de todos os repositórios do banco de reuniões
+    ('meetings' primeiro: analytics e participantes são preenchidos a partir dela).
+
+    :param connection: Conexão com o banco de reuniões.
+    """
+    create_tables(connection)
+    check_and_update_schema(connection)  # Verifica se a coluna user_id existe
+    database_artifacts.create_tables(connection)
+    database_checkpoints.create_tables(connection)
+    database_insights.create_tables(connection)
+    database_digests.create_tables(connection)
+    analytics.create_tables(connection)
+    people.create_tables(connection)
+
+
+def open_connection(backend):
+    """
+    Obtém uma conexão do backend (sqlite3 ou pool do SQLAlchemy) com o banco de reuniões
+    e cria/verifica as tabelas na primeira conexão do processo.
+
+    :param backend: Backend de conexões.
+    :return: (conexão, lease); o lease é devolvido com ``backend.release``.
+    """
+    # Criação/migração das tabelas: uma vez por processo, não a cada execução das telas
+    needs_schema = backend.needs_schema(DATABASE_PATH, "meetings")
+    connection, lease = backend.connect(DATABASE_PATH)
+    logging.info("🔗 Conexão com o banco de dados estabelecida.")
+    if needs_schema:
+        try:
+            create_schema(connection)
+        except Exception:
+            backend.release(lease)
+            raise
+        backend.schema_ready(DATABASE_PATH, "meetings")
+    return connection, lease
+
+
+class DatabaseMeeting(ConnectionRepository, MeetingRepository):
+    """
+    Registros (reuniões e diários). As escritas mantêm, na mesma transação, os dados
+    derivados de cada registro: resumos por período, analytics, índice de participantes,
+    insights estruturados e, na exclusão, artefatos.
+    """
+
+    def insert_record(self, record, structured=None):
         """
-        Inicializa a conexão com o banco de dados SQLite e cria/verifica tabelas.
+        Insere um registro no banco de dados.
+
+        :param record: Dicionário contendo os dados do registro.
+        :param structured: Insights estruturados gravados na mesma transação (opcional).
+        :return: ID do registro inserido.
         """
         try:
-            # Conexão com SQLite
-            self.connection = sqlite3.connect(DATABASE_PATH)
-            self.connection.row_factory = sqlite3.Row  # Retorna dicionários em vez de tuplas
-            self.cursor = self.connection.cursor()
-            logging.info("🔗 Conexão com o banco de dados estabelecida.")
+            with timed("db", operation="insert_record"):
+                record_id = self._write_record(record, structured)
+                self.connection.commit()
+            get_history_cache().bump(record["user_id"])
+            logging.info(f"📌 Registro inserido com sucesso. ID: {record_id}")
+            return record_id
+        except Exception as e:
+            # Nada do registro fica gravado pela metade
+            self.connection.rollback()
+            logging.error(f"❌ Erro ao inserir registro: {e}")
+            raise
 
-            # Verifica e cria tabelas se necessário
-            self.create_tables()
-            self.check_and_update_schema()  # Verifica se a coluna user_id existe
+    def insert_records(self, records):
+        """
+        Insere vários registros em uma única transação (importações e massas de dados),
+        com a mesma manutenção de ``insert_record`` (resumos, analytics e participantes).
 
+        :param records: Iterável de dicionários no formato de ``insert_record``.
+        :return: Lista com os IDs inseridos.
+        """
+        record_ids, users = [], set()
+        try:
+            with timed("db", operation="insert_records"):
+                for record in records:
+                    record_ids.append(self._write_record(record))
+                    users.add(record["user_id"])
+                self.connection.commit()
         except Exception as e:
-            logging.error(f"❌ Erro ao conectar ao banco de dados: {e}")
+            self.connection.rollback()
+            logging.error(f"❌ Erro ao inserir {len(record_ids) + 1} registro(s) em lote: {e}")
             raise
+        for user_id in users:
+            get_history_cache().bump(user_id)
+        logging.info(f"📌 {len(record_ids)} registro(s) inseridos em lote.")
+        return record_ids
+
+    def _write_record(self, record, structured=None):
+        # Escritas de um registro novo, sem commit (transação do chamador)
+        self.cursor.execute('''
+            INSERT INTO meetings (user_id, type, title, participants, date, start_time, end_time, transcript,
+                                  insights, summary_preview)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            record["user_id"],
+            record["type"],
+            record["title"],
+            record["participants"],
+            record["date"],
+            record["start_time"],
+            record["end_time"],
+            record["transcript"],
+            record["insights"],
+            record.get("summary_preview", "")
+        ))
+        record_id = self.cursor.lastrowid
+        database_digests.invalidate_digests(self.cursor, record["user_id"], [record["date"]])
+        analytics.apply_record(self.cursor, record)
+        people.index_participants(self.cursor, record_id, record["user_id"], record["participants"], record["date"])
+        if structured is not None:
+            database_insights.write_structured_insights(self.cursor, record_id, record["user_id"], structured)
+        return record_id
 
-    def create_tables(self):
+    def update_record(self, record_id, fields):
         """
-        Cria a tabela de reuniões/diários se ainda não existir.
+        Atualiza campos de um registro.
+
+        :param record_id: ID do registro.
+        :param fields: Dicionário {coluna: valor} (ex.: transcript, insights).
         """
+        allowed = {"title", "participants", "date", "start_time", "end_time", "transcript", "insights", "summary_preview"}
+        columns = [column for column in fields if column in allowed]
+        if not columns:
+            return
         try:
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS meetings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    type TEXT NOT NULL,  -- Tipo: 'meeting' ou 'diary'
-                    title TEXT,
-                    participants TEXT,
-                    date TEXT NOT NULL,
-                    start_time TEXT,
-                    end_time TEXT,
-                    transcript TEXT,
-                    insights TEXT,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            self.cursor.execute("SELECT * FROM meetings WHERE id = ?", (record_id,))
+            row = self.cursor.fetchone()
+            if row is None:
+                logging.warning(f"⚠️ Registro {record_id} não encontrado; nada foi atualizado.")
+                return
+            user_id = row["user_id"]
+            with timed("db", operation="update_record"):
+                self.cursor.execute(
+                    f"UPDATE meetings SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                    [fields[column] for column in columns] + [record_id]
                 )
-            ''')
-            self.connection.commit()
-            logging.info("✅ Tabela 'meetings' criada/verificada com sucesso.")
+                database_digests.invalidate_digests(self.cursor, user_id, [row["date"], fields.get("date", row["date"])])
+                if any(column in ANALYTICS_COLUMNS for column in columns):
+                    analytics.apply_record(self.cursor, row, sign=-1)
+                    analytics.apply_record(self.cursor, {**dict(row), **fields})
+                if "participants" in columns or "date" in columns:
+                    people.index_participants(self.cursor, record_id, user_id,
+                                              fields.get("participants", row["participants"]),
+                                              fields.get("date", row["date"]))
+                self.connection.commit()
+            get_history_cache().bump(user_id)
+            logging.info(f"✏️ Registro {record_id} atualizado ({', '.join(columns)}).")
         except Exception as e:
-            logging.error(f"❌ Erro ao criar a tabela 'meetings': {e}")
+            # Nenhuma escrita parcial fica pendente na conexão para um commit posterior
+            self.connection.rollback()
+            logging.error(f"❌ Erro ao atualizar o registro {record_id}: {e}")
             raise
 
-    def check_and_update_schema(self):
+    def delete_record(self, record_id):
         """
-        Verifica se a coluna 'user_id' está na tabela 'meetings' e adiciona se necessário.
+        Exclui um registro e seus artefatos (ver ``bulk_delete``).
+
+        :param record_id: ID do registro.
         """
-        try:
-            # Obtém os nomes das colunas na tabela
-            self.cursor.execute("PRAGMA table_info(meetings)")
-            columns = [row["name"] for row in self.cursor.fetchall()]
+        user_id = self._record_owner(record_id)
+        if user_id is not None:
+            self.bulk_delete(user_id, [record_id])
 
-            # Se 'user_id' não estiver na tabela, adiciona a coluna
-            if "user_id" not in columns:
-                self.cursor.execute("ALTER TABLE meetings ADD COLUMN user_id INTEGER REFERENCES users(id) ON DELETE CASCADE")
-                self.connection.commit()
-                logging.info("✅ Coluna 'user_id' adicionada com sucesso na tabela 'meetings'.")
-            else:
-                logging.info("ℹ️ Coluna 'user_id' já existe na tabela 'meetings'. Nenhuma alteração necessária.")
+    def bulk_delete(self, user_id, record_ids, remove_files=True):
+        """
+        Exclui vários registros do usuário em uma única transação, junto com os
+        artefatos vinculados (áudio, gravação segmentada e os JSONs de transcrição
+        e insights registrados por ``MeetingPipeline.register_artifacts``); os
+        arquivos que deixam de ser referenciados por qualquer registro são
+        apagados após o commit. Arquivos nunca registrados como artefato não são
+        encontrados aqui.
+
+        :param user_id: ID do usuário dono dos registros.
+        :param record_ids: IDs dos registros.
+        :param remove_files: Apaga do disco os arquivos órfãos.
+        :return: Quantidade de registros excluídos.
+        """
+        record_ids = list(record_ids)
+        if not record_ids:
+            return 0
+        artifacts, deleted = [], 0
+        try:
+            with timed("db", operation="bulk_delete"):
+                with self.connection:
+                    for chunk, marks in _chunks(record_ids):
+                        owned = f"SELECT id FROM meetings WHERE user_id = ? AND id IN ({marks})"
+                        self.cursor.execute(f"SELECT * FROM meetings WHERE user_id = ? AND id IN ({marks})",
+                                            [user_id] + chunk)
+                        rows = self.cursor.fetchall()
+                        database_digests.invalidate_digests(self.cursor, user_id, {row["date"] for row in rows})
+                        for row in rows:
+                            analytics.apply_record(self.cursor, row, sign=-1)
+                        artifacts.extend(database_artifacts.delete_record_artifacts(self.cursor, owned, [user_id] + chunk))
+                        for table in ("action_items", "decisions", "meeting_participants"):
+                            self.cursor.execute(f"DELETE FROM {table} WHERE meeting_id IN ({owned})", [user_id] + chunk)
+                        self.cursor.execute(f"DELETE FROM meetings WHERE user_id = ? AND id IN ({marks})",
+                                            [user_id] + chunk)
+                        deleted += self.cursor.rowcount
         except Exception as e:
-            logging.error(f"❌ Erro ao verificar/adicionar coluna 'user_id': {e}")
+            logging.error(f"❌ Erro ao excluir {len(record_ids)} registro(s) em lote: {e}")
             raise
+        get_history_cache().bump(user_id)
+        logging.info(f"🗑️ {deleted} registro(s) e {len(artifacts)} artefato(s) excluídos em lote.")
+
+        if remove_files and artifacts:
+            # Arquivos endereçados por conteúdo podem continuar referenciados por outros registros
+            orphans = [artifact for artifact in artifacts
+                       if not database_artifacts.path_referenced(self.cursor, artifact["path"])]
+            from storage.lifecycle import get_lifecycle_manager
+            get_lifecycle_manager().remove_artifact_files(orphans)
+        return deleted
 
-    def insert_record(self, record):
+    def bulk_archive(self, user_id, record_ids, archived=True):
         """
-        Insere um registro no banco de dados.
+        Arquiva (ou restaura) vários registros do usuário em uma única transação.
 
-        :param record: Dicionário contendo os dados do registro.
-        :return: ID do registro inserido.
+        :param user_id: ID do usuário dono dos registros.
+        :param record_ids: IDs dos registros.
+        :param archived: True para arquivar, False para restaurar.
+        :return: Quantidade de registros alterados.
         """
+        return self._bulk_update(user_id, record_ids, "archived = ?", [int(bool(archived))], "bulk_archive")
+
+    def bulk_retag(self, user_id, record_ids, tags):
+        """
+        Substitui as etiquetas de vários registros do usuário em uma única transação.
+
+        :param user_id: ID do usuário dono dos registros.
+        :param record_ids: IDs dos registros.
+        :param tags: Lista de etiquetas (ou texto separado por vírgulas).
+        :return: Quantidade de registros alterados.
+        """
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        normalized = ", ".join(dict.fromkeys(tag.strip() for tag in tags if tag.strip()))
+        return self._bulk_update(user_id, record_ids, "tags = ?", [normalized], "bulk_retag")
+
+    def _bulk_update(self, user_id, record_ids, assignment, values, operation):
+        record_ids = list(record_ids)
+        if not record_ids:
+            return 0
+        updated = 0
         try:
-            self.cursor.execute('''
-                INSERT INTO meetings (user_id, type, title, participants, date, start_time, end_time, transcript, insights)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                record["user_id"],
-                record["type"],
-                record["title"],
-                record["participants"],
-                record["date"],
-                record["start_time"],
-                record["end_time"],
-                record["transcript"],
-                record["insights"]
-            ))
-            self.connection.commit()
-            record_id = self.cursor.lastrowid
-            logging.info(f"📌 Registro inserido com sucesso. ID: {record_id}")
-            return record_id
+            with timed("db", operation=operation):
+                with self.connection:
+                    for chunk, marks in _chunks(record_ids):
+                        self.cursor.execute(f"UPDATE meetings SET {assignment} WHERE user_id = ? AND id IN ({marks})",
+                                            values + [user_id] + chunk)
+                        updated += self.cursor.rowcount
         except Exception as e:
-            logging.error(f"❌ Erro ao inserir registro: {e}")
+            logging.error(f"❌ Erro na ação em lote '{operation}': {e}")
             raise
+        get_history_cache().bump(user_id)
+        logging.info(f"🗂️ Ação em lote '{operation}' aplicada a {updated} registro(s).")
+        return updated
+
+    def _record_owner(self, record_id):
+        self.cursor.execute("SELECT user_id FROM meetings WHERE id = ?", (record_id,))
+        row = self.cursor.fetchone()
+        return row["user_id"] if row else None
 
     def fetch_all_records(self):
         """
@@ -143,8 +394,9 @@ class DatabaseMeeting:
         :return: Lista de reuniões e diários do usuário.
         """
         try:
-            self.cursor.execute("SELECT * FROM meetings WHERE user_id = ?", (user_id,))
-            rows = self.cursor.fetchall()
+            with timed("db", operation="fetch_records_by_user"):
+                self.cursor.execute("SELECT * FROM meetings WHERE user_id = ?", (user_id,))
+                rows = self.cursor.fetchall()
 
             records = [dict(row) for row in rows]
             logging.info(f"📄 Registros do usuário {user_id} buscados com sucesso.")
@@ -153,19 +405,71 @@ class DatabaseMeeting:
             logging.error(f"❌ Erro ao buscar registros do usuário {user_id}: {e}")
             raise
 
-    def close_connection(self):
+    def fetch_record(self, user_id, record_id):
         """
-        Fecha a conexão com o banco de dados.
+        Busca um registro do usuário.
+
+        :param user_id: ID do usuário logado.
+        :param record_id: ID do registro.
+        :return: Dicionário do registro ou None.
         """
-        try:
-            self.connection.close()
-            logging.info("🔌 Conexão com o banco de dados fechada.")
-        except Exception as e:
-            logging.error(f"❌ Erro ao fechar a conexão com o banco de dados: {e}")
-            raise
+        with timed("db", operation="fetch_record"):
+            self.cursor.execute("SELECT * FROM meetings WHERE id = ? AND user_id = ?", (record_id, user_id))
+            row = self.cursor.fetchone()
+        return dict(row) if row else None
+
+    def fetch_records_between(self, user_id, date_from, date_to, record_type=None):
+        """
+        Registros do usuário em um intervalo de datas.
+
+        :param user_id: ID do usuário.
+        :param date_from: Data inicial (AAAA-MM-DD, inclusiva).
+        :param date_to: Data final (AAAA-MM-DD, inclusiva).
+        :param record_type: 'meeting', 'diary' ou None para ambos.
+        :return: Lista de dicionários ordenada por data e horário.
+        """
+        conditions, params = ["user_id = ?", "date BETWEEN ? AND ?"], [user_id, date_from, date_to]
+        if record_type:
+            conditions.append("type = ?")
+            params.append(record_type)
+        with timed("db", operation="fetch_records_between"):
+            self.cursor.execute(
+                f"SELECT * FROM meetings WHERE {' AND '.join(conditions)} ORDER BY date, start_time", params
+            )
+            return [dict(row) for row in self.cursor.fetchall()]
+
+    def cached_records_by_user(self, user_id):
+        """
+        Histórico do usuário servido pelo cache do processo.
+
+        Sem escritas desde a última consulta, não acessa o banco. Os dicionários
+        retornados são compartilhados entre sessões e não devem ser alterados.
+        Com o backend SQLAlchemy (``process_cache`` falso: outro processo pode escrever
+        no mesmo arquivo) a consulta vai sempre ao banco.
+
+        :param user_id: ID do usuário logado.
+        :return: Lista de reuniões e diários do usuário.
+        """
+        if not self.backend.process_cache:
+            return self.fetch_records_by_user(user_id)
+        return get_history_cache().records(user_id, lambda: self.fetch_records_by_user(user_id))
+
+    def cached_record(self, user_id, record_id):
+        """
+        Registro do usuário servido pelo cache do processo (somente leitura).
+
+        :param user_id: ID do usuário logado.
+        :param record_id: ID do registro.
+        :return: Dicionário do registro ou None.
+        """
+        if not self.backend.process_cache:
+            return self.fetch_record(user_id, record_id)
+        return get_history_cache().record(user_id, record_id, lambda: self.fetch_record(user_id, record_id))
+
 
 # Exemplo de uso
 if __name__ == "__main__":
+    setup_logging()
     db = DatabaseMeeting()
     try:
         # 🔹 Exemplo de inserção de uma reunião vinculada a um usuário
@@ -1,14 +1,10 @@
 import sqlite3
 import os
 import logging
+from database.backends import get_backend
+from database.repository import UserRepository
 import bcrypt
-
-# Configuração inicial do logger
-logging.basicConfig(
-    filename='database_user.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from monitoring.logging_config import setup_logging
 
 # Obtém o diretório base do projeto (garantindo que o caminho seja correto no Streamlit Cloud)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -23,16 +19,23 @@ if not os.path.exists(DATABASE_DIR):
 # Define o caminho correto do banco de dados
 DATABASE_PATH = os.path.join(DATABASE_DIR, "database_meeting.db")
 
-class DatabaseUser:
-    def __init__(self):
+class DatabaseUser(UserRepository):
+    def __init__(self, backend=None):
         """
-        Inicializa a conexão com o banco de dados SQLite e cria a tabela de usuários, se necessário.
+        Obtém uma conexão do backend (sqlite3 ou pool do SQLAlchemy) e cria a tabela de
+        usuários na primeira conexão do processo, se necessário.
+
+        :param backend: Backend de conexões (padrão: ``database.backends.get_backend()``).
         """
         try:
-            self.connection = sqlite3.connect(DATABASE_PATH)
+            self.backend = backend or get_backend()
+            needs_schema = self.backend.needs_schema(DATABASE_PATH, "users")
+            self.connection, self._lease = self.backend.connect(DATABASE_PATH)
             self.cursor = self.connection.cursor()
             logging.info("Conexão com o banco de dados estabelecida.")
-            self.create_users_table()
+            if needs_schema:
+                self.create_users_table()
+                self.backend.schema_ready(DATABASE_PATH, "users")
         except Exception as e:
             logging.error(f"Erro ao conectar ao banco de dados: {e}")
             raise
@@ -145,7 +148,8 @@ class DatabaseUser:
         Fecha a conexão com o banco de dados.
         """
         try:
-            self.connection.close()
+            self.cursor.close()
+            self.backend.release(self._lease)
             logging.info("Conexão com o banco de dados fechada.")
         except Exception as e:
             logging.error(f"Erro ao fechar a conexão com o banco de dados: {e}")
@@ -153,6 +157,7 @@ class DatabaseUser:
 
 # Exemplo de uso
 if __name__ == "__main__":
+    setup_logging()
     db_user = DatabaseUser()
     try:
         # Criar usuário de teste
@@ -0,0 +1,300 @@
+import os
+import io
+import csv
+import json
+import shutil
+import zipfile
+import argparse
+import tempfile
+import logging
+from monitoring.metrics import timed
+from database import database_meeting
+from database.backends import get_backend
+from monitoring.logging_config import setup_logging
+
+# Registros lidos por página (a memória do export depende deste valor, não do histórico)
+EXPORT_BATCH = int(os.environ.get("MEETINGGPT_EXPORT_BATCH", 50))
+
+# Tamanho máximo de um export baixado pelo navegador: o Streamlit guarda o arquivo inteiro
+# na memória do servidor até o download (por sessão), então o limite é pequeno e os
+# históricos maiores são encaminhados para a linha de comando
+EXPORT_MAX_BYTES = int(os.environ.get("MEETINGGPT_EXPORT_MAX_BYTES", 20 * 1024 * 1024))
+
+# Acima deste tamanho os arquivos intermediários (JSONL/CSV do zip) vão para o disco
+SPOOL_BYTES = 1024 * 1024
+
+EXPORT_FORMATS = ("zip", "jsonl")
+EXPORT_COLUMNS = ("id", "type", "title", "participants", "date", "start_time", "end_time", "tags", "archived",
+                  "summary_preview", "transcript", "insights")
+
+# Artefatos de áudio incluídos no zip quando solicitado
+AUDIO_KINDS = ("audio", "recording")
+
+# Soma dos textos de um registro (estimativa do tamanho do export)
+_TEXT_LENGTH = " + ".join(f"LENGTH(COALESCE({column}, ''))"
+                          for column in ("title", "participants", "summary_preview", "transcript", "insights"))
+
+
+class ExportTooLargeError(RuntimeError):
+    """Levantada quando o export ultrapassa o tamanho máximo permitido."""
+
+
+def _check_size(target, max_bytes):
+    if max_bytes and target.tell() > max_bytes:
+        raise ExportTooLargeError(f"O export ultrapassou o limite de {max_bytes} bytes.")
+
+
+def _read_connection():
+    # Conexão própria (somente leitura no SQLite, emprestada do pool no SQLAlchemy):
+    # o export não disputa o cursor das sessões
+    backend = get_backend()
+    connection, lease = backend.connect(database_meeting.DATABASE_PATH, read_only=True)
+    return connection, lambda: backend.release(lease)
+
+
+def _filters(user_id, date_from, date_to, record_type):
+    filters, params = ["user_id = ?"], [user_id]
+    for clause, value in (("date >= ?", date_from), ("date <= ?", date_to), ("type = ?", record_type)):
+        if value:
+            filters.append(clause)
+            params.append(str(value))
+    return " AND ".join(filters), params
+
+
+def iter_records(user_id, date_from=None, date_to=None, record_type=None, include_audio=False,
+                 batch_size=EXPORT_BATCH):
+    """
+    Percorre os registros do usuário em páginas de ``batch_size`` (paginação por ID).
+
+    Cada página é uma nova consulta a partir do último ID lido (``id > ? ... LIMIT``),
+    cujo cursor é fechado antes de entregar as linhas: nenhuma leitura fica aberta
+    enquanto o arquivo é gravado, então as escritas das outras sessões não esperam
+    pelo export.
+
+    :param user_id: ID do usuário.
+    :param date_from: Data inicial (AAAA-MM-DD, inclusiva, opcional).
+    :param date_to: Data final (AAAA-MM-DD, inclusiva, opcional).
+    :param record_type: 'meeting', 'diary' ou None para ambos.
+    :param include_audio: Inclui em cada registro a lista "audio" com os caminhos dos áudios.
+    :param batch_size: Registros por página.
+    :return: Gerador de dicionários com ``EXPORT_COLUMNS`` (e "audio").
+    """
+    where, params = _filters(user_id, date_from, date_to, record_type)
+    query = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM meetings WHERE {where} AND id > ? ORDER BY id LIMIT ?"
+
+    connection, release = _read_connection()
+    try:
+        last_id = 0
+        while True:
+            cursor = connection.execute(query, params + [last_id, batch_size])
+            rows = [dict(row) for row in cursor.fetchmany(batch_size)]
+            cursor.close()
+            if not rows:
+                return
+            last_id = rows[-1]["id"]
+            if include_audio:
+                audio = {}
+                marks = ",".join("?" * len(rows))
+                cursor = connection.execute(
+                    f"SELECT meeting_id, path FROM artifacts WHERE state != 'deleted' AND kind IN (?, ?) "
+                    f"AND meeting_id IN ({marks}) ORDER BY id",
+                    list(AUDIO_KINDS) + [row["id"] for row in rows]
+                )
+                for artifact in cursor.fetchall():
+                    audio.setdefault(artifact["meeting_id"], []).append(artifact["path"])
+                cursor.close()
+                for row in rows:
+                    row["audio"] = audio.get(row["id"], [])
+            yield from rows
+    finally:
+        release()
+
+
+def estimate_export_bytes(user_id, date_from=None, date_to=None, record_type=None, include_audio=False):
+    """
+    Tamanho aproximado do export (textos dos registros e, se incluídos, áudios), calculado
+    por uma consulta de agregação sem ler os registros.
+
+    :param user_id: ID do usuário.
+    :param date_from: Data inicial (opcional).
+    :param date_to: Data final (opcional).
+    :param record_type: 'meeting', 'diary' ou None para ambos.
+    :param include_audio: Soma os áudios registrados como artefatos.
+    :return: Estimativa em bytes.
+    """
+    where, params = _filters(user_id, date_from, date_to, record_type)
+    connection, release = _read_connection()
+    try:
+        cursor = connection.execute(f"SELECT COALESCE(SUM({_TEXT_LENGTH}), 0) FROM meetings WHERE {where}", params)
+        total = cursor.fetchone()[0]
+        cursor.close()
+        if include_audio:
+            cursor = connection.execute(
+                f"SELECT COALESCE(SUM(bytes), 0) FROM artifacts WHERE state != 'deleted' AND kind IN (?, ?) "
+                f"AND meeting_id IN (SELECT id FROM meetings WHERE {where})", list(AUDIO_KINDS) + params
+            )
+            total += cursor.fetchone()[0]
+            cursor.close()
+        return total
+    finally:
+        release()
+
+
+def export_command(user_id, export_format="zip", date_from=None, date_to=None, record_type=None,
+                   include_audio=False):
+    """Comando de linha de comando equivalente a um export (para históricos grandes)."""
+    command = [f"python -m database.export --user-id {user_id} --output historico.{export_format}",
+               f"--format {export_format}"]
+    for option, value in (("--from", date_from), ("--to", date_to), ("--type", record_type)):
+        if value:
+            command.append(f"{option} {value}")
+    if include_audio:
+        command.append("--audio")
+    return " ".join(command)
+
+
+def render_markdown(record):
+    """
+    Registro em markdown (um arquivo por registro dentro do zip).
+
+    :param record: Dicionário com ``EXPORT_COLUMNS``.
+    :return: Texto em markdown.
+    """
+    lines = [
+        f"# {record['title'] or 'Sem título'}",
+        "",
+        f"- **Tipo:** {record['type']}",
+        f"- **Data:** {record['date']} ({record['start_time'] or '--:--'} – {record['end_time'] or '--:--'})",
+    ]
+    if record.get("participants"):
+        lines.append(f"- **Participantes:** {record['participants']}")
+    if record.get("tags"):
+        lines.append(f"- **Etiquetas:** {record['tags']}")
+    for heading, column in (("Resumo prévio", "summary_preview"), ("Insights", "insights"),
+                            ("Transcrição", "transcript")):
+        if record.get(column):
+            lines += ["", f"## {heading}", "", record[column]]
+    return "\n".join(lines) + "\n"
+
+
+def _jsonl_line(record):
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _entry_name(record):
+    return f"{record['date'] or 'sem-data'}_{record['id']}"
+
+
+def _write_audio(archive, record):
+    # Arquivos entram no zip em blocos (zipfile lê do disco sob demanda)
+    for path in record.get("audio", []):
+        if os.path.isdir(path):
+            for dirpath, _, names in os.walk(path):
+                for name in sorted(names):
+                    full_path = os.path.join(dirpath, name)
+                    relative = os.path.relpath(full_path, os.path.dirname(path))
+                    archive.write(full_path, f"audio/{_entry_name(record)}/{relative}")
+        elif os.path.exists(path):
+            archive.write(path, f"audio/{_entry_name(record)}/{os.path.basename(path)}")
+        else:
+            logging.warning(f"⚠️ Áudio do registro {record['id']} não encontrado: {path}")
+
+
+def export_history(user_id, target, export_format="zip", date_from=None, date_to=None, record_type=None,
+                   include_audio=False, max_bytes=None):
+    """
+    Exporta o histórico do usuário em streaming para ``target``.
+
+    - 'jsonl': um registro por linha.
+    - 'zip': registros.jsonl, registros.csv, um markdown por registro em markdown/
+      e, se solicitado, os áudios em audio/.
+
+    A memória usada é a de uma página de registros, independente do tamanho do histórico.
+
+    :param user_id: ID do usuário.
+    :param target: Arquivo binário aberto para escrita.
+    :param export_format: 'zip' ou 'jsonl'.
+    :param date_from: Data inicial (opcional).
+    :param date_to: Data final (opcional).
+    :param record_type: 'meeting', 'diary' ou None para ambos.
+    :param include_audio: Inclui os áudios (apenas no zip).
+    :param max_bytes: Interrompe o export ao ultrapassar este tamanho (opcional, ``ExportTooLargeError``).
+    :return: Quantidade de registros exportados.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação desconhecido: {export_format}")
+    records = iter_records(user_id, date_from, date_to, record_type,
+                           include_audio=include_audio and export_format == "zip")
+    exported = 0
+    try:
+        with timed("db", operation=f"export_{export_format}"):
+            if export_format == "jsonl":
+                for record in records:
+                    target.write(_jsonl_line(record))
+                    exported += 1
+                    _check_size(target, max_bytes)
+            else:
+                # O zip aceita uma entrada aberta por vez: JSONL e CSV são acumulados em arquivos
+                # temporários (em disco acima de SPOOL_BYTES) e copiados para o zip no final
+                with tempfile.SpooledTemporaryFile(SPOOL_BYTES) as jsonl_file, \
+                        tempfile.SpooledTemporaryFile(SPOOL_BYTES) as csv_file, \
+                        zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as archive:
+                    csv_stream = io.TextIOWrapper(csv_file, encoding="utf-8", newline="")
+                    writer = csv.DictWriter(csv_stream, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+                    writer.writeheader()
+                    for record in records:
+                        jsonl_file.write(_jsonl_line(record))
+                        writer.writerow(record)
+                        archive.writestr(f"markdown/{_entry_name(record)}.md", render_markdown(record))
+                        if include_audio:
+                            _write_audio(archive, record)
+                        exported += 1
+                        _check_size(target, max_bytes)
+                    csv_stream.detach()
+                    for name, spooled in (("registros.jsonl", jsonl_file), ("registros.csv", csv_file)):
+                        spooled.seek(0)
+                        with archive.open(name, "w") as entry:
+                            shutil.copyfileobj(spooled, entry)
+                _check_size(target, max_bytes)
+        logging.info(f"📦 Histórico do usuário {user_id} exportado ({export_format}): {exported} registro(s).")
+        return exported
+    except Exception as e:
+        logging.error(f"❌ Erro ao exportar o histórico do usuário {user_id}: {e}")
+        raise
+    finally:
+        records.close()
+
+
+def export_to_bytes(user_id, max_bytes=EXPORT_MAX_BYTES, **options):
+    """
+    Gera o export em um arquivo temporário (fechado e apagado ao final) e retorna o
+    conteúdo, limitado a ``max_bytes`` (download pelo navegador).
+
+    :param user_id: ID do usuário.
+    :param max_bytes: Tamanho máximo do export (``ExportTooLargeError`` acima dele).
+    :param options: Parâmetros de ``export_history``.
+    :return: Conteúdo do export.
+    """
+    with tempfile.TemporaryFile() as target:
+        export_history(user_id, target, max_bytes=max_bytes, **options)
+        target.seek(0)
+        return target.read()
+
+
+# Execução manual: python -m database.export --user-id N --output historico.zip [--format jsonl] [--audio]
+if __name__ == "__main__":
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Exporta o histórico de um usuário.")
+    parser.add_argument("--user-id", type=int, required=True, help="Usuário exportado.")
+    parser.add_argument("--output", required=True, help="Arquivo de saída.")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="zip", help="Formato do arquivo.")
+    parser.add_argument("--from", dest="date_from", default=None, help="Data inicial (AAAA-MM-DD).")
+    parser.add_argument("--to", dest="date_to", default=None, help="Data final (AAAA-MM-DD).")
+    parser.add_argument("--type", dest="record_type", choices=("meeting", "diary"), default=None)
+    parser.add_argument("--audio", action="store_true", help="Inclui os áudios (zip).")
+    args = parser.parse_args()
+
+    with open(args.output, "wb") as output:
+        total = export_history(args.user_id, output, args.format, args.date_from, args.date_to,
+                               args.record_type, args.audio)
+    print(f"📦 {total} registro(s) exportado(s) para {args.output}.")
@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import OrderedDict
+from monitoring.metrics import registry
+
+# Usuários com histórico mantido em memória (os menos usados recentemente são descartados)
+HISTORY_CACHE_USERS = int(os.environ.get("MEETINGGPT_HISTORY_CACHE_USERS", "32"))
+
+
+class HistoryCache:
+    def __init__(self, max_users=HISTORY_CACHE_USERS):
+        """
+        Cache por usuário das listagens e dos registros do histórico.
+
+        Cada usuário tem um contador de revisão incrementado a cada escrita
+        (inserção, edição ou exclusão); uma entrada só é reaproveitada se foi
+        carregada na revisão atual, então a invalidação acontece exatamente nas
+        escritas, sem TTL. Os registros em cache são compartilhados: trate-os
+        como somente leitura.
+
+        :param max_users: Número máximo de usuários em cache (LRU).
+        """
+        self.max_users = max_users
+        self.revisions = {}
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        registry.add_collector(self._publish_gauges)
+
+    def revision(self, user_id):
+        """Revisão atual dos dados do usuário."""
+        return self.revisions.get(user_id, 0)
+
+    def bump(self, user_id):
+        """Registra uma escrita nos dados do usuário (invalida o cache dele)."""
+        with self._lock:
+            self.revisions[user_id] = self.revisions.get(user_id, 0) + 1
+            self.entries.pop(user_id, None)
+
+    def _entry(self, user_id):
+        entry = self.entries.get(user_id)
+        if entry is None or entry["revision"] != self.revision(user_id):
+            return None
+        self.entries.move_to_end(user_id)
+        return entry
+
+    def _store(self, user_id, revision, records=None, details=None):
+        if self.revisions.get(user_id, 0) != revision:
+            # Houve uma escrita durante a consulta: o resultado já nasce desatualizado
+            return
+        entry = self.entries.get(user_id)
+        if entry is None or entry["revision"] != revision:
+            entry = {"revision": revision, "records": None, "details": {}}
+            self.entries[user_id] = entry
+        if records is not None:
+            entry["records"] = records
+            entry["details"].update((record["id"], record) for record in records)
+        if details is not None:
+            entry["details"][details["id"]] = details
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.max_users:
+            self.entries.popitem(last=False)
+
+    def records(self, user_id, loader):
+        """
+        Listagem do histórico do usuário.
+
+        :param user_id: ID do usuário.
+        :param loader: Função sem argumentos que busca os registros no banco (em caso de falta).
+        :return: Lista de registros (dicionários).
+        """
+        with self._lock:
+            entry = self._entry(user_id)
+            if entry is not None and entry["records"] is not None:
+                self.hits += 1
+                return entry["records"]
+            self.misses += 1
+            revision = self.revision(user_id)
+        records = loader()
+        with self._lock:
+            self._store(user_id, revision, records=records)
+        return records
+
+    def record(self, user_id, record_id, loader):
+        """
+        Registro individual do histórico.
+
+        :param user_id: ID do usuário dono do registro.
+        :param record_id: ID do registro.
+        :param loader: Função sem argumentos que busca o registro no banco (em caso de falta).
+        :return: Dicionário do registro ou None.
+        """
+        with self._lock:
+            entry = self._entry(user_id)
+            if entry is not None and record_id in entry["details"]:
+                self.hits += 1
+                return entry["details"][record_id]
+            self.misses += 1
+            revision = self.revision(user_id)
+        record = loader()
+        if record is not None:
+            with self._lock:
+                self._store(user_id, revision, details=record)
+        return record
+
+    def _publish_gauges(self):
+        registry.set_gauge("history_cache_users", len(self.entries))
+        registry.set_gauge("history_cache_hits", self.hits)
+        registry.set_gauge("history_cache_misses", self.misses)
+
+
+_history_cache = None
+_history_cache_lock = threading.Lock()
+
+
+def get_history_cache():
+    """Cache de histórico compartilhado pelo processo (todas as sessões do Streamlit)."""
+    global _history_cache
+    with _history_cache_lock:
+        if _history_cache is None:
+            _history_cache = HistoryCache()
+        return _history_cache
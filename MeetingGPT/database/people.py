@@ -0,0 +1,129 @@
+import argparse
+import logging
+from utils.text import split_participants
+from monitoring.logging_config import setup_logging
+
+# Linhas lidas por vez na reconstrução (memória constante)
+REBUILD_BATCH = 500
+
+
+def create_tables(connection):
+    """
+    Cria o índice normalizado de participantes: 'people' (uma linha por pessoa e
+    usuário, chave sem acentos/minúsculas) e 'meeting_participants' (registro x
+    pessoa, com a data do registro para a linha do tempo); um banco anterior ao
+    índice é preenchido uma única vez.
+
+    :param connection: Conexão com o banco de reuniões.
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.executescript('''
+            CREATE TABLE IF NOT EXISTS people (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                person_key TEXT NOT NULL,  -- nome sem acentos/minúsculas
+                display_name TEXT NOT NULL,
+                UNIQUE (user_id, person_key)
+            );
+
+            CREATE TABLE IF NOT EXISTS meeting_participants (
+                person_id INTEGER NOT NULL,
+                meeting_date TEXT NOT NULL,
+                meeting_id INTEGER NOT NULL,
+                PRIMARY KEY (person_id, meeting_date, meeting_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_meeting_participants_meeting ON meeting_participants(meeting_id);
+        ''')
+        connection.commit()
+        logging.info("✅ Tabelas de participantes criadas/verificadas com sucesso.")
+
+        # Banco anterior ao índice de participantes: preenche uma única vez
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM people), EXISTS (SELECT 1 FROM meetings)")
+        has_people, has_records = cursor.fetchone()
+        if has_records and not has_people:
+            rebuild(connection)
+    except Exception as e:
+        logging.error(f"❌ Erro ao criar as tabelas de participantes: {e}")
+        raise
+
+
+def index_participants(cursor, meeting_id, user_id, participants, meeting_date):
+    """
+    (Re)indexa os participantes de um registro nas tabelas 'people' e 'meeting_participants'.
+
+    Executado pelo caminho de escrita, na mesma transação da alteração do registro.
+
+    :param cursor: Cursor da conexão (transação do chamador).
+    :param meeting_id: ID do registro.
+    :param user_id: ID do usuário dono do registro.
+    :param participants: Texto livre do campo participantes.
+    :param meeting_date: Data do registro (AAAA-MM-DD), guardada no índice para a linha do tempo.
+    """
+    cursor.execute("DELETE FROM meeting_participants WHERE meeting_id = ?", (meeting_id,))
+    people = split_participants(participants)
+    if not people:
+        return
+    cursor.executemany(
+        "INSERT OR IGNORE INTO people (user_id, person_key, display_name) VALUES (?, ?, ?)",
+        [(user_id, key, name) for key, name in people]
+    )
+    cursor.executemany('''
+        INSERT OR IGNORE INTO meeting_participants (person_id, meeting_date, meeting_id)
+        SELECT id, ?, ? FROM people WHERE user_id = ? AND person_key = ?
+    ''', [(meeting_date, meeting_id, user_id, key) for key, _ in people])
+
+
+def rebuild(connection, user_id=None):
+    """
+    Reconstrói o índice de participantes a partir de 'meetings' (backfill ou correção).
+
+    :param connection: Conexão com o banco de reuniões.
+    :param user_id: Reconstrói apenas um usuário (opcional).
+    :return: Quantidade de registros processados.
+    """
+    where, params = ("WHERE user_id = ?", (user_id,)) if user_id is not None else ("", ())
+    processed = 0
+    writer, reader = connection.cursor(), connection.cursor()
+    with connection:
+        if user_id is None:
+            writer.execute("DELETE FROM meeting_participants")
+        else:
+            writer.execute('''
+                DELETE FROM meeting_participants WHERE person_id IN (SELECT id FROM people WHERE user_id = ?)
+            ''', params)
+        reader.execute(f"SELECT id, user_id, participants, date FROM meetings {where} ORDER BY id", params)
+        while True:
+            rows = reader.fetchmany(REBUILD_BATCH)
+            if not rows:
+                break
+            for row in rows:
+                index_participants(writer, row["id"], row["user_id"], row["participants"], row["date"])
+            processed += len(rows)
+        # Pessoas que não aparecem em mais nenhum registro
+        writer.execute(f'''
+            DELETE FROM people WHERE id NOT IN (SELECT DISTINCT person_id FROM meeting_participants)
+            {"AND user_id = ?" if user_id is not None else ""}
+        ''', params)
+    logging.info(f"👥 Índice de participantes reconstruído: {processed} registro(s).")
+    return processed
+
+
+# Execução manual: python -m database.people --rebuild [--user-id N]
+if __name__ == "__main__":
+    setup_logging()
+    from database.repository import get_meeting_repository
+
+    parser = argparse.ArgumentParser(description="Manutenção do índice de participantes.")
+    parser.add_argument("--rebuild", action="store_true", help="Recalcula o índice a partir de 'meetings'.")
+    parser.add_argument("--user-id", type=int, default=None, help="Restringe a um usuário.")
+    args = parser.parse_args()
+
+    database = get_meeting_repository()
+    try:
+        if args.rebuild:
+            print(f"👥 {rebuild(database.connection, args.user_id)} registro(s) processado(s).")
+        else:
+            parser.print_help()
+    finally:
+        database.close_connection()
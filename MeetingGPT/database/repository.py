@@ -0,0 +1,328 @@
+"""
+Interfaces de acesso a dados usadas pelas telas, pelo pipeline e pelos jobs.
+
+As telas não abrem conexões nem executam SQL: obtêm os repositórios pelas
+funções ``get_*_repository`` e chamam apenas os métodos abaixo. Cada interface
+cobre um domínio (registros, artefatos, estado do pipeline, insights
+estruturados, resumos por período, análises/participantes e usuários); as
+implementações (``database.database_*``) recebem as conexões de
+``database.backends`` — sqlite3 direto no arquivo local ou um pool do
+SQLAlchemy configurado por MEETINGGPT_DATABASE_URL.
+
+Uma tela que usa várias interfaces abre a primeira e passa ``share=`` às
+demais: todas usam a mesma conexão, devolvida no ``close_connection`` de
+quem a abriu.
+
+Os métodos são abstratos: uma implementação incompleta falha ao ser instanciada.
+
+Escopo: os backends servem um único host. O SQL é do dialeto do SQLite (o
+SQLAlchemy só aceita URLs sqlite e contribui com o pool de conexões) e o cache
+do histórico em memória não é invalidado por escritas de outros processos;
+várias réplicas sobre um banco servidor não são suportadas.
+"""
+from abc import ABC, abstractmethod
+
+
+class MeetingRepository(ABC):
+    """Reuniões e diários; as escritas mantêm, na mesma transação, os dados derivados de cada registro."""
+
+    @abstractmethod
+    def insert_record(self, record, structured=None):
+        """Insere um registro (e, na mesma transação, seus insights estruturados) e retorna o seu ID."""
+
+    @abstractmethod
+    def insert_records(self, records):
+        """Insere vários registros em uma única transação e retorna os IDs."""
+
+    @abstractmethod
+    def update_record(self, record_id, fields):
+        """Atualiza campos de um registro."""
+
+    @abstractmethod
+    def delete_record(self, record_id):
+        """Exclui um registro."""
+
+    @abstractmethod
+    def bulk_delete(self, user_id, record_ids, remove_files=True):
+        """Exclui registros do usuário; retorna a quantidade removida."""
+
+    @abstractmethod
+    def bulk_archive(self, user_id, record_ids, archived=True):
+        """Arquiva/desarquiva registros do usuário; retorna a quantidade alterada."""
+
+    @abstractmethod
+    def bulk_retag(self, user_id, record_ids, tags):
+        """Substitui as etiquetas de registros do usuário; retorna a quantidade alterada."""
+
+    @abstractmethod
+    def fetch_all_records(self):
+        """Todos os registros (administração)."""
+
+    @abstractmethod
+    def fetch_records_by_user(self, user_id):
+        """Listagem leve dos registros do usuário."""
+
+    @abstractmethod
+    def fetch_record(self, user_id, record_id):
+        """Registro completo do usuário ou None."""
+
+    @abstractmethod
+    def cached_records_by_user(self, user_id):
+        """``fetch_records_by_user`` através do cache do histórico."""
+
+    @abstractmethod
+    def cached_record(self, user_id, record_id):
+        """``fetch_record`` através do cache do histórico."""
+
+    @abstractmethod
+    def fetch_records_between(self, user_id, date_from, date_to, record_type=None):
+        """Registros completos do usuário em um intervalo de datas."""
+
+    @abstractmethod
+    def close_connection(self):
+        """Libera a conexão do repositório."""
+
+
+class ArtifactRepository(ABC):
+    """Arquivos gerados para os registros e retenção por usuário."""
+
+    @abstractmethod
+    def register_artifact(self, meeting_id, user_id, kind, path, codec=None):
+        """Registra um arquivo gerado para um registro."""
+
+    @abstractmethod
+    def fetch_artifacts(self, meeting_id):
+        """Artefatos de um registro."""
+
+    @abstractmethod
+    def set_retention_policy(self, user_id, retention_days):
+        """Define a retenção dos arquivos do usuário."""
+
+    @abstractmethod
+    def get_retention_policy(self, user_id):
+        """Retenção do usuário em dias ou None."""
+
+    @abstractmethod
+    def artifact_shared(self, artifact):
+        """Indica se outro artefato ativo aponta para o mesmo arquivo."""
+
+    @abstractmethod
+    def fetch_transcode_candidates(self, limit, kinds=("audio", "recording")):
+        """Áudios brutos de registros já transcritos, fora da espera de nova tentativa."""
+
+    @abstractmethod
+    def mark_transcode_failed(self, artifact_id, max_attempts, retry_seconds):
+        """Registra uma falha de compressão (espera crescente; 'failed' após o limite)."""
+
+    @abstractmethod
+    def fetch_expired_artifacts(self, default_retention_days, limit):
+        """Artefatos que ultrapassaram a retenção do usuário."""
+
+    @abstractmethod
+    def mark_artifact_deleted(self, artifact_id):
+        """Marca um artefato como removido do disco."""
+
+    @abstractmethod
+    def mark_artifacts_transcoded(self, source_path, target_path, codec, size):
+        """Aponta os artefatos brutos de ``source_path`` para o arquivo comprimido."""
+
+    @abstractmethod
+    def disk_usage_report(self, user_id=None):
+        """Uso de disco por usuário, tipo e estado dos artefatos."""
+
+    @abstractmethod
+    def close_connection(self):
+        """Libera a conexão do repositório."""
+
+
+class CheckpointRepository(ABC):
+    """Estado do pipeline: checkpoints das etapas e cache de resumos parciais."""
+
+    @abstractmethod
+    def save_checkpoint(self, recording_id, unit, payload):
+        """Salva o resultado de uma etapa do pipeline."""
+
+    @abstractmethod
+    def load_checkpoints(self, recording_id):
+        """Checkpoints de uma gravação por unidade."""
+
+    @abstractmethod
+    def clear_checkpoints(self, recording_id):
+        """Remove os checkpoints de uma gravação."""
+
+    @abstractmethod
+    def get_cached_summary(self, content_hash):
+        """Resumo parcial em cache ou None."""
+
+    @abstractmethod
+    def cache_summary(self, content_hash, summary):
+        """Guarda um resumo parcial."""
+
+    @abstractmethod
+    def prune_summary_cache(self, max_entries, max_age_days):
+        """Limpa o cache de resumos por idade e quantidade; retorna as entradas removidas."""
+
+    @abstractmethod
+    def close_connection(self):
+        """Libera a conexão do repositório."""
+
+
+class InsightsRepository(ABC):
+    """Insights estruturados: itens de ação e decisões entre reuniões."""
+
+    @abstractmethod
+    def save_structured_insights(self, meeting_id, user_id, structured):
+        """Salva decisões e itens de ação de um registro."""
+
+    @abstractmethod
+    def fetch_action_items(self, user_id, status="open", owner=None, due_from=None, due_to=None):
+        """Itens de ação do usuário."""
+
+    @abstractmethod
+    def fetch_decisions(self, user_id, date_from=None, date_to=None):
+        """Decisões do usuário."""
+
+    @abstractmethod
+    def set_action_item_status(self, user_id, item_id, status):
+        """Altera o status de um item de ação."""
+
+    @abstractmethod
+    def close_connection(self):
+        """Libera a conexão do repositório."""
+
+
+class DigestRepository(ABC):
+    """Resumos por período (dia, semana e mês)."""
+
+    @abstractmethod
+    def get_digest(self, user_id, record_type, level, period_start):
+        """Resumo de um período ou None."""
+
+    @abstractmethod
+    def save_digest(self, user_id, record_type, level, period_start, summary):
+        """Guarda o resumo de um período."""
+
+    @abstractmethod
+    def close_connection(self):
+        """Libera a conexão do repositório."""
+
+
+class AnalyticsRepository(ABC):
+    """Agregados do painel do histórico e índice de participantes."""
+
+    @abstractmethod
+    def fetch_analytics(self, user_id, weeks=12, top_participants=10):
+        """Agregados do painel do histórico."""
+
+    @abstractmethod
+    def fetch_people(self, user_id):
+        """Participantes do usuário."""
+
+    @abstractmethod
+    def fetch_person_timeline(self, user_id, person, limit=50, before=None, include_archived=True):
+        """Registros de um participante, do mais recente ao mais antigo."""
+
+    @abstractmethod
+    def fetch_person_record_ids(self, user_id, person):
+        """IDs dos registros de um participante."""
+
+    @abstractmethod
+    def close_connection(self):
+        """Libera a conexão do repositório."""
+
+
+class UserRepository(ABC):
+    """Contas de usuário."""
+
+    @abstractmethod
+    def insert_user(self, nome, usuario, senha):
+        """Cadastra um usuário; retorna o ID ou None se o nome já existir."""
+
+    @abstractmethod
+    def get_user(self, usuario):
+        """Usuário (com o hash da senha) ou None."""
+
+    @abstractmethod
+    def authenticate_user(self, usuario, senha):
+        """Confere a senha do usuário."""
+
+    @abstractmethod
+    def fetch_all_users(self):
+        """Usuários cadastrados (sem a senha)."""
+
+    @abstractmethod
+    def close_connection(self):
+        """Libera a conexão do repositório."""
+
+
+def get_meeting_repository(backend=None, share=None):
+    """
+    Repositório de reuniões e diários sobre o backend do processo.
+
+    :param backend: Backend explícito (opcional; padrão ``database.backends.get_backend()``).
+    :param share: Repositório cuja conexão é reaproveitada (opcional).
+    :return: MeetingRepository (feche com ``close_connection``).
+    """
+    from database.database_meeting import DatabaseMeeting
+    return DatabaseMeeting(backend=backend, share=share)
+
+
+def get_artifact_repository(backend=None, share=None):
+    """
+    Repositório de artefatos e retenção (mesmos parâmetros de ``get_meeting_repository``).
+
+    :return: ArtifactRepository.
+    """
+    from database.database_artifacts import DatabaseArtifacts
+    return DatabaseArtifacts(backend=backend, share=share)
+
+
+def get_checkpoint_repository(backend=None, share=None):
+    """
+    Repositório de checkpoints e do cache de resumos (mesmos parâmetros de ``get_meeting_repository``).
+
+    :return: CheckpointRepository.
+    """
+    from database.database_checkpoints import DatabaseCheckpoints
+    return DatabaseCheckpoints(backend=backend, share=share)
+
+
+def get_insights_repository(backend=None, share=None):
+    """
+    Repositório de itens de ação e decisões (mesmos parâmetros de ``get_meeting_repository``).
+
+    :return: InsightsRepository.
+    """
+    from database.database_insights import DatabaseInsights
+    return DatabaseInsights(backend=backend, share=share)
+
+
+def get_digest_repository(backend=None, share=None):
+    """
+    Repositório de resumos por período (mesmos parâmetros de ``get_meeting_repository``).
+
+    :return: DigestRepository.
+    """
+    from database.database_digests import DatabaseDigests
+    return DatabaseDigests(backend=backend, share=share)
+
+
+def get_analytics_repository(backend=None, share=None):
+    """
+    Repositório do painel e dos participantes (mesmos parâmetros de ``get_meeting_repository``).
+
+    :return: AnalyticsRepository.
+    """
+    from database.database_analytics import DatabaseAnalytics
+    return DatabaseAnalytics(backend=backend, share=share)
+
+
+def get_user_repository(backend=None):
+    """
+    Repositório de usuários sobre o backend do processo.
+
+    :param backend: Backend explícito (opcional; padrão ``database.backends.get_backend()``).
+    :return: UserRepository (feche com ``close_connection``).
+    """
+    from database.database_user import DatabaseUser
+    return DatabaseUser(backend=backend)
@@ -1,13 +1,9 @@
 import streamlit as st
 import logging
 import os
-
-# Configuração do logger
-logging.basicConfig(
-    filename='screen_config.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from database.repository import get_artifact_repository
+from storage.lifecycle import get_lifecycle_manager
+from monitoring.logging_config import setup_logging
 
 class ConfigScreen:
     def __init__(self):
@@ -52,11 +48,49 @@ class ConfigScreen:
 
             st.write("🔹 Nota: A chave será usada apenas durante esta sessão e não será salva permanentemente.")
 
+            if st.session_state.get("user_id"):
+                self.render_storage(st.session_state["user_id"])
+
         except Exception as e:
             logging.error(f"❌ Erro ao renderizar a tela de configuração: {e}")
             st.error("Ocorreu um erro ao carregar a tela de configuração.")
 
+    def render_storage(self, user_id):
+        """
+        Exibe o uso de disco do usuário e permite ajustar a retenção dos arquivos.
+        """
+        try:
+            st.subheader("🗄️ Armazenamento")
+            lifecycle = get_lifecycle_manager()
+            report = lifecycle.disk_usage_report(user_id)
+            if report:
+                st.table([
+                    {"Tipo": row["kind"], "Estado": row["state"], "Arquivos": row["artifacts"],
+                     "MB": round((row["bytes"] or 0) / 1024 ** 2, 2)}
+                    for row in report
+                ])
+            else:
+                st.info("Nenhum arquivo armazenado.")
+
+            db = get_artifact_repository()
+            try:
+                current = db.get_retention_policy(user_id)
+                days = st.number_input(
+                    "Manter áudios e arquivos por (dias, 0 = para sempre):",
+                    min_value=0, step=1,
+                    value=lifecycle.default_retention_days if current is None else current
+                )
+                if st.button("Salvar Retenção"):
+                    db.set_retention_policy(user_id, days)
+                    st.success("✅ Política de retenção atualizada.")
+            finally:
+                db.close_connection()
+        except Exception as e:
+            logging.error(f"❌ Erro ao exibir o armazenamento: {e}")
+            st.error("Não foi possível carregar as informações de armazenamento.")
+
 # Exemplo de uso
 if __name__ == "__main__":
+    setup_logging()
     config_screen = ConfigScreen()
     config_screen.render()
@@ -1,24 +1,21 @@
 import streamlit as st
 import logging
+import os
 import datetime
-from database.database_meeting import DatabaseMeeting
-from audio_processing.audio_recorder import AudioRecorder
+from database.repository import get_artifact_repository, get_checkpoint_repository, get_meeting_repository
+from audio_processing.recording_manager import get_recording_manager, RecordingCapacityError
 from audio_processing.transcribe import AudioTranscriber
 from insights.insights_generator import InsightsGenerator
-
-# Configuração inicial do logger
-logging.basicConfig(
-    filename='screen_dmental.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from pipeline.meeting_pipeline import MeetingPipeline
+from frontend.recording_widgets import render_capture_health, render_recovery, render_upload
+from monitoring.metrics import new_trace_id, set_trace_id
+from monitoring.logging_config import setup_logging
 
 class DiaryScreen:
     def __init__(self, user_id=None):
         """
         Inicializa a tela de diário mental, conectando-se ao banco de dados e configurando os módulos.
         """
-        self.db = DatabaseMeeting()
         self.transcriber = AudioTranscriber()
         self.insights_generator = InsightsGenerator()
         self.user_id = user_id or st.session_state.get("user_id")
@@ -26,6 +23,12 @@ class DiaryScreen:
         # Inicializa variáveis no session_state
         self.init_session_state()
 
+        # Conexão por último: se algo acima falhar (ex.: sem chave da OpenAI), nenhuma fica pendente
+        self.db = get_meeting_repository()
+        self.checkpoints = get_checkpoint_repository(share=self.db)
+        self.pipeline = MeetingPipeline(self.transcriber, self.insights_generator, self.checkpoints,
+                                        get_artifact_repository(share=self.db))
+
     def init_session_state(self):
         """Inicializa variáveis da sessão do Streamlit para evitar erros."""
         if "recording" not in st.session_state:
@@ -34,6 +37,10 @@ class DiaryScreen:
             st.session_state["audio_file_path"] = None
         if "audio_recorder" not in st.session_state:
             st.session_state["audio_recorder"] = None
+        if "trace_id" not in st.session_state:
+            st.session_state["trace_id"] = None
+        if "recording_id" not in st.session_state:
+            st.session_state["recording_id"] = None
         if "user_id" not in st.session_state:
             st.session_state["user_id"] = self.user_id
         if "diary_data" not in st.session_state:
@@ -46,7 +53,8 @@ class DiaryScreen:
                 "start_time": datetime.datetime.now().time().strftime("%H:%M"),
                 "end_time": (datetime.datetime.now() + datetime.timedelta(hours=1)).time().strftime("%H:%M"),
                 "transcript": "",
-                "insights": ""
+                "insights": "",
+                "summary_preview": ""
             }
 
     def render(self):
@@ -61,6 +69,9 @@ class DiaryScreen:
                 st.error("⚠️ Usuário não identificado. Faça login novamente.")
                 return
 
+            # Associa as métricas desta execução ao trace da gravação em andamento
+            set_trace_id(st.session_state["trace_id"])
+
             # Atualiza user_id na sessão
             st.session_state["diary_data"]["user_id"] = self.user_id
 
@@ -79,6 +90,18 @@ class DiaryScreen:
                 if st.button("🛑 Finalizar Diário"):
                     self.stop_diary()
 
+            # 🎤 Captura pelo navegador: o componente WebRTC precisa ser renderizado a cada execução
+            recorder = st.session_state["audio_recorder"]
+            if st.session_state["recording"] and hasattr(recorder, "render_widget"):
+                recorder.render_widget(key="diary-webrtc")
+            if st.session_state["recording"] and hasattr(recorder, "health"):
+                render_capture_health(recorder.health.snapshot())
+
+            # 🩹 Gravações interrompidas (queda do servidor, sessão perdida) podem ser recuperadas
+            if not st.session_state["recording"] and not st.session_state["audio_file_path"]:
+                render_recovery(self.user_id)
+                render_upload(self.user_id, "📤 Ou envie o arquivo do diário:", key="diary-upload")
+
             if st.session_state["audio_file_path"]:
                 if st.button("📝 Gerar Transcrição e Insights"):
                     self.generate_transcription_and_insights()
@@ -92,11 +115,16 @@ class DiaryScreen:
     def start_diary(self):
         """Inicia a gravação de áudio do diário mental."""
         try:
-            st.session_state["audio_recorder"] = AudioRecorder()
-            st.session_state["audio_recorder"].start_recording()
+            st.session_state["trace_id"] = new_trace_id()
+            set_trace_id(st.session_state["trace_id"])
+            st.session_state["audio_recorder"] = get_recording_manager().start_recording(self.user_id)
+            st.session_state["recording_id"] = st.session_state["audio_recorder"].recording_id
             st.session_state["recording"] = True
             logging.info("🟢 Diário iniciado e gravação de áudio em andamento.")
             st.success("✅ Diário iniciado com sucesso. Gravação de áudio em andamento.")
+        except RecordingCapacityError as e:
+            logging.warning(f"⚠️ Gravação recusada por limite de capacidade: {e}")
+            st.warning(f"⚠️ {e}")
         except Exception as e:
             logging.error(f"❌ Erro ao iniciar a gravação: {e}")
             st.error("Erro ao iniciar a gravação de áudio.")
@@ -105,9 +133,9 @@ class DiaryScreen:
         """Finaliza a gravação do diário mental e salva o áudio."""
         try:
             if st.session_state["audio_recorder"]:
-                st.session_state["audio_recorder"].stop_recording()
+                audio_path = get_recording_manager().stop_recording(st.session_state["audio_recorder"])
                 st.session_state["recording"] = False
-                audio_path = st.session_state["audio_recorder"].save_audio()
+                st.session_state["audio_recorder"] = None
 
                 if audio_path:
                     st.session_state["audio_file_path"] = audio_path
@@ -130,31 +158,56 @@ class DiaryScreen:
 
             audio_file_path = st.session_state["audio_file_path"]
 
-            # Transcrição do áudio
-            transcription_data = self.transcriber.transcribe_audio(audio_file_path)
-            st.session_state["diary_data"]["transcript"] = transcription_data.get("text", "")
-
-            # Geração de insights
-            insights_data = self.insights_generator.generate_insights(st.session_state["diary_data"]["transcript"])
-            st.session_state["diary_data"]["insights"] = insights_data.get("insights", "")
+            # Transcrição e insights, retomando as etapas já concluídas em tentativas anteriores
+            recording_id = self.recording_key(audio_file_path)
+            # Resumo extrativo local exibido assim que a transcrição termina, antes dos insights do LLM
+            preview_area = st.empty()
+            with st.spinner("Transcrevendo e gerando insights..."):
+                result = self.pipeline.run(
+                    recording_id, audio_file_path, self.recording_dir(),
+                    participants=st.session_state["diary_data"].get("participants", ""),
+                    label_speakers_in_transcript=False,
+                    on_preview=lambda preview: preview and preview_area.info(preview),
+                    reference_date=st.session_state["diary_data"]["date"]
+                )
+            st.session_state["diary_data"]["transcript"] = result["transcript"]
+            st.session_state["diary_data"]["insights"] = result["insights"]
+            st.session_state["diary_data"]["summary_preview"] = result["preview"]
 
             # Atualiza o user_id no dicionário antes de salvar no banco
             st.session_state["diary_data"]["user_id"] = self.user_id
 
             # Insere no banco de dados
-            record_id = self.db.insert_record(st.session_state["diary_data"])
+            record_id = self.db.insert_record(st.session_state["diary_data"], structured=result["structured"])
+            self.pipeline.register_artifacts(record_id, self.user_id, audio_file_path, self.recording_dir(), result)
+            self.checkpoints.clear_checkpoints(recording_id)
             st.success(f"✅ Dados salvos com sucesso no banco de dados! ID: {record_id}")
             logging.info(f"💾 Transcrição e insights gerados e salvos no banco de dados. ID: {record_id}.")
 
         except Exception as e:
             logging.error(f"❌ Erro ao gerar transcrição e insights: {e}")
             st.error("Erro ao gerar transcrição e insights.")
+            progress = self.pipeline.progress(self.recording_key(st.session_state["audio_file_path"]))
+            if any(progress.values()):
+                st.info(f"💾 Etapas concluídas foram salvas ({progress['transcript_chunks']} trecho(s) transcrito(s)). "
+                        "Clique novamente para continuar de onde parou.")
+
+    def recording_key(self, audio_file_path):
+        """ID usado nos checkpoints: o da gravação ou, na falta dele, o nome (hash) do áudio."""
+        return st.session_state.get("recording_id") or os.path.splitext(os.path.basename(audio_file_path))[0]
+
+    def recording_dir(self):
+        """Diretório da gravação segmentada da sessão (None se não houver)."""
+        if not st.session_state.get("recording_id"):
+            return None
+        return os.path.join(get_recording_manager().user_dir(self.user_id), st.session_state["recording_id"])
 
     def cleanup(self):
         """Encerra a conexão com o banco de dados."""
         self.db.close_connection()
 
 if __name__ == "__main__":
+    setup_logging()
     screen = DiaryScreen()
     try:
         screen.render()
@@ -1,13 +1,18 @@
 import streamlit as st
 import logging
-from database.database_meeting import DatabaseMeeting
+import datetime
+from database.repository import (get_analytics_repository, get_checkpoint_repository, get_digest_repository,
+                                 get_insights_repository, get_meeting_repository)
+from insights.insights_generator import InsightsGenerator
+from insights.incremental import IncrementalInsights
+from insights.digests import DigestBuilder
+from insights.extractive import extractive_summary, format_preview
+from insights.structured import FACETS, FACET_LABELS, render_structured_insights
+from database.export import export_to_bytes, estimate_export_bytes, export_command, EXPORT_MAX_BYTES
+from monitoring.logging_config import setup_logging
 
-# Configuração inicial do logger
-logging.basicConfig(
-    filename='screen_historico.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Registros exibidos por página no histórico
+HISTORY_PAGE_SIZE = 20
 
 class HistoryScreen:
     def __init__(self, user_id):
@@ -16,8 +21,13 @@ class HistoryScreen:
 
         :param user_id: ID do usuário logado para filtrar os registros.
         """
-        self.db = DatabaseMeeting()
+        self.db = get_meeting_repository()
+        # Painel, participantes e itens de ação na mesma conexão dos registros
+        self.analytics = get_analytics_repository(share=self.db)
+        self.insights = get_insights_repository(share=self.db)
         self.user_id = user_id  # ID do usuário logado
+        self.incremental = None  # Criado ao atualizar insights (exige a chave da OpenAI)
+        self.digests = None  # Idem, ao gerar o resumo de um período
 
     def render(self):
         """
@@ -26,23 +36,67 @@ class HistoryScreen:
         try:
             st.title("📜 Histórico de Reuniões e Diários Mentais")
 
-            # Obtém apenas os registros do usuário logado
-            records = self.db.fetch_records_by_user(self.user_id)
+            notice = st.session_state.pop("history_notice", None)
+            if notice:
+                st.success(notice)
 
-            if not records:
-                st.info("📌 Nenhum registro encontrado para este usuário.")
-                return
+            show_archived = st.checkbox("🗄️ Mostrar arquivados", key="history_show_archived")
+
+            # Filtro por participante (índice normalizado: maiúsculas e acentos não importam)
+            people = [person["display_name"] for person in self.analytics.fetch_people(self.user_id)]
+            person = st.selectbox("👥 Participante", ["Todos"] + people, key="history_person")
+
+            if person == "Todos":
+                # Obtém apenas os registros do usuário logado (cache invalidado a cada escrita)
+                records = self.db.cached_records_by_user(self.user_id)
+                if not records:
+                    st.info("📌 Nenhum registro encontrado para este usuário.")
+                    return
+                records = [record for record in records if show_archived or not record.get('archived')]
+            else:
+                records = self.person_page(person, show_archived)
 
-            # Exibe os registros em uma tabela interativa
+            self.render_dashboard()
+            self.render_bulk_actions(records)
+            self.render_action_items()
+            self.render_digest()
+            self.render_export()
+
+            # Exibe os registros em uma tabela interativa, uma página por vez (cada registro
+            # tem vários widgets e o custo de cada rerun cresce com o total deles)
             st.write("### 📂 Registros Salvos")
+            if person == "Todos":
+                pages = max(1, -(-len(records) // HISTORY_PAGE_SIZE))
+                page = st.number_input("Página", 1, pages, 1, key="history_page") if pages > 1 else 1
+                records = records[(page - 1) * HISTORY_PAGE_SIZE:page * HISTORY_PAGE_SIZE]
+            else:
+                self.render_person_pager()
             for record in records:
-                with st.expander(f"📌 {record['type'].capitalize()} - {record['title']} (ID: {record['id']})"):
+                archived = " 🗄️" if record.get('archived') else ""
+                with st.expander(f"📌 {record['type'].capitalize()} - {record['title']} (ID: {record['id']}){archived}"):
                     st.text(f"👤 Criado por: Usuário {record['user_id']}")
                     st.text(f"👥 Participantes: {record['participants']}")
+                    if record.get('tags'):
+                        st.text(f"🏷️ Etiquetas: {record['tags']}")
                     st.text(f"📅 Data: {record['date']}")
                     st.text(f"⏳ Início: {record['start_time']} | Fim: {record['end_time']}")
-                    st.text_area("📝 Transcrição:", record['transcript'], height=150)
-                    st.text_area("💡 Insights:", record['insights'], height=100)
+                    transcript = st.text_area("📝 Transcrição:", record['transcript'], height=150,
+                                              key=f"transcript_{record['id']}")
+                    if record.get('summary_preview'):
+                        st.info(record['summary_preview'])
+                    st.text_area("💡 Insights:", record['insights'], height=100, key=f"insights_{record['id']}")
+
+                    # Salva a transcrição editada e refaz apenas os resumos dos blocos alterados
+                    if st.button("🔄 Atualizar insights", key=f"reinsights_{record['id']}"):
+                        self.update_insights(record, transcript)
+                        st.rerun()
+
+                    # Refaz apenas uma seção dos insights (as demais vêm do cache)
+                    facet = st.selectbox("Seção dos insights", FACETS, format_func=FACET_LABELS.get,
+                                         key=f"facet_{record['id']}")
+                    if st.button("🔁 Refazer seção", key=f"regenerate_{record['id']}"):
+                        self.update_insights(record, transcript, regenerate=(facet,))
+                        st.rerun()
 
                     # Botão para excluir o registro
                     if st.button(f"🗑️ Excluir Registro {record['id']}", key=f"delete_{record['id']}"):
@@ -53,16 +107,248 @@ class HistoryScreen:
             logging.error(f"❌ Erro ao renderizar a tela de histórico: {e}")
             st.error("❌ Ocorreu um erro ao carregar o histórico.")
 
+    def person_page(self, person, show_archived):
+        """
+        Página atual dos registros de um participante, lida do índice de participantes
+        (paginação por chave: custo proporcional à página, não ao histórico).
+
+        :param person: Participante selecionado.
+        :param show_archived: Inclui os registros arquivados.
+        :return: Registros completos da página.
+        """
+        state = st.session_state.get("history_person_pages")
+        if not state or state["filter"] != (person, show_archived):
+            # Cursores (data, id) do fim de cada página já visitada; a primeira não tem cursor
+            state = {"filter": (person, show_archived), "cursors": [None], "has_next": False}
+            st.session_state["history_person_pages"] = state
+        timeline = self.analytics.fetch_person_timeline(self.user_id, person, limit=HISTORY_PAGE_SIZE + 1,
+                                                 before=state["cursors"][-1], include_archived=show_archived)
+        timeline, has_next = timeline[:HISTORY_PAGE_SIZE], len(timeline) > HISTORY_PAGE_SIZE
+        st.session_state["history_person_pages"] = dict(
+            state, has_next=has_next, last=(timeline[-1]["date"], timeline[-1]["id"]) if timeline else None
+        )
+        records = [self.db.cached_record(self.user_id, row["id"]) for row in timeline]
+        return [record for record in records if record]
+
+    def render_person_pager(self):
+        """Navegação entre as páginas dos registros do participante selecionado."""
+        state = st.session_state["history_person_pages"]
+        previous, label, following = st.columns([1, 2, 1])
+        label.write(f"Página {len(state['cursors'])}")
+        if len(state["cursors"]) > 1 and previous.button("⬅️ Anterior", key="history_person_previous"):
+            st.session_state["history_person_pages"] = dict(state, cursors=state["cursors"][:-1])
+            st.rerun()
+        if state["has_next"] and following.button("Próxima ➡️", key="history_person_next"):
+            st.session_state["history_person_pages"] = dict(state, cursors=state["cursors"] + [state["last"]])
+            st.rerun()
+
+    def render_bulk_actions(self, records):
+        """
+        Ações em lote sobre os registros selecionados: excluir, arquivar/restaurar e etiquetar.
+        Cada ação é uma única transação no banco seguida de um único rerun.
+
+        :param records: Registros exibidos.
+        """
+        labels = {record['id']: f"{record['title']} (ID: {record['id']})" for record in records}
+        with st.form("history_bulk_actions", clear_on_submit=True):
+            st.write("### ☑️ Ações em lote")
+            selected = st.multiselect("Registros", list(labels), format_func=labels.get)
+            tags = st.text_input("🏷️ Etiquetas (separadas por vírgula)")
+            action = st.radio("Ação", ["Arquivar", "Restaurar", "Etiquetar", "Excluir"], horizontal=True)
+            confirm = st.checkbox("Confirmo a exclusão dos registros e arquivos selecionados")
+            submitted = st.form_submit_button("✅ Aplicar")
+
+        if not submitted or not selected:
+            return
+        if action == "Excluir" and not confirm:
+            st.warning("⚠️ Marque a confirmação para excluir os registros selecionados.")
+            return
+        try:
+            if action == "Excluir":
+                count = self.db.bulk_delete(self.user_id, selected)
+            elif action == "Etiquetar":
+                count = self.db.bulk_retag(self.user_id, selected, tags)
+            else:
+                count = self.db.bulk_archive(self.user_id, selected, archived=(action == "Arquivar"))
+            st.session_state["history_notice"] = f"✅ {action}: {count} registro(s) atualizado(s)."
+        except Exception as e:
+            logging.error(f"❌ Erro na ação em lote '{action}': {e}")
+            st.error(f"Erro ao aplicar a ação em lote: {e}")
+            return
+        st.rerun()
+
+    def render_dashboard(self):
+        """
+        Painel com minutos gravados por semana, frequência do diário e participantes
+        mais frequentes, lido das tabelas agregadas (não percorre o histórico).
+        """
+        with st.expander("📊 Painel"):
+            data = self.analytics.fetch_analytics(self.user_id)
+            meetings = data["totals"].get("meeting", {})
+            diaries = data["totals"].get("diary", {})
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Reuniões", meetings.get("records", 0))
+            col2.metric("Horas em reuniões", round(meetings.get("minutes", 0) / 60, 1))
+            col3.metric("Entradas no diário", diaries.get("records", 0))
+
+            if data["weekly"]:
+                weeks = {}
+                for row in data["weekly"]:
+                    week = weeks.setdefault(row["week_start"], {"Semana": row["week_start"], "Reuniões": 0,
+                                                                "Diário mental": 0, "Entradas no diário": 0})
+                    if row["type"] == "meeting":
+                        week["Reuniões"] += row["minutes"]
+                    else:
+                        week["Diário mental"] += row["minutes"]
+                        week["Entradas no diário"] += row["records"]
+                rows = list(weeks.values())
+                st.write("⏱️ Minutos gravados por semana")
+                st.bar_chart(rows, x="Semana", y=["Reuniões", "Diário mental"])
+                st.write("📔 Entradas no diário por semana")
+                st.line_chart(rows, x="Semana", y="Entradas no diário")
+            if data["participants"]:
+                st.write("👥 Participantes mais frequentes")
+                st.table([{"Participante": row["participant"], "Reuniões": row["meetings"],
+                           "Minutos": row["minutes"]} for row in data["participants"]])
+
+    def render_action_items(self):
+        """
+        Itens de ação em aberto de todas as reuniões do usuário (consulta indexada),
+        com filtro por responsável e opção de concluir.
+        """
+        with st.expander("✅ Itens de ação em aberto"):
+            owner = st.text_input("👤 Responsável", key="history_action_owner")
+            items = self.insights.fetch_action_items(self.user_id, status="open", owner=owner or None)
+            if not items:
+                st.info("📌 Nenhum item de ação em aberto.")
+                return
+            for item in items:
+                details = " | ".join(part for part in (item['owner'], item['due_date'] and f"até {item['due_date']}",
+                                                       f"{item['meeting_title']} ({item['meeting_date']})") if part)
+                if st.checkbox(f"{item['task']} — {details}", key=f"action_item_{item['id']}"):
+                    self.insights.set_action_item_status(self.user_id, item['id'], "done")
+                    st.session_state.pop(f"action_item_{item['id']}", None)
+                    st.rerun()
+
+    def render_digest(self):
+        """
+        Resumo de um dia, semana ou mês (diários, reuniões ou ambos) a partir dos resumos em cache.
+        """
+        with st.expander("🗓️ Resumo do período"):
+            levels = {"day": "Dia", "week": "Semana", "month": "Mês"}
+            types = {"diary": "Diário mental", "meeting": "Reuniões", None: "Tudo"}
+            level = st.radio("Período", list(levels), format_func=levels.get, horizontal=True, key="digest_level")
+            record_type = st.radio("Registros", list(types), format_func=types.get, horizontal=True, key="digest_type")
+            day = st.date_input("📅 Data de referência", datetime.date.today(), key="digest_day")
+            if not st.button("🧾 Gerar resumo", key="digest_build"):
+                return
+            try:
+                if self.digests is None:
+                    self.digests = DigestBuilder(InsightsGenerator(), get_digest_repository(share=self.db), self.db)
+                with st.spinner("⏳ Resumindo o período..."):
+                    summary = self.digests.build(self.user_id, level, day, record_type)
+                if summary is None:
+                    st.info("📌 Nenhum registro no período.")
+                else:
+                    st.markdown(summary)
+                    st.caption(f"{self.digests.llm_calls} chamada(s) ao modelo; os demais níveis vieram do cache.")
+            except Exception as e:
+                logging.error(f"❌ Erro ao gerar o resumo do período: {e}")
+                st.error(f"Erro ao gerar o resumo do período: {e}")
+
+    def render_export(self):
+        """
+        Download do histórico (zip com JSONL, CSV, markdown e áudios opcionais, ou JSONL).
+
+        O Streamlit mantém o arquivo gerado na memória do servidor até o download, por
+        isso o navegador só recebe exports de até EXPORT_MAX_BYTES: ao preparar o
+        export, o tamanho é estimado por uma consulta de agregação e os maiores são
+        encaminhados para ``python -m database.export``. O arquivo só é gerado ao
+        clicar em baixar, fora da execução do script, lendo os registros em páginas.
+        """
+        with st.expander("📦 Exportar histórico"):
+            formats = {"zip": "ZIP (JSONL, CSV e Markdown)", "jsonl": "JSONL"}
+            types = {None: "Tudo", "meeting": "Reuniões", "diary": "Diário mental"}
+            export_format = st.radio("Formato", list(formats), format_func=formats.get, horizontal=True,
+                                     key="export_format")
+            record_type = st.radio("Registros", list(types), format_func=types.get, horizontal=True,
+                                   key="export_type")
+            period = st.date_input("📅 Período (opcional)", (), key="export_period")
+            include_audio = export_format == "zip" and st.checkbox("🎧 Incluir áudios", key="export_audio")
+
+            options = {
+                "export_format": export_format,
+                "date_from": period[0].isoformat() if len(period) > 0 else None,
+                "date_to": period[-1].isoformat() if len(period) > 0 else None,
+                "record_type": record_type,
+                "include_audio": include_audio
+            }
+            if st.button("📏 Preparar export", key="export_prepare"):
+                estimate = estimate_export_bytes(self.user_id, options["date_from"], options["date_to"],
+                                                 record_type, include_audio)
+                st.session_state["export_estimate"] = (options, estimate)
+
+            prepared = st.session_state.get("export_estimate")
+            if not prepared or prepared[0] != options:
+                st.caption(f"ℹ️ Downloads pelo navegador até {EXPORT_MAX_BYTES // (1024 * 1024)} MB; "
+                           "históricos maiores são exportados pela linha de comando.")
+                return
+            if prepared[1] > EXPORT_MAX_BYTES:
+                st.warning(f"⚠️ Export estimado em {prepared[1] / (1024 * 1024):.1f} MB, acima do limite de "
+                           f"{EXPORT_MAX_BYTES / (1024 * 1024):.1f} MB do navegador. Reduza o período, desmarque "
+                           "os áudios ou gere o arquivo no servidor:")
+                st.code(export_command(self.user_id, **options), language="bash")
+                return
+
+            user_id = self.user_id
+            st.download_button(
+                "⬇️ Baixar",
+                data=lambda: export_to_bytes(user_id, **options),
+                file_name=f"historico_{datetime.date.today().isoformat()}.{export_format}",
+                mime="application/zip" if export_format == "zip" else "application/jsonl",
+                on_click="ignore",
+                key="export_download"
+            )
+
+    def update_insights(self, record, transcript, regenerate=()):
+        """
+        Salva a transcrição editada e regenera os insights de forma incremental.
+
+        :param record: Registro (dicionário do histórico).
+        :param transcript: Transcrição editada.
+        :param regenerate: Facetas a gerar novamente mesmo sem alteração na transcrição.
+        """
+        record_id = record['id']
+        try:
+            # O resumo local é salvo primeiro: continua disponível se o LLM falhar
+            self.db.update_record(record_id, {
+                "transcript": transcript,
+                "summary_preview": format_preview(extractive_summary(transcript, participants=record.get('participants', '')))
+            })
+            if self.incremental is None:
+                self.incremental = IncrementalInsights(InsightsGenerator(), get_checkpoint_repository(share=self.db))
+            with st.spinner("⏳ Atualizando os insights..."):
+                structured = self.incremental.generate(transcript, record['date'], regenerate)
+            self.db.update_record(record_id, {"insights": render_structured_insights(structured)})
+            self.insights.save_structured_insights(record_id, self.user_id, structured)
+            # Descarta o valor do widget para exibir os novos insights após o rerun
+            st.session_state.pop(f"insights_{record_id}", None)
+            # Exibida após o rerun
+            st.session_state["history_notice"] = (
+                f"✅ Insights do registro {record_id} atualizados ({self.incremental.llm_calls} chamada(s) ao modelo)."
+            )
+        except Exception as e:
+            logging.error(f"❌ Erro ao atualizar os insights do registro {record_id}: {e}")
+            st.error(f"Erro ao atualizar os insights do registro {record_id}: {e}")
+
     def delete_record(self, record_id):
         """
-        Exclui um registro do banco de dados.
+        Exclui um registro do banco de dados e seus artefatos.
 
         :param record_id: ID do registro a ser excluído.
         """
         try:
-            self.db.cursor.execute("DELETE FROM meetings WHERE id = ?", (record_id,))
-            self.db.connection.commit()
-            logging.info(f"🗑️ Registro ID {record_id} excluído com sucesso.")
+            self.db.delete_record(record_id)
         except Exception as e:
             logging.error(f"❌ Erro ao excluir registro ID {record_id}: {e}")
             st.error(f"Erro ao excluir o registro {record_id}: {e}")
@@ -75,6 +361,7 @@ class HistoryScreen:
 
 # Exemplo de uso
 if __name__ == "__main__":
+    setup_logging()
     user_id = 1  # Simulação de um usuário logado
     screen = HistoryScreen(user_id)
     try:
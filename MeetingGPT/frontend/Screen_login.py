@@ -1,6 +1,7 @@
 import streamlit as st
 import bcrypt
-from database.database_user import DatabaseUser
+from database.repository import get_user_repository
+from monitoring.logging_config import setup_logging
 
 # ✅ Estilos CSS para um layout mais elegante e profissional
 st.markdown("""
@@ -51,7 +52,7 @@ class LoginScreen:
         """
         Inicializa a tela de login e a conexão com o banco de usuários.
         """
-        self.db = DatabaseUser()
+        self.db = get_user_repository()
 
     def render(self):
         """
@@ -132,6 +133,7 @@ class LoginScreen:
 
 # ✅ Exemplo de uso
 if __name__ == "__main__":
+    setup_logging()
     screen = LoginScreen()
     try:
         screen.render()
@@ -0,0 +1,87 @@
+import os
+import logging
+import streamlit as st
+from audio_processing.recording_manager import get_recording_manager, RecordingCapacityError
+from audio_processing.capture_health import SILENCE_DBFS
+from audio_processing.media_import import SUPPORTED_EXTENSIONS, MediaDecodeError
+from monitoring.metrics import new_trace_id, set_trace_id
+
+# Chave do session_state com as gravações interrompidas encontradas para o usuário da sessão
+_INCOMPLETE_KEY = "incomplete_recordings"
+
+
+def render_capture_health(health):
+    """Mostra se a captura está acompanhando o tempo real (perdas, fila, latência e nível)."""
+    cols = st.columns(4)
+    cols[0].metric("🎚️ Nível", f"{health['rms_dbfs']} dBFS", f"pico {health['peak_dbfs']} dBFS", delta_color="off")
+    cols[1].metric("⚠️ Perdas", health["input_overflows"] + health["dropped_blocks"])
+    cols[2].metric("📥 Fila (máx.)", health["queue_high_water"])
+    cols[3].metric("⏱️ Latência (máx.)", f"{health['write_latency_max_s'] * 1000:.0f} ms")
+    if health["status"] != "ok":
+        st.warning("⚠️ A captura não está acompanhando o tempo real: parte do áudio pode ter sido perdida.")
+    elif health["blocks"] and health["rms_dbfs"] < SILENCE_DBFS:
+        st.info("🔇 Nenhum som detectado. Verifique o microfone.")
+
+
+def find_incomplete_cached(user_id):
+    """
+    Gravações interrompidas do usuário, procuradas no disco uma única vez por sessão
+    (uma gravação só é interrompida por uma queda, que também encerra a sessão).
+
+    :param user_id: ID do usuário.
+    :return: Lista de diretórios recuperáveis.
+    """
+    cached = st.session_state.get(_INCOMPLETE_KEY)
+    if cached is None or cached[0] != user_id:
+        cached = (user_id, get_recording_manager().find_incomplete(user_id))
+        st.session_state[_INCOMPLETE_KEY] = cached
+    return cached[1]
+
+
+def render_recovery(user_id):
+    """
+    Oferece a recuperação da gravação interrompida mais recente do usuário.
+
+    :param user_id: ID do usuário.
+    """
+    incomplete = find_incomplete_cached(user_id)
+    if not incomplete:
+        return
+    st.info(f"🩹 Encontramos {len(incomplete)} gravação(ões) interrompida(s).")
+    if st.button("🩹 Recuperar gravação interrompida"):
+        try:
+            audio_path = get_recording_manager().recover(incomplete[-1], user_id)
+            st.session_state[_INCOMPLETE_KEY] = (user_id, incomplete[:-1])
+            st.session_state["recording_id"] = os.path.basename(incomplete[-1])
+            st.session_state["audio_file_path"] = audio_path
+            logging.info(f"🩹 Gravação recuperada: {audio_path}")
+            st.success(f"✅ Gravação recuperada. Áudio salvo em: {audio_path}")
+        except Exception as e:
+            logging.error(f"❌ Erro ao recuperar a gravação: {e}")
+            st.error(f"Erro ao recuperar a gravação: {e}")
+
+
+def render_upload(user_id, label, key):
+    """
+    Permite enviar um áudio/vídeo já gravado (Teams, Zoom, celular) no lugar da gravação.
+
+    :param user_id: ID do usuário.
+    :param label: Texto do campo de envio.
+    :param key: Chave do widget (única por tela).
+    """
+    uploaded_file = st.file_uploader(label, type=list(SUPPORTED_EXTENSIONS), key=key)
+    if uploaded_file is not None and st.button("📤 Importar arquivo"):
+        try:
+            st.session_state["trace_id"] = new_trace_id()
+            set_trace_id(st.session_state["trace_id"])
+            with st.spinner("Convertendo o arquivo..."):
+                recording_id, audio_path = get_recording_manager().import_media(user_id, uploaded_file)
+            st.session_state["recording_id"] = recording_id
+            st.session_state["audio_file_path"] = audio_path
+            st.success(f"✅ Arquivo importado. Áudio salvo em: {audio_path}")
+        except (RecordingCapacityError, MediaDecodeError) as e:
+            logging.warning(f"⚠️ Importação recusada: {e}")
+            st.warning(f"⚠️ {e}")
+        except Exception as e:
+            logging.error(f"❌ Erro ao importar o arquivo: {e}")
+            st.error("Erro ao importar o arquivo enviado.")
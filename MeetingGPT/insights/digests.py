@@ -0,0 +1,100 @@
+import datetime
+import logging
+
+LEVELS = ("day", "week", "month")
+
+# Caracteres dos insights de cada registro usados no resumo do dia
+MAX_RECORD_CHARS = 1500
+
+
+def period_bounds(level, day):
+    """
+    Início e fim (inclusivos) do período que contém ``day``.
+
+    :param level: 'day', 'week' (segunda a domingo) ou 'month'.
+    :param day: datetime.date.
+    :return: (início, fim) como datetime.date.
+    """
+    if level == "day":
+        return day, day
+    if level == "week":
+        start = day - datetime.timedelta(days=day.weekday())
+        return start, start + datetime.timedelta(days=6)
+    if level == "month":
+        start = day.replace(day=1)
+        following = (start + datetime.timedelta(days=32)).replace(day=1)
+        return start, following - datetime.timedelta(days=1)
+    raise ValueError(f"Nível de resumo desconhecido: {level}")
+
+
+class DigestBuilder:
+    def __init__(self, insights_generator, digests, records):
+        """
+        Resumos hierárquicos por período: o dia é resumido a partir dos insights dos
+        registros; a semana e o mês, a partir dos resumos dos dias.
+
+        Cada nível fica na tabela 'digests' e só é refeito quando um registro do
+        período é inserido, alterado ou excluído (a invalidação acontece na escrita).
+
+        :param insights_generator: InsightsGenerator.
+        :param digests: DigestRepository (resumos guardados).
+        :param records: MeetingRepository (registros do período).
+        """
+        self.insights_generator = insights_generator
+        self.digests = digests
+        self.records = records
+        self.llm_calls = 0
+
+    def _day(self, user_id, record_type, day, records):
+        key = day.isoformat()
+        cached = self.digests.get_digest(user_id, record_type, "day", key)
+        if cached is not None:
+            return cached
+        text = "\n\n".join(
+            f"[{record['type']}] {record['title'] or 'Sem título'} ({record['start_time'] or '--:--'}): "
+            f"{(record['insights'] or record.get('summary_preview') or '')[:MAX_RECORD_CHARS]}"
+            for record in records
+        )
+        summary = self.insights_generator.summarize_digest(text, f"dia {key}")
+        self.llm_calls += 1
+        self.digests.save_digest(user_id, record_type, "day", key, summary)
+        return summary
+
+    def build(self, user_id, level, day, record_type=None):
+        """
+        Resumo do período que contém ``day`` (gerando apenas os níveis que faltam).
+
+        :param user_id: ID do usuário.
+        :param level: 'day', 'week' ou 'month'.
+        :param day: datetime.date dentro do período.
+        :param record_type: 'meeting', 'diary' ou None para ambos.
+        :return: Texto do resumo ou None se não houver registros no período.
+        """
+        self.llm_calls = 0
+        type_key = record_type or "all"
+        start, end = period_bounds(level, day)
+        cached = self.digests.get_digest(user_id, type_key, level, start.isoformat())
+        if cached is not None:
+            return cached
+
+        records = self.records.fetch_records_between(user_id, start.isoformat(), end.isoformat(), record_type)
+        if not records:
+            return None
+        by_day = {}
+        for record in records:
+            by_day.setdefault(record["date"], []).append(record)
+        days = {
+            date: self._day(user_id, type_key, datetime.date.fromisoformat(date), day_records)
+            for date, day_records in sorted(by_day.items())
+        }
+        if level == "day":
+            return days[start.isoformat()]
+
+        # Semana e mês: uma chamada pequena sobre os resumos dos dias já em cache
+        label = "semana" if level == "week" else "mês"
+        text = "\n\n".join(f"{date}:\n{summary}" for date, summary in days.items())
+        summary = self.insights_generator.summarize_digest(text, f"{label} de {start.isoformat()} a {end.isoformat()}")
+        self.llm_calls += 1
+        self.digests.save_digest(user_id, type_key, level, start.isoformat(), summary)
+        logging.info(f"🗓️ Resumo ({level}) de {start} gerado com {self.llm_calls} chamada(s) ao LLM.")
+        return summary
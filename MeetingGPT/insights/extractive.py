@@ -0,0 +1,201 @@
+import re
+import unicodedata
+import numpy as np
+
+# Limite do resumo prévio, igual ao "resumo em até 300 caracteres" dos insights do LLM
+PREVIEW_MAX_CHARS = 300
+PREVIEW_TOPICS = 5
+
+# Vocabulário máximo (termos mais frequentes) e amortecimento do TextRank
+MAX_VOCABULARY = 1000
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+# Frases por bloco do TextRank: a matriz de similaridade é quadrática no número de frases
+MAX_TEXTRANK_SENTENCES = 1500
+
+STOPWORDS = set("""
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como da das de dela delas dele deles depois do dos
+e ela elas ele eles em entre era eram essa essas esse esses esta estamos estao estas estava estavam este
+esteja estes estou eu foi fomos for foram ha isso isto ja la lhe lhes mais mas me mesmo meu meus minha
+minhas muito muita muitos na nao nas nem no nos nossa nossas nosso nossos num numa o os ou para pela pelas
+pelo pelos por porque pra qual quando que quem se sem ser seu seus so sua suas tambem te tem tinha to
+tudo um uma umas uns vai vamos voce voces entao aqui ai assim agora bem coisa gente tipo acho sim ok
+ta tá né ne pode fazer falar ainda onde cada outro outra outros outras sobre ter sao estar vou vai
+""".split())
+
+# Frases curtas demais ('Sim.', 'Ok, vamos lá.') não entram no resumo
+MIN_SENTENCE_WORDS = 4
+
+# Rótulos gerados pela diarização; nomes de participantes só com ``participants``
+_SPEAKER_LABEL = r"Falante \d+"
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _fold(word):
+    """Minúsculas e sem acentos (o mesmo termo com e sem acento conta como um só)."""
+    return "".join(c for c in unicodedata.normalize("NFKD", word.lower()) if not unicodedata.combining(c))
+
+
+def _speaker_prefix(participants=""):
+    """Expressão dos rótulos de falante no início da linha ('Falante 1: ' ou 'Ana: ')."""
+    names = sorted({name.strip() for name in re.split(r"[,;\n]", participants or "") if name.strip()},
+                   key=len, reverse=True)
+    labels = "|".join([_SPEAKER_LABEL] + [re.escape(name) for name in names])
+    return re.compile(rf"^[ \t]*(?:{labels}):[ \t]*", re.MULTILINE)
+
+
+def split_sentences(text, participants=""):
+    """
+    Divide a transcrição em frases, removendo os rótulos de falante ('Falante 1: ').
+
+    :param text: Transcrição.
+    :param participants: Participantes informados; seus nomes também são tratados como rótulos.
+    :return: Lista de frases.
+    """
+    text = _speaker_prefix(participants).sub("", text or "")
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if len(sentence.strip()) > 1]
+
+
+def tfidf_matrix(sentences, max_vocabulary=MAX_VOCABULARY):
+    """
+    Vetores TF-IDF (normalizados) das frases.
+
+    :param sentences: Lista de frases.
+    :param max_vocabulary: Termos mantidos (os de maior frequência nos documentos).
+    :return: (matriz frases x termos, lista de termos na mesma ordem das colunas, termo -> forma original).
+    """
+    tokenized, surface = [], {}
+    for sentence in sentences:
+        terms = []
+        for word in _WORD.findall(sentence):
+            term = _fold(word)
+            if len(term) < 3 or term in STOPWORDS or term.isdigit():
+                continue
+            surface.setdefault(term, word.lower())
+            terms.append(term)
+        tokenized.append(terms)
+
+    document_frequency = {}
+    for terms in tokenized:
+        for term in set(terms):
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+    vocabulary = sorted(document_frequency, key=lambda term: (-document_frequency[term], term))[:max_vocabulary]
+    index = {term: column for column, term in enumerate(vocabulary)}
+
+    matrix = np.zeros((len(sentences), len(vocabulary)), dtype=np.float32)
+    for row, terms in enumerate(tokenized):
+        for term in terms:
+            column = index.get(term)
+            if column is not None:
+                matrix[row, column] += 1.0
+    if not vocabulary:
+        return matrix, vocabulary, surface
+
+    idf = np.log((1 + len(sentences)) / (1 + np.array([document_frequency[t] for t in vocabulary], dtype=np.float32))) + 1
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix, vocabulary, surface
+
+
+def textrank(matrix):
+    """
+    Pontuação TextRank das frases sobre o grafo de similaridade de cosseno.
+
+    :param matrix: Vetores TF-IDF normalizados (frases x termos).
+    :return: Array com a pontuação de cada frase.
+    """
+    n = matrix.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, out_weight, out=np.full_like(similarity, 1.0 / n), where=out_weight > 0)
+
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for iteration in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / n + DAMPING * (transition.T @ scores)
+        converged = np.abs(updated - scores).sum() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def chunked_textrank(matrix, max_sentences=MAX_TEXTRANK_SENTENCES):
+    """
+    TextRank em blocos consecutivos de até ``max_sentences`` frases (memória e tempo
+    limitados em transcrições longas); as pontuações de cada bloco são ponderadas
+    pelo tamanho do bloco para continuarem comparáveis entre si.
+
+    :param matrix: Vetores TF-IDF normalizados (frases x termos).
+    :param max_sentences: Frases por bloco.
+    :return: Array com a pontuação de cada frase.
+    """
+    n = matrix.shape[0]
+    if n <= max_sentences:
+        return textrank(matrix)
+    scores = np.empty(n, dtype=np.float32)
+    for start in range(0, n, max_sentences):
+        block = matrix[start:start + max_sentences]
+        scores[start:start + block.shape[0]] = textrank(block) * (block.shape[0] / n)
+    return scores
+
+
+def _truncate(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - 1].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+
+def extractive_summary(text, max_chars=PREVIEW_MAX_CHARS, n_topics=PREVIEW_TOPICS, participants=""):
+    """
+    Resumo extrativo local (TextRank sobre TF-IDF), sem chamadas à API.
+
+    :param text: Transcrição.
+    :param max_chars: Tamanho máximo do resumo.
+    :param n_topics: Quantidade de tópicos-chave.
+    :param participants: Participantes informados (rótulos de falante removidos das frases).
+    :return: Dicionário {"summary": str, "topics": [str]}.
+    """
+    sentences = split_sentences(text, participants)
+    if not sentences:
+        return {"summary": "", "topics": []}
+
+    matrix, vocabulary, surface = tfidf_matrix(sentences)
+    scores = chunked_textrank(matrix)
+
+    # Frases mais centrais que cabem no limite, na ordem em que foram ditas
+    chosen, size = [], 0
+    for index in np.argsort(-scores, kind="stable"):
+        sentence = sentences[index]
+        if size + len(sentence) + 1 > max_chars or len(sentence.split()) < MIN_SENTENCE_WORDS:
+            continue
+        chosen.append(index)
+        size += len(sentence) + 1
+    if chosen:
+        summary = " ".join(sentences[index] for index in sorted(chosen))
+    else:
+        summary = _truncate(sentences[int(np.argmax(scores))], max_chars)
+
+    topics = []
+    if vocabulary:
+        # Peso do termo ponderado pela centralidade das frases em que aparece
+        weights = scores @ matrix
+        topics = [surface[vocabulary[column]] for column in np.argsort(-weights, kind="stable")[:n_topics]
+                  if weights[column] > 0]
+    return {"summary": summary, "topics": topics}
+
+
+def format_preview(preview):
+    """Texto exibido/salvo do resumo prévio."""
+    if not preview or not preview.get("summary"):
+        return ""
+    text = f"📝 Resumo: {preview['summary']}"
+    if preview.get("topics"):
+        text += f"\n🏷️ Tópicos: {', '.join(preview['topics'])}"
+    return text
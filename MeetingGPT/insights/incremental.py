@@ -0,0 +1,131 @@
+import re
+import json
+import hashlib
+import logging
+from insights.structured import FACETS, merge_facets
+from insights.insights_generator import FacetsError
+
+# Tamanho dos blocos de parágrafos resumidos individualmente (em caracteres)
+MIN_BLOCK_CHARS = 2000
+MAX_BLOCK_CHARS = 6000
+
+# Uma fronteira de bloco ocorre, em média, a cada BOUNDARY_MODULUS linhas após o tamanho mínimo
+BOUNDARY_MODULUS = 8
+
+# Versão dos prompts: alterar invalida os resumos em cache
+PROMPT_VERSION = "v3"
+
+
+def content_hash(text, kind="summary"):
+    """Hash do conteúdo (e do tipo de resumo/versão do prompt) usado como chave do cache."""
+    return hashlib.sha256(f"{kind}:{PROMPT_VERSION}\n{text}".encode("utf-8")).hexdigest()
+
+
+def split_paragraphs(text, min_chars=MIN_BLOCK_CHARS, max_chars=MAX_BLOCK_CHARS):
+    """
+    Divide a transcrição em blocos de parágrafos com fronteiras definidas pelo conteúdo.
+
+    A decisão de encerrar um bloco depende apenas do hash da própria linha (e do
+    tamanho acumulado), então editar uma linha altera no máximo o bloco dela e o
+    seguinte; todos os demais blocos continuam idênticos e aproveitam o cache.
+
+    :param text: Transcrição (uma linha por turno, ou texto corrido).
+    :return: Lista de blocos de texto.
+    """
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) <= max_chars:
+            lines.append(line)
+        else:
+            # Texto corrido sem quebras (transcrição sem falantes): divide por frases
+            lines.extend(sentence for sentence in re.split(r"(?<=[.!?])\s+", line) if sentence.strip())
+
+    blocks, current, size = [], [], 0
+    for line in lines:
+        current.append(line)
+        size += len(line) + 1
+        digest = int(hashlib.md5(line.encode("utf-8")).hexdigest()[:8], 16)
+        if size >= max_chars or (size >= min_chars and digest % BOUNDARY_MODULUS == 0):
+            blocks.append("\n".join(current))
+            current, size = [], 0
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+class IncrementalInsights:
+    def __init__(self, insights_generator, cache):
+        """
+        Geração de insights com resumos por bloco de parágrafos em cache (por hash do conteúdo).
+
+        Após uma edição da transcrição, apenas os blocos alterados são resumidos
+        novamente e a síntese final é refeita sobre os resumos já existentes.
+
+        :param insights_generator: InsightsGenerator.
+        :param cache: CheckpointRepository (tabela summary_cache).
+        """
+        self.insights_generator = insights_generator
+        self.cache = cache
+        self.llm_calls = 0
+
+    def _cached(self, kind, text, produce):
+        key = content_hash(text, kind)
+        cached = self.cache.get_cached_summary(key)
+        if cached is not None:
+            return cached
+        result = produce(text)
+        self.llm_calls += 1
+        self.cache.cache_summary(key, result)
+        return result
+
+    def _synthesis_input(self, transcript):
+        blocks = split_paragraphs(transcript)
+        if len(blocks) <= 1:
+            return transcript, len(blocks)
+        summaries = [self._cached("summary", block, self.insights_generator.summarize_chunk) for block in blocks]
+        return "\n\n".join(summaries), len(blocks)
+
+    def _cache_facets(self, keys, produced):
+        for facet, value in produced.items():
+            self.cache.cache_summary(keys[facet], json.dumps(value, ensure_ascii=False))
+
+    def generate(self, transcript, reference_date=None, regenerate=()):
+        """
+        Gera (ou reaproveita) os insights estruturados de uma transcrição.
+
+        Cada faceta (resumo, tópicos, insights, decisões, riscos e próximos passos) tem
+        sua própria entrada no cache; as que faltam são geradas juntas, em paralelo.
+
+        :param transcript: Transcrição completa.
+        :param reference_date: Data da reunião (AAAA-MM-DD), usada nos prazos relativos.
+        :param regenerate: Facetas a gerar novamente mesmo que estejam em cache.
+        :return: Dicionário com summary, topics, insights, decisions, risks e action_items.
+        """
+        self.llm_calls = 0
+        text, n_blocks = self._synthesis_input(transcript)
+
+        # O prazo relativo ('sexta-feira') depende da data da reunião: ela faz parte da chave
+        keys = {facet: content_hash(text, f"facet:{facet}:{reference_date or ''}") for facet in FACETS}
+        values, missing = {}, []
+        for facet in FACETS:
+            cached = None if facet in regenerate else self.cache.get_cached_summary(keys[facet])
+            if cached is None:
+                missing.append(facet)
+            else:
+                values[facet] = json.loads(cached)
+        if missing:
+            self.llm_calls += len(missing)
+            try:
+                produced = self.insights_generator.generate_facets(text, reference_date, tuple(missing))
+            except FacetsError as e:
+                # As facetas geradas ficam em cache: uma nova tentativa refaz apenas as que falharam
+                self._cache_facets(keys, e.values)
+                raise
+            self._cache_facets(keys, produced)
+            values.update(produced)
+
+        logging.info(f"🧩 Insights de {n_blocks} bloco(s) gerados com {self.llm_calls} chamada(s) ao LLM.")
+        return merge_facets(values)
@@ -1,22 +1,73 @@
 import os
-import logging
 import json
+import asyncio
+import logging
+import concurrent.futures
+import threading
+from monitoring.logging_config import setup_logging
 from datetime import datetime
 import streamlit as st
 from langchain_openai import ChatOpenAI
 from langchain.schema import AIMessage  # Importação para tratar o retorno
 from langchain.prompts import ChatPromptTemplate
+from monitoring.metrics import timed, get_trace_id, trace_context
+from storage.artifact_store import get_artifact_store
+from insights.structured import FACETS, facet_schema
+
+# Namespace do ArtifactStore onde os insights serão salvos
+INSIGHTS_NAMESPACE = "data_insights"
+
+# Instrução de cada faceta (o formato de saída vem do schema JSON da faceta)
+FACET_PROMPTS = {
+    "summary": "Faça um resumo da reunião ou diário mental com até 300 caracteres.",
+    "topics": "Liste os tópicos principais abordados, em poucas palavras cada.",
+    "insights": "Liste os insights mais relevantes em frases curtas, considerando o contexto geral.",
+    "decisions": "Liste as decisões tomadas. Se não houver, retorne uma lista vazia.",
+    "risks": "Liste riscos, bloqueios e preocupações mencionados. Se não houver, retorne uma lista vazia.",
+    "action_items": "Liste os próximos passos com o responsável (como foi chamado no texto) e o prazo em "
+                    "AAAA-MM-DD quando mencionados; use null quando não houver."
+}
+
+# Espera máxima (s) pelas facetas geradas em paralelo
+FACETS_TIMEOUT_SECONDS = int(os.environ.get("MEETINGGPT_FACETS_TIMEOUT", 180))
+
+# Loop assíncrono compartilhado (o cliente HTTP assíncrono fica preso ao loop em que foi criado)
+_loop = None
+_loop_lock = threading.Lock()
 
-# Configuração inicial do logger
-logging.basicConfig(
-    filename='insights_generator.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 
-# Diretório onde os insights serão salvos
-INSIGHTS_SAVE_PATH = r'C:\Users\Novaes Engenharia\MeetingGPT\data\data_insights'
-os.makedirs(INSIGHTS_SAVE_PATH, exist_ok=True)
+def _run_async(coroutine, timeout=None):
+    """
+    Executa uma corrotina no loop de fundo do processo e aguarda o resultado.
+
+    :param coroutine: Corrotina a executar.
+    :param timeout: Espera máxima em segundos (a corrotina é cancelada ao estourar).
+    :return: Resultado da corrotina.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="insights-async", daemon=True).start()
+    future = asyncio.run_coroutine_threadsafe(coroutine, _loop)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"tempo limite de {timeout}s excedido")
+
+
+class FacetsError(RuntimeError):
+    """Levantada quando parte das facetas falhou; ``values`` traz as que foram geradas."""
+
+    def __init__(self, values, errors):
+        """
+        :param values: Facetas geradas com sucesso (faceta -> valor).
+        :param errors: Facetas que falharam (faceta -> mensagem de erro).
+        """
+        super().__init__("Falha nas facetas: " + "; ".join(f"{facet}: {error}" for facet, error in errors.items()))
+        self.values = values
+        self.errors = errors
 
 class InsightsGenerator:
     def __init__(self):
@@ -33,7 +84,7 @@ class InsightsGenerator:
 
         # Inicializa o modelo da OpenAI via LangChain
         self.llm = ChatOpenAI(openai_api_key=self.api_key, model="gpt-4o-mini")
-        logging.info(f"🔑 Chave da OpenAI carregada corretamente: {self.api_key[:10]}... (ocultado)")
+        logging.info("🔑 Chave da OpenAI carregada corretamente.")
 
     def generate_insights(self, text):
         """
@@ -58,7 +109,8 @@ class InsightsGenerator:
             )
 
             # Chamada para a API via LangChain
-            response = self.llm.invoke(prompt.format(texto=text))
+            with timed("llm", payload_bytes=len(text.encode("utf-8"))):
+                response = self.llm.invoke(prompt.format(texto=text))
 
             # ✅ Extraindo apenas o texto do AIMessage para evitar erros ao salvar no banco
             insights_text = response.content if isinstance(response, AIMessage) else str(response)
@@ -77,28 +129,125 @@ class InsightsGenerator:
             logging.error(f"❌ Erro ao gerar insights: {e}")
             raise RuntimeError(f"Erro ao gerar insights: {e}")
 
-    def save_insights(self, insights_data, filename=None):
+    async def _agenerate_facet(self, facet, text, reference_date):
+        prompt = ChatPromptTemplate.from_template(
+            "Analise o texto de uma reunião ou diário mental e responda apenas com o JSON pedido. "
+            + FACET_PROMPTS[facet] + " A data de referência é {data}. Texto: {texto}"
+        )
+        llm = self.llm.bind(response_format={
+            "type": "json_schema",
+            "json_schema": {"name": f"meeting_{facet}", "schema": facet_schema(facet), "strict": True}
+        })
+        with timed("llm", payload_bytes=len(text.encode("utf-8")), operation=f"facet:{facet}"):
+            response = await llm.ainvoke(prompt.format(texto=text, data=reference_date))
+        content = response.content if isinstance(response, AIMessage) else str(response)
+        return json.loads(content).get(facet)
+
+    def generate_facets(self, text, reference_date=None, facets=FACETS):
         """
-        Salva os insights gerados em um arquivo JSON no diretório especificado.
+        Gera as facetas dos insights (resumo, tópicos, insights, decisões, riscos e próximos
+        passos) como prompts independentes executados em paralelo; a latência total é a da
+        faceta mais lenta, não a soma.
+
+        :param text: Texto de entrada para análise.
+        :param reference_date: Data da reunião (AAAA-MM-DD) usada para resolver prazos relativos.
+        :param facets: Facetas a gerar (padrão: todas).
+        :return: Dicionário faceta -> valor (junte com ``merge_facets``).
+        :raises FacetsError: Se alguma faceta falhar (com as que foram geradas em ``values``).
+        """
+        try:
+            if not text.strip():
+                raise ValueError("O texto de entrada está vazio.")
+            reference_date = reference_date or datetime.now().strftime("%Y-%m-%d")
+
+            trace_id = get_trace_id()
+
+            async def gather():
+                # As tarefas herdam o trace da sessão que pediu os insights; uma faceta com
+                # erro não descarta as demais
+                with trace_context(trace_id):
+                    return await asyncio.gather(
+                        *(self._agenerate_facet(facet, text, reference_date) for facet in facets),
+                        return_exceptions=True
+                    )
+
+            # Cada faceta já é medida no estágio 'llm'; aqui só se espera o conjunto
+            results = _run_async(gather(), timeout=FACETS_TIMEOUT_SECONDS)
+        except Exception as e:
+            logging.error(f"❌ Erro ao gerar as facetas dos insights: {e}")
+            raise RuntimeError(f"Erro ao gerar as facetas dos insights: {e}")
+
+        values, errors = {}, {}
+        for facet, result in zip(facets, results):
+            if isinstance(result, BaseException):
+                logging.error(f"❌ Erro ao gerar a faceta '{facet}': {result}")
+                errors[facet] = str(result) or type(result).__name__
+            else:
+                values[facet] = result
+        if errors:
+            raise FacetsError(values, errors)
+        return values
+
+    def summarize_chunk(self, text):
+        """
+        Resume uma parte da transcrição (etapa intermediária de reuniões longas).
+
+        :param text: Trecho da transcrição.
+        :return: Resumo em texto.
+        """
+        try:
+            prompt = ChatPromptTemplate.from_template(
+                "Resuma o trecho a seguir em bullet points, preservando decisões, responsáveis, prazos, "
+                "números e quem falou o quê. Não faça introdução. Trecho: {texto}"
+            )
+            with timed("llm", payload_bytes=len(text.encode("utf-8")), operation="summary"):
+                response = self.llm.invoke(prompt.format(texto=text))
+            summary = response.content if isinstance(response, AIMessage) else str(response)
+            if not summary.strip():
+                raise ValueError("Resposta vazia ao resumir o trecho.")
+            return summary
+        except Exception as e:
+            logging.error(f"❌ Erro ao resumir o trecho: {e}")
+            raise RuntimeError(f"Erro ao resumir o trecho: {e}")
+
+    def summarize_digest(self, text, period):
+        """
+        Resume um período a partir dos resumos dos registros (ou dos dias) que ele contém.
+
+        :param text: Resumos do período, um por registro/dia.
+        :param period: Descrição do período (ex.: 'semana de 2025-01-13').
+        :return: Resumo em texto.
+        """
+        try:
+            prompt = ChatPromptTemplate.from_template(
+                "Com base nos resumos a seguir, escreva o que aconteceu no período ({periodo}) em até 5 bullet "
+                "points, destacando temas recorrentes, decisões, pendências e mudanças de humor ou de rumo. "
+                "Não faça introdução. Resumos: {texto}"
+            )
+            with timed("llm", payload_bytes=len(text.encode("utf-8")), operation="digest"):
+                response = self.llm.invoke(prompt.format(texto=text, periodo=period))
+            summary = response.content if isinstance(response, AIMessage) else str(response)
+            if not summary.strip():
+                raise ValueError("Resposta vazia ao resumir o período.")
+            return summary
+        except Exception as e:
+            logging.error(f"❌ Erro ao resumir o período: {e}")
+            raise RuntimeError(f"Erro ao resumir o período: {e}")
+
+    def save_insights(self, insights_data, compress=None):
+        """
+        Salva os insights gerados em um arquivo JSON no armazenamento de artefatos
+        (nome pelo hash do conteúdo, escrita atômica).
 
         :param insights_data: Dicionário contendo os insights e metadados.
-        :param filename: Nome do arquivo JSON (opcional).
+        :param compress: Grava com gzip (padrão: configuração do armazenamento).
         :return: Caminho completo do arquivo salvo.
         """
         try:
             if not insights_data or "insights" not in insights_data:
                 raise ValueError("Os dados de insights estão vazios.")
 
-            # Gera um nome de arquivo com timestamp, se não fornecido
-            if not filename:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"insights_{timestamp}.json"
-
-            filepath = os.path.join(INSIGHTS_SAVE_PATH, filename)
-
-            # Salva os dados em um arquivo JSON
-            with open(filepath, 'w', encoding='utf-8') as json_file:
-                json.dump(insights_data, json_file, ensure_ascii=False, indent=4)
+            filepath = get_artifact_store().put_json(insights_data, INSIGHTS_NAMESPACE, compress=compress)
 
             logging.info(f"📄 Insights salvos com sucesso: {filepath}")
             return filepath
@@ -109,6 +258,7 @@ class InsightsGenerator:
 
 # Exemplo de uso
 if __name__ == "__main__":
+    setup_logging()
     generator = InsightsGenerator()
     input_text = input("Insira o texto para análise: ")
 
@@ -0,0 +1,121 @@
+import re
+import json
+
+# Schema JSON da saída estruturada dos insights (response_format da OpenAI, modo estrito)
+INSIGHTS_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["summary", "topics", "insights", "decisions", "risks", "action_items"],
+    "properties": {
+        "summary": {"type": "string", "description": "Resumo da reunião ou diário mental com até 300 caracteres."},
+        "topics": {"type": "array", "items": {"type": "string"}, "description": "Tópicos principais abordados."},
+        "insights": {"type": "array", "items": {"type": "string"}, "description": "Insights em frases curtas."},
+        "decisions": {"type": "array", "items": {"type": "string"}, "description": "Decisões tomadas."},
+        "risks": {"type": "array", "items": {"type": "string"}, "description": "Riscos, bloqueios e preocupações."},
+        "action_items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["task", "owner", "due_date"],
+                "properties": {
+                    "task": {"type": "string"},
+                    "owner": {"type": ["string", "null"], "description": "Responsável, se mencionado."},
+                    "due_date": {"type": ["string", "null"], "description": "Prazo no formato AAAA-MM-DD, se mencionado."}
+                }
+            }
+        }
+    }
+}
+
+# Facetas geradas de forma independente (uma chamada por faceta, em paralelo)
+FACETS = ("summary", "topics", "insights", "decisions", "risks", "action_items")
+FACET_LABELS = {
+    "summary": "Resumo",
+    "topics": "Tópicos abordados",
+    "insights": "Insights",
+    "decisions": "Decisões",
+    "risks": "Riscos",
+    "action_items": "Próximos passos"
+}
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def facet_schema(facet):
+    """Schema JSON de uma faceta (objeto com uma única propriedade, exigido pelo modo estrito)."""
+    return {
+        "type": "object",
+        "additionalProperties": False,
+        "required": [facet],
+        "properties": {facet: INSIGHTS_SCHEMA["properties"][facet]}
+    }
+
+
+def merge_facets(facets):
+    """
+    Junta as facetas geradas separadamente no formato dos insights estruturados.
+
+    :param facets: Dicionário faceta -> valor (ausentes ficam vazias).
+    :return: Dicionário normalizado por ``parse_structured_insights``.
+    """
+    return parse_structured_insights({facet: facets.get(facet) for facet in FACETS})
+
+
+def _strings(values):
+    return [str(value).strip() for value in values or [] if str(value or "").strip()]
+
+
+def parse_structured_insights(raw):
+    """
+    Valida e normaliza a resposta estruturada do LLM.
+
+    :param raw: Texto JSON (ou dicionário já decodificado).
+    :return: Dicionário com summary, topics, insights, decisions, risks e action_items.
+    :raises ValueError: Se a resposta não for um objeto JSON.
+    """
+    data = json.loads(raw) if isinstance(raw, str) else raw
+    if not isinstance(data, dict):
+        raise ValueError("A resposta estruturada não é um objeto JSON.")
+
+    action_items = []
+    for item in data.get("action_items") or []:
+        if isinstance(item, str):
+            item = {"task": item}
+        task = str(item.get("task") or "").strip()
+        if not task:
+            continue
+        owner = str(item.get("owner") or "").strip() or None
+        due_date = str(item.get("due_date") or "").strip()
+        action_items.append({"task": task, "owner": owner, "due_date": due_date if _ISO_DATE.match(due_date) else None})
+
+    return {
+        "summary": str(data.get("summary") or "").strip(),
+        "topics": _strings(data.get("topics")),
+        "insights": _strings(data.get("insights")),
+        "decisions": _strings(data.get("decisions")),
+        "risks": _strings(data.get("risks")),
+        "action_items": action_items
+    }
+
+
+def render_structured_insights(data):
+    """
+    Texto dos insights estruturados no formato exibido nas telas e salvo em ``meetings.insights``.
+
+    :param data: Saída de ``parse_structured_insights``.
+    :return: Texto em markdown.
+    """
+    sections = []
+    if data.get("summary"):
+        sections.append(data["summary"])
+    for facet in ("topics", "insights", "decisions", "risks"):
+        if data.get(facet):
+            sections.append(f"{FACET_LABELS[facet]}:\n" + "\n".join(f"- {value}" for value in data[facet]))
+    if data.get("action_items"):
+        lines = []
+        for item in data["action_items"]:
+            details = ", ".join(part for part in (item.get("owner"), item.get("due_date") and f"até {item['due_date']}") if part)
+            lines.append(f"- {item['task']}" + (f" ({details})" if details else ""))
+        sections.append(f"{FACET_LABELS['action_items']}:\n" + "\n".join(lines))
+    return "\n\n".join(sections)
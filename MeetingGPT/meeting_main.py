@@ -4,12 +4,35 @@ from frontend.Screen_dmental import DiaryScreen
 from frontend.Screen_historico import HistoryScreen
 from frontend.Screen_config import ConfigScreen
 from frontend.Screen_login import LoginScreen
-from database.database_user import DatabaseUser  # Importa o banco de usuários
+from database.repository import get_user_repository  # Repositório de usuários
+from monitoring.metrics import start_metrics_server
+from storage.lifecycle import start_lifecycle_job
+from monitoring.rerun_profiler import profile_rerun
+from monitoring.logging_config import setup_logging
+
+# Logging centralizado (fila não bloqueante, rotação e mascaramento), configurado uma
+# única vez pelo ponto de entrada; os módulos apenas usam ``logging``
+setup_logging()
+
+# Nome de cada tela nas métricas de execução (rerun)
+SCREEN_NAMES = {
+    "📖 Tutorial de Uso": "tutorial",
+    "📅 Tela de Reuniões": "meeting",
+    "📝 Tela de Diário Mental": "diary",
+    "📂 Histórico": "history",
+    "⚙️ Configurações": "config",
+    "🚪 Logout": "logout"
+}
 
 def main():
     """
     Função principal para renderizar as telas do aplicativo.
     """
+    # ✅ Endpoint local /metrics (iniciado uma única vez por processo)
+    start_metrics_server()
+    # ✅ Job de ciclo de vida do armazenamento (compressão e retenção em segundo plano)
+    start_lifecycle_job()
+
     if "first_run" not in st.session_state:
      st.session_state["first_run"] = True  # Marca que o app já rodou
      st.rerun()  # 🔄 Força um refresh automático
@@ -18,9 +41,13 @@ def main():
     if "user_logged" not in st.session_state or not st.session_state["user_logged"]:
         st.sidebar.warning("🔒 Faça login para acessar o sistema.")
 
-        screen = LoginScreen()
-        # Renderiza a tela de login
-        screen.render()
+        # Renderiza a tela de login (custo de cada execução medido pelo profiler)
+        with profile_rerun("login"):
+            screen = LoginScreen()
+            try:
+                screen.render()
+            finally:
+                screen.cleanup()  # Devolve a conexão (ao pool, no backend SQLAlchemy)
         # Encerra o aplicativo
         st.stop()
     # Apaga sidebar se o usuário estiver autenticado
@@ -31,8 +58,11 @@ def main():
     # ✅ Exibe a mensagem de boas-vindas
     st.sidebar.success(f"👋 Bem-vindo, {username}!")
     if "user_id" not in st.session_state:
-        db_user = DatabaseUser()
-        user_data = db_user.get_user(username)
+        db_user = get_user_repository()
+        try:
+            user_data = db_user.get_user(username)
+        finally:
+            db_user.close_connection()
 
         if not user_data:
             st.error("⚠️ Erro ao obter informações do usuário.")
@@ -60,25 +90,32 @@ def main():
     # ✅ Exibir menu lateral
     menu = st.sidebar.selectbox("📌 Menu de Navegação", menu_options)
 
-    # ✅ Renderizar a página correspondente
-    if menu == "📖 Tutorial de Uso":
-        render_tutorial()
-    elif menu == "📅 Tela de Reuniões":
-        screen = MeetingScreen(user_id=user_id)  # ✅ Passa o `user_id` para a tela de reuniões
-        screen.render()
-    elif menu == "📝 Tela de Diário Mental":
-        screen = DiaryScreen(user_id=user_id)  # ✅ Passa o `user_id` para a tela de diário mental
-        screen.render()
-    elif menu == "📂 Histórico":
-        screen = HistoryScreen(user_id=user_id)  # ✅ Passa o `user_id` para a tela de histórico
-        screen.render()
-    elif menu == "⚙️ Configurações":
-        screen = ConfigScreen()
-        screen.render()
-    elif menu == "🚪 Logout":
-        st.cache_data.clear()
-        st.cache_resource.clear()
-        logout()
+    # ✅ Renderizar a página correspondente (custo de cada execução medido pelo profiler)
+    screen = None
+    with profile_rerun(SCREEN_NAMES.get(menu, menu)):
+        try:
+            if menu == "📖 Tutorial de Uso":
+                render_tutorial()
+            elif menu == "📅 Tela de Reuniões":
+                screen = MeetingScreen(user_id=user_id)  # ✅ Passa o `user_id` para a tela de reuniões
+                screen.render()
+            elif menu == "📝 Tela de Diário Mental":
+                screen = DiaryScreen(user_id=user_id)  # ✅ Passa o `user_id` para a tela de diário mental
+                screen.render()
+            elif menu == "📂 Histórico":
+                screen = HistoryScreen(user_id=user_id)  # ✅ Passa o `user_id` para a tela de histórico
+                screen.render()
+            elif menu == "⚙️ Configurações":
+                screen = ConfigScreen()
+                screen.render()
+            elif menu == "🚪 Logout":
+                st.cache_data.clear()
+                st.cache_resource.clear()
+                logout()
+        finally:
+            # Devolve a conexão da tela a cada execução (inclusive após st.rerun/st.stop)
+            if screen is not None and hasattr(screen, "cleanup"):
+                screen.cleanup()
 
 def render_tutorial():
     """
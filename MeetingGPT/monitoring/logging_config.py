@@ -0,0 +1,169 @@
+import os
+import re
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Diretório e arquivo de log únicos da aplicação
+LOG_DIR = os.environ.get("MEETINGGPT_LOG_DIR", "logs")
+LOG_FILE = os.path.join(LOG_DIR, "meetinggpt.log")
+LOG_LEVEL = os.environ.get("MEETINGGPT_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(module)s - %(message)s'
+
+# Rotação por tamanho
+LOG_MAX_BYTES = int(os.environ.get("MEETINGGPT_LOG_MAX_BYTES", 5 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.environ.get("MEETINGGPT_LOG_BACKUP_COUNT", 5))
+
+# Mensagens acima deste tamanho são truncadas (ex.: transcrições inteiras)
+MAX_MESSAGE_CHARS = int(os.environ.get("MEETINGGPT_LOG_MAX_CHARS", 2000))
+
+# Capacidade da fila; quando cheia, registros são descartados em vez de bloquear
+QUEUE_SIZE = 10000
+
+# Limite de erros/avisos repetidos: até RATE_LIMIT_BURST por RATE_LIMIT_WINDOW segundos
+RATE_LIMIT_WINDOW = 60.0
+RATE_LIMIT_BURST = 5
+
+# Logger dedicado aos eventos JSON lines das métricas
+METRICS_LOGGER_NAME = "meetinggpt.metrics"
+
+_SECRET_PATTERNS = (
+    (re.compile(r"sk-[A-Za-z0-9_\-]{2,}"), "sk-***"),
+    (re.compile(r"(?i)(bearer\s+)[A-Za-z0-9_\-\.=]+"), r"\1***"),
+    (re.compile(r"(?i)(api[_-]?key['\"]?\s*[:=]\s*['\"]?)[^\s'\",]+"), r"\1***"),
+)
+
+
+class RedactingFilter(logging.Filter):
+    def __init__(self, max_chars=MAX_MESSAGE_CHARS):
+        """
+        Trunca mensagens grandes e mascara chaves de API antes do enfileiramento.
+
+        A mensagem é truncada antes de aplicar as expressões regulares, de modo que
+        o custo por registro não cresce com o tamanho das transcrições.
+
+        :param max_chars: Tamanho máximo da mensagem registrada.
+        """
+        super().__init__()
+        self.max_chars = max_chars
+
+    def filter(self, record):
+        message = record.getMessage()
+        if len(message) > self.max_chars:
+            message = f"{message[:self.max_chars]}… [truncado, {len(message)} caracteres]"
+        for pattern, replacement in _SECRET_PATTERNS:
+            message = pattern.sub(replacement, message)
+        record.msg = message
+        record.args = None
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    def __init__(self, window=RATE_LIMIT_WINDOW, burst=RATE_LIMIT_BURST, level=logging.WARNING):
+        """
+        Limita avisos/erros repetidos vindos do mesmo ponto do código.
+
+        :param window: Janela de tempo em segundos.
+        :param burst: Quantidade de registros permitidos por janela.
+        :param level: Nível mínimo sujeito ao limite.
+        """
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.level = level
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < self.level:
+            return True
+        key = (record.pathname, record.lineno, record.levelno)
+        now = time.monotonic()
+        with self._lock:
+            window_start, count, suppressed = self._state.get(key, (now, 0, 0))
+            if now - window_start >= self.window:
+                window_start, count = now, 0
+            if count >= self.burst:
+                self._state[key] = (window_start, count, suppressed + 1)
+                return False
+            self._state[key] = (window_start, count + 1, 0)
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} mensagens semelhantes suprimidas)"
+            record.args = None
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue):
+        """QueueHandler que descarta registros (e os conta) quando a fila está cheia."""
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _LoggerNameFilter(logging.Filter):
+    def __init__(self, name, include):
+        super().__init__()
+        self.logger_name = name
+        self.include = include
+
+    def filter(self, record):
+        return (record.name == self.logger_name) == self.include
+
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(level=LOG_LEVEL):
+    """
+    Configura (uma única vez por processo) o logging centralizado da aplicação.
+
+    Os registros são filtrados (limite de repetição, truncamento e mascaramento)
+    na thread de origem e enfileirados; um QueueListener grava em disco com
+    rotação por tamanho, sem bloquear as threads das requisições.
+
+    :param level: Nível mínimo de log.
+    :return: Logger raiz configurado.
+    """
+    global _listener
+    root = logging.getLogger()
+    with _setup_lock:
+        if _listener is not None:
+            return root
+
+        os.makedirs(LOG_DIR, exist_ok=True)
+        log_queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+        file_handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        file_handler.addFilter(_LoggerNameFilter(METRICS_LOGGER_NAME, include=False))
+
+        metrics_handler = RotatingFileHandler(os.path.join(LOG_DIR, "metrics.jsonl"), maxBytes=LOG_MAX_BYTES,
+                                              backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+        metrics_handler.setFormatter(logging.Formatter("%(message)s"))
+        metrics_handler.addFilter(_LoggerNameFilter(METRICS_LOGGER_NAME, include=True))
+
+        queue_handler = _NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter())
+        queue_handler.addFilter(RedactingFilter())
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+        metrics_logger = logging.getLogger(METRICS_LOGGER_NAME)
+        metrics_logger.addHandler(_NonBlockingQueueHandler(log_queue))
+        metrics_logger.setLevel(logging.INFO)
+        metrics_logger.propagate = False
+
+        _listener = QueueListener(log_queue, file_handler, metrics_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+    return root
@@ -0,0 +1,334 @@
+import os
+import json
+import time
+import uuid
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import ContextDecorator, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from monitoring.logging_config import METRICS_LOGGER_NAME
+
+# Estágios do pipeline instrumentados
+STAGES = ("capture", "encode", "upload", "asr", "llm", "db")
+
+# Limites (em segundos) dos buckets dos histogramas — cobrem de consultas ao
+# banco (milissegundos) até gravações e chamadas de LLM (minutos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900, 3600)
+
+# Porta do endpoint /metrics (MEETINGGPT_METRICS_PORT=off desativa)
+METRICS_PORT = os.environ.get("MEETINGGPT_METRICS_PORT", "9108")
+
+# Trace id da reunião/diário em andamento
+_trace_id = contextvars.ContextVar("meetinggpt_trace_id", default=None)
+
+
+def new_trace_id():
+    """Gera um novo trace id para uma reunião ou diário."""
+    return uuid.uuid4().hex
+
+
+def get_trace_id():
+    """Retorna o trace id associado ao contexto atual (ou None)."""
+    return _trace_id.get()
+
+
+def set_trace_id(trace_id):
+    """
+    Associa um trace id ao contexto atual (thread de execução do script).
+
+    :param trace_id: Trace id da reunião/diário (None remove a associação).
+    """
+    _trace_id.set(trace_id)
+
+
+@contextmanager
+def trace_context(trace_id):
+    """Associa um trace id apenas durante o bloco ``with``."""
+    token = _trace_id.set(trace_id)
+    try:
+        yield trace_id
+    finally:
+        _trace_id.reset(token)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Histograma cumulativo no formato do Prometheus.
+
+        :param buckets: Limites superiores dos buckets (o +Inf é implícito).
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def merge(self, counts, total_sum):
+        """
+        Soma observações agregadas fora do histograma (mesmos buckets).
+
+        :param counts: Contagens por bucket (não cumulativas, com o +Inf por último).
+        :param total_sum: Soma dos valores observados.
+        """
+        with self._lock:
+            for index, value in enumerate(counts):
+                self.counts[index] += value
+            self.sum += total_sum
+            self.count += sum(counts)
+
+    def snapshot(self):
+        """Retorna (contagens cumulativas por bucket, soma, total)."""
+        with self._lock:
+            counts = list(self.counts)
+            total_sum, total = self.sum, self.count
+        cumulative, running = [], 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, total_sum, total
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Registro em memória de histogramas por estágio, contadores e gauges.
+        """
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.errors = {stage: 0 for stage in STAGES}
+        self.payload_bytes = {stage: 0 for stage in STAGES}
+        self.gauges = {}
+        self.collectors = []
+        self._lock = threading.Lock()
+
+    def _histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+                self.errors.setdefault(stage, 0)
+                self.payload_bytes.setdefault(stage, 0)
+        return histogram
+
+    def observe_stage(self, stage, seconds, ok=True):
+        """
+        Registra a duração de um estágio.
+
+        :param stage: Nome do estágio (ex.: 'asr').
+        :param seconds: Duração em segundos.
+        :param ok: False se o estágio terminou com erro.
+        """
+        self._histogram(stage).observe(seconds)
+        if not ok:
+            with self._lock:
+                self.errors[stage] += 1
+
+    def merge_stage(self, stage, counts, total_sum):
+        """
+        Registra de uma vez durações agregadas por quem as mediu (ex.: a telemetria da captura).
+
+        :param stage: Nome do estágio.
+        :param counts: Contagens por bucket de DEFAULT_BUCKETS (não cumulativas, com o +Inf por último).
+        :param total_sum: Soma das durações em segundos.
+        """
+        self._histogram(stage).merge(counts, total_sum)
+
+    def add_payload_bytes(self, stage, n_bytes):
+        """Soma ``n_bytes`` ao contador de tamanho de payload do estágio."""
+        self._histogram(stage)
+        with self._lock:
+            self.payload_bytes[stage] += int(n_bytes)
+
+    def set_gauge(self, name, value):
+        """Define o valor atual de um gauge (ex.: gravações ativas)."""
+        with self._lock:
+            self.gauges[name] = value
+
+    def add_collector(self, callback):
+        """Registra uma função chamada antes de cada leitura (atualiza gauges sob demanda)."""
+        with self._lock:
+            if callback not in self.collectors:
+                self.collectors.append(callback)
+
+    def render_prometheus(self):
+        """Serializa as métricas no formato texto do Prometheus."""
+        for callback in list(self.collectors):
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"❌ Erro ao coletar métricas: {e}")
+        lines = [
+            "# HELP meetinggpt_stage_duration_seconds Duração dos estágios do pipeline.",
+            "# TYPE meetinggpt_stage_duration_seconds histogram"
+        ]
+        for stage, histogram in list(self.histograms.items()):
+            cumulative, total_sum, total = histogram.snapshot()
+            for bound, count in zip(histogram.buckets, cumulative):
+                lines.append(f'meetinggpt_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'meetinggpt_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {cumulative[-1]}')
+            lines.append(f'meetinggpt_stage_duration_seconds_sum{{stage="{stage}"}} {total_sum}')
+            lines.append(f'meetinggpt_stage_duration_seconds_count{{stage="{stage}"}} {total}')
+
+        with self._lock:
+            errors = dict(self.errors)
+            payload = dict(self.payload_bytes)
+            gauges = dict(self.gauges)
+
+        lines.append("# HELP meetinggpt_stage_errors_total Estágios encerrados com erro.")
+        lines.append("# TYPE meetinggpt_stage_errors_total counter")
+        lines.extend(f'meetinggpt_stage_errors_total{{stage="{stage}"}} {value}' for stage, value in errors.items())
+        lines.append("# HELP meetinggpt_payload_bytes_total Bytes processados por estágio.")
+        lines.append("# TYPE meetinggpt_payload_bytes_total counter")
+        lines.extend(f'meetinggpt_payload_bytes_total{{stage="{stage}"}} {value}' for stage, value in payload.items())
+        for name, value in gauges.items():
+            lines.append(f"# TYPE meetinggpt_{name} gauge")
+            lines.append(f"meetinggpt_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class _JsonLinesSink:
+    def __init__(self, logger_name):
+        """
+        Emite um evento JSON por linha através do logger dedicado às métricas.
+
+        A escrita em disco (logs/metrics.jsonl, com rotação) acontece na thread
+        do QueueListener, fora do caminho crítico.
+        """
+        self.logger = logging.getLogger(logger_name)
+
+    def emit(self, event):
+        self.logger.info(json.dumps(event, ensure_ascii=False, default=str))
+
+
+# Instâncias globais do processo (compartilhadas entre as sessões do Streamlit)
+registry = MetricsRegistry()
+_sink = _JsonLinesSink(METRICS_LOGGER_NAME)
+
+
+class timed(ContextDecorator):
+    def __init__(self, stage, payload_bytes=None, **fields):
+        """
+        Mede a duração de um estágio — pode ser usado como ``with`` ou decorador.
+
+        :param stage: Nome do estágio (ver STAGES).
+        :param payload_bytes: Tamanho do payload processado (opcional).
+        :param fields: Campos extras incluídos no evento JSON (ex.: operation='insert').
+        """
+        self.stage = stage
+        self.payload_bytes = payload_bytes
+        self.fields = fields
+        self.seconds = None
+
+    def _recreate_cm(self):
+        # Cada chamada da função decorada recebe sua própria medição
+        return timed(self.stage, self.payload_bytes, **self.fields)
+
+    def add_bytes(self, n_bytes):
+        """Acumula bytes processados durante o estágio."""
+        self.payload_bytes = (self.payload_bytes or 0) + int(n_bytes)
+
+    def start_at(self, started):
+        """
+        Move o início da medição (``time.perf_counter``), quando o começo do intervalo
+        pertence a outro estágio medido à parte.
+        """
+        self._start = started
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._start
+        ok = exc_type is None
+        registry.observe_stage(self.stage, self.seconds, ok=ok)
+        if self.payload_bytes:
+            registry.add_payload_bytes(self.stage, self.payload_bytes)
+        _sink.emit({
+            "ts": time.time(),
+            "trace_id": get_trace_id(),
+            "stage": self.stage,
+            "duration_s": round(self.seconds, 6),
+            "ok": ok,
+            "payload_bytes": self.payload_bytes,
+            **self.fields
+        })
+        return False
+
+
+def observe_stage(stage, seconds, payload_bytes=None, **fields):
+    """
+    Registra um estágio cuja duração foi medida externamente (ex.: tempo de captura).
+
+    :param stage: Nome do estágio.
+    :param seconds: Duração em segundos.
+    :param payload_bytes: Tamanho do payload (opcional).
+    """
+    registry.observe_stage(stage, seconds)
+    if payload_bytes:
+        registry.add_payload_bytes(stage, payload_bytes)
+    _sink.emit({
+        "ts": time.time(),
+        "trace_id": get_trace_id(),
+        "stage": stage,
+        "duration_s": round(seconds, 6),
+        "ok": True,
+        "payload_bytes": payload_bytes,
+        **fields
+    })
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host="127.0.0.1"):
+    """
+    Expõe as métricas em http://host:port/metrics (uma única vez por processo).
+
+    :param port: Porta de escuta (padrão: MEETINGGPT_METRICS_PORT ou 9108).
+    :param host: Endereço de escuta (apenas local por padrão).
+    :return: Porta em uso ou None se o endpoint estiver desativado/indisponível.
+    """
+    global _server
+    port = port if port is not None else METRICS_PORT
+    if str(port).lower() in ("", "off", "none", "false"):
+        return None
+
+    with _server_lock:
+        if _server is not None:
+            return _server.server_address[1]
+        try:
+            _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+        except OSError as e:
+            logging.warning(f"⚠️ Endpoint de métricas indisponível na porta {port}: {e}")
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        logging.info(f"📈 Métricas disponíveis em http://{host}:{_server.server_address[1]}/metrics")
+        return _server.server_address[1]
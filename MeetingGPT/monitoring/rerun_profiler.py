@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+import sqlite3
+import sqlite3.dbapi2
+import threading
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from monitoring.metrics import observe_stage, registry
+
+# MEETINGGPT_RERUN_PROFILER=on ativa a medição das execuções; desligada, ``sqlite3.connect``
+# não é substituído e ``profile_rerun`` não faz nada (os benchmarks ativam com ``enable``)
+RERUN_PROFILER = os.environ.get("MEETINGGPT_RERUN_PROFILER", "off").lower() == "on"
+
+# Execuções guardadas por tela para os resumos (p50/p95)
+RERUN_HISTORY = 200
+
+# Execução em andamento na thread do script (cada sessão do Streamlit roda na sua)
+_local = threading.local()
+_history = {}
+_history_lock = threading.Lock()
+_original_connect = sqlite3.connect
+
+
+class RerunProfile:
+    def __init__(self, screen):
+        """
+        Custo de uma execução (rerun) de uma tela.
+
+        :param screen: Nome da tela.
+        """
+        self.screen = screen
+        self.seconds = None
+        self.db_connections = 0
+        self.queries = 0
+        # Memória medida no processo inteiro: inclui o que as outras sessões (threads)
+        # alocaram durante a execução, não apenas esta tela
+        self.process_allocated_blocks = 0  # blocos alocados e ainda vivos ao final
+        self.process_peak_kb = None  # pico de memória, apenas se o tracemalloc estiver ativo
+
+    def as_dict(self):
+        """Resultado em formato serializável."""
+        return {
+            "screen": self.screen,
+            "wall_ms": round(self.seconds * 1000, 3),
+            "db_connections": self.db_connections,
+            "queries": self.queries,
+            "process_allocated_blocks": self.process_allocated_blocks,
+            "process_peak_kb": self.process_peak_kb
+        }
+
+
+def _on_query(statement):
+    profile = getattr(_local, "profile", None)
+    if profile is not None:
+        profile.queries += 1
+
+
+def _profiled_connect(*args, **kwargs):
+    connection = _original_connect(*args, **kwargs)
+    profile = getattr(_local, "profile", None)
+    if profile is not None:
+        profile.db_connections += 1
+    # O callback conta as consultas de qualquer execução em andamento na thread que as emitir
+    connection.set_trace_callback(_on_query)
+    return connection
+
+
+def enable():
+    """Ativa o profiler no processo, independente de MEETINGGPT_RERUN_PROFILER (benchmarks)."""
+    global RERUN_PROFILER
+    RERUN_PROFILER = True
+    install()
+
+
+def install():
+    """Instrumenta ``sqlite3.connect`` (idempotente; conexões já abertas não são contadas)."""
+    if RERUN_PROFILER and sqlite3.connect is not _profiled_connect:
+        # O SQLAlchemy abre as conexões do pool por sqlite3.dbapi2.connect
+        sqlite3.connect = sqlite3.dbapi2.connect = _profiled_connect
+
+
+def uninstall():
+    """
+    Desativa o profiler e restaura o ``sqlite3.connect`` original (se ainda for o instrumentado).
+
+    :return: True se o profiler estava ativo (para reativar depois com ``enable``).
+    """
+    global RERUN_PROFILER
+    was_enabled = RERUN_PROFILER
+    RERUN_PROFILER = False
+    if sqlite3.connect is _profiled_connect:
+        sqlite3.connect = sqlite3.dbapi2.connect = _original_connect
+    return was_enabled
+
+
+def original_connect():
+    """``sqlite3.connect`` sem a instrumentação, para quem precisa envolver as conexões por conta própria."""
+    return _original_connect
+
+
+@contextmanager
+def profile_rerun(screen):
+    """
+    Mede uma execução da tela: tempo de parede, conexões abertas, consultas emitidas
+    e blocos de memória alocados no processo. O resultado vai para o histograma
+    'rerun' do /metrics, para o log JSON de métricas e para ``rerun_summary``.
+
+    Interrupções do Streamlit (st.rerun/st.stop) também são registradas. Com o
+    profiler desligado, apenas executa o bloco (e entrega None).
+
+    :param screen: Nome da tela.
+    """
+    if not RERUN_PROFILER:
+        yield None
+        return
+    install()
+    profile = RerunProfile(screen)
+    previous = getattr(_local, "profile", None)
+    _local.profile = profile
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.seconds = time.perf_counter() - start
+        profile.process_allocated_blocks = sys.getallocatedblocks() - blocks
+        if tracemalloc.is_tracing():
+            profile.process_peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+        _local.profile = previous
+        _record(profile)
+
+
+def _record(profile):
+    with _history_lock:
+        _history.setdefault(profile.screen, deque(maxlen=RERUN_HISTORY)).append(profile)
+    observe_stage("rerun", profile.seconds, screen=profile.screen, db_connections=profile.db_connections,
+                  queries=profile.queries, process_allocated_blocks=profile.process_allocated_blocks)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def rerun_summary(screen=None):
+    """
+    Resumo das últimas execuções por tela.
+
+    :param screen: Restringe a uma tela (opcional).
+    :return: Dicionário {tela: {runs, p50_ms, p95_ms, db_connections, queries, process_allocated_blocks}}
+             com conexões, consultas e blocos (do processo inteiro) como média por execução.
+    """
+    with _history_lock:
+        history = {name: list(profiles) for name, profiles in _history.items() if screen in (None, name)}
+    summary = {}
+    for name, profiles in history.items():
+        runs = len(profiles)
+        wall = [profile.seconds * 1000 for profile in profiles]
+        summary[name] = {
+            "runs": runs,
+            "p50_ms": round(_percentile(wall, 0.5), 3),
+            "p95_ms": round(_percentile(wall, 0.95), 3),
+            "db_connections": round(sum(profile.db_connections for profile in profiles) / runs, 2),
+            "queries": round(sum(profile.queries for profile in profiles) / runs, 2),
+            "process_allocated_blocks": round(sum(profile.process_allocated_blocks for profile in profiles) / runs)
+        }
+    return summary
+
+
+def reset():
+    """Descarta o histórico de execuções (usado entre medições)."""
+    with _history_lock:
+        _history.clear()
+
+
+def _publish_gauges():
+    # Última média por tela no /metrics (os tempos ficam no histograma 'rerun')
+    for name, values in rerun_summary().items():
+        key = "".join(c if c.isalnum() else "_" for c in name)
+        registry.set_gauge(f"rerun_db_connections_{key}", values["db_connections"])
+        registry.set_gauge(f"rerun_queries_{key}", values["queries"])
+
+
+registry.add_collector(_publish_gauges)
@@ -0,0 +1,160 @@
+import os
+import re
+import logging
+from audio_processing.segmented_recording import MANIFEST_NAME
+from audio_processing.diarization import diarize, assign_speakers, format_speaker_transcript, MAX_SPEAKERS
+from insights.incremental import IncrementalInsights
+from insights.extractive import extractive_summary, format_preview
+from insights.structured import parse_structured_insights, render_structured_insights
+
+
+def label_speakers(audio_path, transcription, participants=""):
+    """
+    Identifica os falantes no áudio (diarização local) e rotula a transcrição.
+
+    :param audio_path: Caminho do WAV completo.
+    :param transcription: Resultado da transcrição (com "segments").
+    :param participants: Participantes informados (limitam o número de falantes estimado).
+    :return: Transcrição com uma linha por turno ('Falante 1: ...') ou o texto original.
+    """
+    try:
+        names = [p for p in re.split(r"[,;\n]", participants or "") if p.strip()]
+        turns = diarize(audio_path, max_speakers=max(len(names), 2) if names else MAX_SPEAKERS)
+        if len({turn["speaker"] for turn in turns}) < 2:
+            return transcription.get("text", "")
+        return format_speaker_transcript(assign_speakers(transcription.get("segments", []), turns))
+    except Exception as e:
+        # A diarização é opcional: em caso de falha, mantém a transcrição sem rótulos
+        logging.warning(f"⚠️ Diarização indisponível para {audio_path}: {e}")
+        return transcription.get("text", "")
+
+
+def _json_codec(path):
+    return "json+gzip" if path.endswith(".gz") else "json"
+
+
+class MeetingPipeline:
+    def __init__(self, transcriber, insights_generator, checkpoints, artifacts):
+        """
+        Transcrição → (diarização) → insights com checkpoint de cada etapa.
+
+        Cada trecho transcrito e o resultado final são salvos no banco assim que
+        concluídos, identificados pelo ID da gravação; os resumos parciais ficam no
+        cache por hash do conteúdo. Uma nova execução retoma a partir da primeira
+        etapa que falta.
+
+        :param transcriber: AudioTranscriber.
+        :param insights_generator: InsightsGenerator.
+        :param checkpoints: CheckpointRepository (checkpoints e cache de resumos).
+        :param artifacts: ArtifactRepository (arquivos vinculados ao registro salvo).
+        """
+        self.transcriber = transcriber
+        self.insights_generator = insights_generator
+        self.checkpoints = checkpoints
+        self.artifacts = artifacts
+        self.incremental = IncrementalInsights(insights_generator, checkpoints)
+
+    def _transcribe(self, recording_id, audio_path, recording_dir, checkpoints):
+        if recording_dir and os.path.exists(os.path.join(recording_dir, MANIFEST_NAME)):
+            # Um trecho por segmento da gravação: uma falha custa apenas o segmento que falhou
+            completed = {
+                int(unit.split(":", 1)[1]): payload
+                for unit, payload in checkpoints.items() if unit.startswith("transcript:")
+            }
+            if completed:
+                logging.info(f"♻️ Retomando a transcrição de {recording_id}: {len(completed)} trecho(s) já concluído(s).")
+            return self.transcriber.transcribe_segments(
+                recording_dir, completed,
+                on_segment=lambda index, result: self.checkpoints.save_checkpoint(recording_id, f"transcript:{index}", result)
+            )
+        return self.transcriber.transcribe_audio(audio_path)
+
+    def run(self, recording_id, audio_path, recording_dir=None, participants="", label_speakers_in_transcript=False,
+            on_preview=None, reference_date=None):
+        """
+        Executa (ou retoma) o processamento de uma gravação.
+
+        :param recording_id: ID da gravação (chave dos checkpoints).
+        :param audio_path: Caminho do WAV completo.
+        :param recording_dir: Diretório da gravação segmentada (opcional).
+        :param participants: Participantes informados (limitam a diarização).
+        :param label_speakers_in_transcript: Rotula os falantes na transcrição (reuniões).
+        :param on_preview: Chamada com o resumo extrativo local assim que a transcrição fica pronta,
+            antes da chamada ao LLM (que pode demorar ou falhar).
+        :param reference_date: Data da reunião (AAAA-MM-DD), usada nos prazos dos itens de ação.
+        :return: Dicionário com "transcript", "preview", "insights" (texto) e "structured"
+            (resumo, tópicos, decisões e itens de ação).
+        """
+        checkpoints = self.checkpoints.load_checkpoints(recording_id)
+
+        if "transcript" in checkpoints:
+            transcript = checkpoints["transcript"]
+        else:
+            transcription = self._transcribe(recording_id, audio_path, recording_dir, checkpoints)
+            transcript = transcription.get("text", "")
+            if label_speakers_in_transcript:
+                transcript = label_speakers(audio_path, transcription, participants)
+            self.checkpoints.save_checkpoint(recording_id, "transcript", transcript)
+
+        if "preview" in checkpoints:
+            preview = checkpoints["preview"]
+        else:
+            preview = format_preview(extractive_summary(transcript, participants=participants))
+            self.checkpoints.save_checkpoint(recording_id, "preview", preview)
+        if on_preview:
+            on_preview(preview)
+
+        if "insights" in checkpoints:
+            structured = checkpoints["insights"]
+            if isinstance(structured, str):
+                # Checkpoint gravado antes dos insights estruturados (texto livre)
+                structured = parse_structured_insights({"insights": [structured]})
+        else:
+            # Resumos por bloco de parágrafos em cache: blocos já resumidos não geram nova chamada
+            structured = self.incremental.generate(transcript, reference_date)
+            self.checkpoints.save_checkpoint(recording_id, "insights", structured)
+
+        return {
+            "transcript": transcript,
+            "preview": preview,
+            "insights": render_structured_insights(structured),
+            "structured": structured
+        }
+
+    def register_artifacts(self, record_id, user_id, audio_path, recording_dir, result):
+        """
+        Grava a transcrição e os insights em JSON e vincula esses arquivos, o áudio e a
+        gravação segmentada ao registro salvo (retenção e compressão do ciclo de vida).
+
+        :param record_id: ID do registro na tabela 'meetings'.
+        :param user_id: ID do usuário dono do registro.
+        :param audio_path: Caminho do WAV completo.
+        :param recording_dir: Diretório da gravação segmentada (ou None).
+        :param result: Retorno de ``run``.
+        """
+        try:
+            self.artifacts.register_artifact(record_id, user_id, "audio", audio_path, codec="wav")
+            if recording_dir and os.path.isdir(recording_dir):
+                self.artifacts.register_artifact(record_id, user_id, "recording", recording_dir, codec="wav")
+            transcript_path = self.transcriber.save_transcription({"text": result["transcript"]})
+            self.artifacts.register_artifact(record_id, user_id, "transcript", transcript_path, codec=_json_codec(transcript_path))
+            insights_path = self.insights_generator.save_insights(
+                {"insights": result["insights"], "structured": result["structured"]}
+            )
+            self.artifacts.register_artifact(record_id, user_id, "insights", insights_path, codec=_json_codec(insights_path))
+        except Exception as e:
+            # Falha aqui não invalida o registro salvo; apenas o ciclo de vida deixa de tratá-lo
+            logging.error(f"❌ Erro ao vincular os artefatos ao registro {record_id}: {e}")
+
+    def progress(self, recording_id):
+        """
+        Etapas já concluídas de uma gravação (para informar o usuário após uma falha).
+
+        :return: Dicionário com trechos transcritos e se transcrição/insights estão prontos.
+        """
+        units = self.checkpoints.load_checkpoints(recording_id)
+        return {
+            "transcript_chunks": sum(1 for unit in units if unit.startswith("transcript:")),
+            "transcript": "transcript" in units,
+            "insights": "insights" in units
+        }
@@ -0,0 +1,155 @@
+import os
+import gzip
+import json
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+
+# Obtém o diretório base do projeto
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Raiz dos artefatos (áudios, gravações, transcrições e insights), configurável por variável de ambiente
+ARTIFACT_ROOT = os.environ.get("MEETINGGPT_DATA_DIR", os.path.join(BASE_DIR, "..", "data"))
+
+# Comprime os JSONs (transcrições/insights) com gzip
+COMPRESS_JSON = os.environ.get("MEETINGGPT_COMPRESS_JSON", "0").lower() in ("1", "true", "yes")
+
+_HASH_BLOCK_BYTES = 1024 * 1024
+
+
+class ArtifactStore:
+    def __init__(self, root=ARTIFACT_ROOT, compress_json=COMPRESS_JSON):
+        """
+        Armazenamento endereçado por conteúdo: cada arquivo é nomeado pelo seu
+        SHA-256 (conteúdos iguais são gravados uma única vez) e toda escrita
+        passa por um arquivo temporário renomeado atomicamente para o destino,
+        de modo que uma queda ou escritas concorrentes nunca deixem arquivos truncados.
+
+        :param root: Diretório raiz dos artefatos.
+        :param compress_json: Grava JSONs com gzip por padrão.
+        """
+        self.root = root
+        self.compress_json = compress_json
+        self.temp_dir = os.path.join(root, ".tmp")
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+    def namespace_dir(self, namespace):
+        """Diretório de um namespace (ex.: 'transcripts', 'audio/user_1')."""
+        return os.path.join(self.root, *namespace.split("/"))
+
+    def path_for(self, namespace, digest, suffix=""):
+        """Caminho final de um conteúdo (subdiretório com os 2 primeiros caracteres do hash)."""
+        return os.path.join(self.namespace_dir(namespace), digest[:2], digest + suffix)
+
+    def new_temp_path(self, suffix=""):
+        """Caminho temporário no mesmo sistema de arquivos da raiz (rename atômico)."""
+        return os.path.join(self.temp_dir, uuid.uuid4().hex + suffix)
+
+    def commit_file(self, temp_path, namespace, suffix=""):
+        """
+        Move um arquivo temporário já escrito para o seu endereço definitivo.
+
+        :param temp_path: Arquivo obtido com ``new_temp_path`` (consumido).
+        :param namespace: Namespace de destino.
+        :param suffix: Extensão do arquivo final (ex.: '.wav').
+        :return: Caminho definitivo do artefato.
+        """
+        digest = hashlib.sha256()
+        with open(temp_path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b""):
+                digest.update(block)
+            os.fsync(f.fileno())
+
+        final_path = self.path_for(namespace, digest.hexdigest(), suffix)
+        if os.path.exists(final_path):
+            # Conteúdo idêntico já armazenado: descarta a cópia
+            os.remove(temp_path)
+            logging.info(f"♻️ Artefato já existente reutilizado: {final_path}")
+            return final_path
+
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(temp_path, final_path)
+        return final_path
+
+    def put_bytes(self, data, namespace, suffix=""):
+        """
+        Grava um conteúdo em memória.
+
+        :return: Caminho definitivo do artefato.
+        """
+        temp_path = self.new_temp_path(suffix)
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            return self.commit_file(temp_path, namespace, suffix)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def put_file(self, source_path, namespace, suffix=None, move=False):
+        """
+        Grava um arquivo existente no armazenamento.
+
+        :param source_path: Arquivo de origem.
+        :param namespace: Namespace de destino.
+        :param suffix: Extensão do arquivo final (padrão: a da origem).
+        :param move: Remove a origem (rename quando possível, sem cópia).
+        :return: Caminho definitivo do artefato.
+        """
+        suffix = os.path.splitext(source_path)[1] if suffix is None else suffix
+        temp_path = self.new_temp_path(suffix)
+        try:
+            if move:
+                shutil.move(source_path, temp_path)
+            else:
+                shutil.copyfile(source_path, temp_path)
+            return self.commit_file(temp_path, namespace, suffix)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def put_json(self, data, namespace, compress=None):
+        """
+        Grava um dicionário como JSON (opcionalmente com gzip).
+
+        :param data: Dados serializáveis.
+        :param namespace: Namespace de destino (ex.: 'transcripts').
+        :param compress: Força/desativa o gzip (padrão: configuração do armazenamento).
+        :return: Caminho definitivo do artefato.
+        """
+        payload = json.dumps(data, ensure_ascii=False, indent=4).encode("utf-8")
+        if self.compress_json if compress is None else compress:
+            # mtime fixo: o mesmo JSON gera sempre os mesmos bytes (e o mesmo nome)
+            return self.put_bytes(gzip.compress(payload, mtime=0), namespace, ".json.gz")
+        return self.put_bytes(payload, namespace, ".json")
+
+    def load_json(self, path):
+        """Lê um JSON gravado com ``put_json`` (com ou sem gzip)."""
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store():
+    """Retorna o ArtifactStore compartilhado pelo processo."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
+
+
+def configure_artifact_store(root, compress_json=COMPRESS_JSON):
+    """Substitui o ArtifactStore do processo (ex.: outro diretório de dados)."""
+    global _store
+    with _store_lock:
+        _store = ArtifactStore(root, compress_json)
+        return _store
@@ -0,0 +1,249 @@
+import os
+import shutil
+import logging
+import threading
+import subprocess
+from monitoring.metrics import timed, registry
+from database.repository import get_artifact_repository, get_checkpoint_repository
+from monitoring.logging_config import setup_logging
+
+# Retenção padrão dos artefatos em dias (0 = manter para sempre); cada usuário pode sobrescrever
+DEFAULT_RETENTION_DAYS = int(os.environ.get("MEETINGGPT_RETENTION_DAYS", 90))
+
+# Compressão aplicada aos áudios já transcritos (Opus em Ogg, voz)
+TRANSCODE_CODEC = "opus"
+TRANSCODE_BITRATE = os.environ.get("MEETINGGPT_TRANSCODE_BITRATE", "24k")
+
+# Falhas de compressão toleradas por artefato e espera (s) após a primeira, dobrada a cada nova falha
+TRANSCODE_MAX_ATTEMPTS = int(os.environ.get("MEETINGGPT_TRANSCODE_MAX_ATTEMPTS", 5))
+TRANSCODE_RETRY_SECONDS = int(os.environ.get("MEETINGGPT_TRANSCODE_RETRY_SECONDS", 600))
+
+# Intervalo entre execuções do job em segundo plano e artefatos processados por lote
+LIFECYCLE_INTERVAL_SECONDS = int(os.environ.get("MEETINGGPT_LIFECYCLE_INTERVAL", 600))
+LIFECYCLE_BATCH_SIZE = 20
+
+# Limites do cache de resumos parciais (entradas e dias desde o último uso; 0 = sem limite)
+SUMMARY_CACHE_MAX_ENTRIES = int(os.environ.get("MEETINGGPT_SUMMARY_CACHE_MAX_ENTRIES", 5000))
+SUMMARY_CACHE_MAX_AGE_DAYS = int(os.environ.get("MEETINGGPT_SUMMARY_CACHE_MAX_AGE_DAYS", 90))
+
+
+def path_size(path):
+    """Tamanho em bytes de um arquivo ou diretório (0 se não existir)."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(dirpath, name))
+                   for dirpath, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _remove_path(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+class StorageLifecycleManager:
+    def __init__(self, default_retention_days=DEFAULT_RETENTION_DAYS, ffmpeg="ffmpeg"):
+        """
+        Gerencia o ciclo de vida dos artefatos em disco: compressão dos áudios já
+        transcritos, remoção das gravações segmentadas e expiração por retenção.
+
+        :param default_retention_days: Retenção aplicada a usuários sem política própria.
+        :param ffmpeg: Executável do ffmpeg usado na compressão.
+        """
+        self.default_retention_days = default_retention_days
+        self.ffmpeg = ffmpeg
+        self._ffmpeg_available = shutil.which(ffmpeg) is not None
+        self._thread = None
+        self._stop = threading.Event()
+        if not self._ffmpeg_available:
+            logging.warning("⚠️ ffmpeg não encontrado: os áudios não serão comprimidos.")
+
+    def _release_usage(self, user_id, delta_bytes):
+        # Mantém a cota do RecordingManager coerente com o que foi liberado/gerado
+        from audio_processing.recording_manager import get_recording_manager
+        get_recording_manager().adjust_usage(user_id, delta_bytes)
+
+    def _is_shared(self, db, artifact):
+        # Arquivos endereçados por conteúdo podem ser referenciados por mais de um registro
+        return db.artifact_shared(artifact)
+
+    def transcode(self, source_path):
+        """
+        Comprime um WAV para Opus (.ogg) ao lado do original.
+
+        :param source_path: Caminho do arquivo .wav.
+        :return: Caminho do arquivo comprimido.
+        """
+        target_path = os.path.splitext(source_path)[0] + ".ogg"
+        partial_path = target_path + ".part"
+        try:
+            with timed("transcode", payload_bytes=path_size(source_path)):
+                subprocess.run(
+                    [self.ffmpeg, "-nostdin", "-loglevel", "error", "-y", "-i", source_path,
+                     "-c:a", "libopus", "-b:a", TRANSCODE_BITRATE, "-application", "voip", "-f", "ogg", partial_path],
+                    check=True, capture_output=True
+                )
+        except Exception:
+            # Não deixa arquivos parciais para trás entre as tentativas
+            _remove_path(partial_path)
+            raise
+        os.replace(partial_path, target_path)
+        return target_path
+
+    def _transcode_pending(self, db, batch_size):
+        """Comprime áudios WAV cujo registro já possui transcrição e remove as gravações segmentadas."""
+        processed = 0
+        # Sem ffmpeg, apenas as gravações segmentadas são tratadas (os áudios continuam na fila)
+        kinds = ("audio", "recording") if self._ffmpeg_available else ("recording",)
+        for artifact in db.fetch_transcode_candidates(batch_size, kinds):
+            try:
+                before = path_size(artifact["path"])
+                if artifact["kind"] == "recording":
+                    # Os segmentos só servem para recuperação; o WAV montado já existe
+                    _remove_path(artifact["path"])
+                    db.mark_artifact_deleted(artifact["id"])
+                    after = 0
+                elif not os.path.exists(artifact["path"]):
+                    raise FileNotFoundError(f"arquivo {artifact['path']} não encontrado")
+                else:
+                    target_path = self.transcode(artifact["path"])
+                    os.remove(artifact["path"])
+                    after = path_size(target_path)
+                    # Atualiza todos os registros que apontam para o mesmo conteúdo
+                    db.mark_artifacts_transcoded(artifact["path"], target_path, TRANSCODE_CODEC, after)
+                self._release_usage(artifact["user_id"], after - before)
+                processed += 1
+            except Exception as e:
+                logging.error(f"❌ Erro ao processar o artefato {artifact['id']}: {e}")
+                # Sem isso, um artefato que sempre falha ocuparia o lote em todas as execuções
+                state = db.mark_transcode_failed(artifact["id"], TRANSCODE_MAX_ATTEMPTS, TRANSCODE_RETRY_SECONDS)
+                if state == "failed":
+                    logging.warning(f"⚠️ Artefato {artifact['id']} marcado como 'failed' após "
+                                    f"{TRANSCODE_MAX_ATTEMPTS} tentativas de compressão.")
+        return processed
+
+    def _expire(self, db, batch_size):
+        """Remove os artefatos que ultrapassaram a retenção do usuário."""
+        expired = 0
+        for artifact in db.fetch_expired_artifacts(self.default_retention_days, batch_size):
+            try:
+                released = 0
+                if not self._is_shared(db, artifact):
+                    released = path_size(artifact["path"])
+                    _remove_path(artifact["path"])
+                db.mark_artifact_deleted(artifact["id"])
+                self._release_usage(artifact["user_id"], -released)
+                expired += 1
+            except Exception as e:
+                logging.error(f"❌ Erro ao expirar o artefato {artifact['id']}: {e}")
+        return expired
+
+    def remove_artifact_files(self, artifacts):
+        """
+        Apaga do disco os arquivos de artefatos já removidos do banco e libera a cota.
+
+        :param artifacts: Dicionários de artefatos (com 'path' e 'user_id') sem outras referências.
+        :return: Bytes liberados.
+        """
+        released = 0
+        for artifact in artifacts:
+            try:
+                size = path_size(artifact["path"])
+                _remove_path(artifact["path"])
+                self._release_usage(artifact["user_id"], -size)
+                released += size
+            except Exception as e:
+                logging.error(f"❌ Erro ao remover o arquivo {artifact['path']}: {e}")
+        if artifacts:
+            logging.info(f"🧹 {len(artifacts)} arquivo(s) removido(s), {released} bytes liberados.")
+            self._publish_gauges()
+        return released
+
+    def run_once(self, batch_size=LIFECYCLE_BATCH_SIZE):
+        """
+        Executa um lote incremental do ciclo de vida.
+
+        :param batch_size: Máximo de artefatos tratados por etapa.
+        :return: Dicionário com a quantidade de artefatos comprimidos e expirados.
+        """
+        db = get_artifact_repository()
+        try:
+            result = {
+                "transcoded": self._transcode_pending(db, batch_size),
+                "expired": self._expire(db, batch_size)
+            }
+            get_checkpoint_repository(share=db).prune_summary_cache(SUMMARY_CACHE_MAX_ENTRIES,
+                                                                    SUMMARY_CACHE_MAX_AGE_DAYS)
+        finally:
+            db.close_connection()
+        if result["transcoded"] or result["expired"]:
+            logging.info(f"🧹 Ciclo de armazenamento: {result['transcoded']} comprimidos, {result['expired']} expirados.")
+        self._publish_gauges()
+        return result
+
+    def disk_usage_report(self, user_id=None):
+        """
+        Relatório de uso de disco por usuário e tipo de artefato.
+
+        :param user_id: Restringe o relatório a um usuário (opcional).
+        :return: Lista de dicionários {user_id, kind, state, artifacts, bytes}.
+        """
+        db = get_artifact_repository()
+        try:
+            return db.disk_usage_report(user_id)
+        finally:
+            db.close_connection()
+
+    def _publish_gauges(self):
+        total = sum(row["bytes"] or 0 for row in self.disk_usage_report())
+        registry.set_gauge("artifact_storage_bytes", total)
+
+    def _loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                # Processa lotes até esvaziar a fila, sem bloquear a aplicação
+                while any(self.run_once().values()) and not self._stop.is_set():
+                    pass
+            except Exception as e:
+                logging.error(f"❌ Erro no job de ciclo de vida do armazenamento: {e}")
+
+    def start_background(self, interval=LIFECYCLE_INTERVAL_SECONDS):
+        """Inicia (uma única vez) o job periódico em uma thread daemon."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(interval,), name="storage-lifecycle", daemon=True)
+            self._thread.start()
+            logging.info(f"🗄️ Job de ciclo de vida do armazenamento iniciado (a cada {interval}s).")
+
+    def stop_background(self):
+        self._stop.set()
+
+
+_lifecycle = None
+_lifecycle_lock = threading.Lock()
+
+
+def get_lifecycle_manager():
+    """Retorna o StorageLifecycleManager compartilhado pelo processo."""
+    global _lifecycle
+    with _lifecycle_lock:
+        if _lifecycle is None:
+            _lifecycle = StorageLifecycleManager()
+        return _lifecycle
+
+
+def start_lifecycle_job(interval=LIFECYCLE_INTERVAL_SECONDS):
+    """Inicia o job de ciclo de vida do armazenamento (idempotente)."""
+    manager = get_lifecycle_manager()
+    manager.start_background(interval)
+    return manager
+
+
+# Execução manual: python -m storage.lifecycle
+if __name__ == "__main__":
+    setup_logging()
+    lifecycle = StorageLifecycleManager()
+    print(lifecycle.run_once())
+    for row in lifecycle.disk_usage_report():
+        print(f"usuário {row['user_id']}: {row['kind']} ({row['state']}) — {row['artifacts']} arquivos, {row['bytes'] or 0} bytes")
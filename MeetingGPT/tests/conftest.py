@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Os módulos do projeto são importados a partir da pasta MeetingGPT (como em meeting_main)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sem servidor de métricas durante os testes
+os.environ.setdefault("MEETINGGPT_METRICS_PORT", "off")
@@ -0,0 +1,68 @@
+"""
+Orçamento de execução das telas (benchmarks.render_budget) como teste.
+
+Só as métricas que não dependem da máquina (conexões e consultas por execução)
+são verificadas; o tempo (p95_ms) continua no benchmark.
+"""
+import pytest
+
+from benchmarks.render_budget import INTERACTIONS, RENDER_BUDGETS, check_budgets, run_render_benchmark
+from monitoring import rerun_profiler
+
+# Base pequena e um ciclo de interações por tela: conexões e consultas não dependem do volume
+RECORDS = 60
+
+
+@pytest.fixture(autouse=True)
+def _fresh_profiler():
+    rerun_profiler.reset()
+    yield
+    rerun_profiler.reset()
+
+
+@pytest.mark.parametrize("screen", list(RENDER_BUDGETS))
+def test_screen_within_budget(screen, tmp_path):
+    reruns = len(INTERACTIONS[screen])
+    results = run_render_benchmark(screens=(screen,), records=RECORDS, reruns=reruns, work_dir=str(tmp_path))
+    budgets = {screen: {metric: limit for metric, limit in RENDER_BUDGETS[screen].items() if metric != "p95_ms"}}
+
+    assert "error" not in results[screen], results[screen].get("error")
+    assert results[screen]["runs"] >= reruns
+    assert check_budgets(results, budgets) == []
+
+
+def test_check_budgets_reports_violations():
+    queries = RENDER_BUDGETS["history"]["queries"] + 1
+    results = {
+        "history": {"p95_ms": 10, "db_connections": 1, "queries": queries},
+        "login": {"error": "boom"}
+    }
+
+    assert check_budgets(results) == [
+        ("history", "queries", RENDER_BUDGETS["history"]["queries"], queries),
+        ("login", "error", None, "boom")
+    ]
+
+
+def test_profiler_disabled_does_not_record(monkeypatch):
+    monkeypatch.setattr(rerun_profiler, "RERUN_PROFILER", False)
+
+    with rerun_profiler.profile_rerun("disabled") as profile:
+        pass
+
+    assert profile is None
+    assert rerun_profiler.rerun_summary("disabled") == {}
+
+
+def test_uninstall_restores_connect(monkeypatch):
+    import sqlite3
+
+    monkeypatch.setattr(rerun_profiler, "RERUN_PROFILER", False)
+    monkeypatch.setattr(sqlite3, "connect", sqlite3.connect)
+    monkeypatch.setattr(sqlite3.dbapi2, "connect", sqlite3.dbapi2.connect)
+    rerun_profiler.enable()
+    assert sqlite3.connect is not rerun_profiler.original_connect()
+
+    assert rerun_profiler.uninstall() is True
+    assert sqlite3.connect is sqlite3.dbapi2.connect is rerun_profiler.original_connect()
+    assert rerun_profiler.uninstall() is False
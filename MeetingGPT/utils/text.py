@@ -0,0 +1,25 @@
+import re
+import unicodedata
+
+_PARTICIPANT_SEPARATORS = re.compile(r"[,;\n]|\s+e\s+")
+
+
+def normalize_key(text):
+    """Chave de comparação de nomes: sem acentos, minúsculas e espaços simples."""
+    folded = "".join(c for c in unicodedata.normalize("NFKD", text or "") if not unicodedata.combining(c))
+    return " ".join(folded.casefold().split())
+
+
+def split_participants(text):
+    """
+    Participantes informados no registro, sem repetições.
+
+    :return: Lista de (chave sem acentos/minúsculas, nome como digitado).
+    """
+    people = {}
+    for name in _PARTICIPANT_SEPARATORS.split(text or ""):
+        name = " ".join(name.split())
+        key = normalize_key(name)
+        if key and key not in people:
+            people[key] = name
+    return list(people.items())